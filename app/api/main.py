@@ -34,7 +34,7 @@ from sqlalchemy.orm import Session
 
 # ML Pipeline imports
 from app.core.ml_pipeline import (
-    initialize_ml_pipeline, predict_individual, predict_organization,
+    initialize_ml_pipeline, predict_individual, predict_individual_batch, predict_organization,
     process_campaign, get_pipeline_status, health_check as ml_health_check,
     reload_models as ml_reload_models, analyze_text_risk
 )
@@ -426,6 +426,7 @@ async def predict_individual_risk(
 async def predict_batch_individual(
     responses: List[SurveyResponseData],
     background_tasks: BackgroundTasks,
+    include_feature_importance: bool = True,
     user: dict = Depends(get_current_user)
 ):
     """Predict psychological risk for multiple individual responses"""
@@ -433,13 +434,13 @@ async def predict_batch_individual(
         if len(responses) > 100:
             raise HTTPException(status_code=400, detail="Maximum 100 responses per batch")
         
-        predictions = []
+        batch = []
         for response_data in responses:
             data_dict = response_data.dict()
             data_dict['user_id'] = user.get('user_id')
-            
-            prediction = await predict_individual(data_dict)
-            predictions.append(prediction)
+            batch.append(data_dict)
+        
+        predictions = await predict_individual_batch(batch, include_feature_importance)
         
         return {
             "total_responses": len(responses),
@@ -463,14 +464,16 @@ async def predict_organizational_risk(
     """Predict organizational risk from aggregated individual responses"""
     try:
         # Get individual predictions first
-        individual_predictions = []
+        batch = []
         for response_data in request.individual_responses:
             data_dict = response_data.dict()
             data_dict['user_id'] = user.get('user_id')
-            
-            prediction = await predict_individual(data_dict)
-            if 'error' not in prediction:
-                individual_predictions.append(prediction)
+            batch.append(data_dict)
+        
+        individual_predictions = [
+            prediction for prediction in await predict_individual_batch(batch, include_feature_importance=False)
+            if 'error' not in prediction
+        ]
         
         if len(individual_predictions) < 5:
             raise HTTPException(
@@ -687,6 +690,7 @@ async def process_campaign_background(campaign_id: str):
 async def upload_survey_data(
     file: UploadFile = File(...),
     organization_id: Optional[str] = None,
+    include_feature_importance: bool = True,
     user: dict = Depends(get_current_user)
 ):
     """Upload survey data from CSV/Excel file"""
@@ -717,21 +721,23 @@ async def upload_survey_data(
                 detail=f"Missing required columns: {missing_columns}"
             )
         
-        # Process each row
+        # Convert each row, then score all convertible rows in one batch
         predictions = []
+        batch, batch_slots = [], []
         for index, row in df.iterrows():
             try:
-                # Convert row to survey response format
-                response_data = convert_row_to_response_data(row, index)
-                
-                # Predict individual risk
-                prediction = await predict_individual(response_data)
-                predictions.append(prediction)
-                
+                batch.append(convert_row_to_response_data(row, index))
+                batch_slots.append(len(predictions))
+                predictions.append(None)
             except Exception as e:
                 logger.warning(f"Failed to process row {index}: {e}")
                 predictions.append({"error": str(e), "row": index})
         
+        if batch:
+            batch_predictions = await predict_individual_batch(batch, include_feature_importance)
+            for slot, prediction in zip(batch_slots, batch_predictions):
+                predictions[slot] = prediction
+        
         return {
             "file_name": file.filename,
             "total_rows": len(df),
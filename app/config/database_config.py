@@ -6,7 +6,7 @@ Optimized for fast, serverless deployment with built-in connection pooling
 import os
 import sqlite3
 from pathlib import Path
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -83,9 +83,25 @@ def get_db():
 async_db = AsyncDatabaseManager()
 
 # Database Initialization
+def add_missing_columns():
+    """Add model columns missing from existing tables (create_all only creates new tables)"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                    print(f"Added column {table.name}.{column.name}")
+
 def create_database():
     """Create all tables and initial data"""
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
     
     # Initialize HSEG Categories
     with SessionLocal() as db:
@@ -5,6 +5,7 @@ Complete prediction pipeline with database integration and error handling
 
 import asyncio
 import json
+import os
 import numpy as np
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
@@ -23,6 +24,12 @@ from app.models.database_models import (
 
 # Model imports
 from app.models.individual_risk_model import IndividualRiskPredictor
+from app.models.flat_artifact import read_flat_metadata
+from app.utils.file_digest import file_digest
+from app.core.prediction_cache import PredictionCache
+from app.core.text_analysis_cache import TextAnalysisCache
+from app.core.synthetic_workload import DEFAULT_RESPONSES_PER_ORG, generate_workload, \
+    individual_training_records, organizational_training_records
 from app.models.text_risk_classifier import TextRiskClassifier
 from app.models.organizational_risk_model import OrganizationalRiskAggregator
 from transformers import pipeline as hf_pipeline
@@ -56,8 +63,11 @@ class HSEGMLPipeline:
     Handles end-to-end prediction from survey data to organizational assessment
     """
     
-    def __init__(self, model_version: str = "v1.0.0"):
+    def __init__(self, model_version: str = "v1.0.0", individual_backend: Optional[str] = None):
         self.model_version = model_version
+        # 'sklearn' scores with the pickled members, 'onnx' with the exported onnxruntime graph,
+        # 'flat' with the memory-mapped array artifact (skips unpickling the ensemble entirely)
+        self.individual_backend = (individual_backend or os.getenv('INDIVIDUAL_MODEL_BACKEND', 'sklearn')).lower()
         
         # Initialize models
         self.individual_model = IndividualRiskPredictor(model_version)
@@ -67,15 +77,19 @@ class HSEGMLPipeline:
         
         # Model paths
         # Use versioned trained models if present
-        version_dir = Path(f"app/models/trained/{self.model_version}")
-        base_dir = version_dir if version_dir.exists() else Path("app/models/trained")
-        self.model_paths = {
-            'individual': str(base_dir / 'individual_risk_model.pkl'),
-            # Text model: prefer .pt (torch checkpoint). If missing, fallback to rule-based.
-            'text_pt': str(base_dir / 'text_risk_classifier.pt'),
-            'text_pkl': str(base_dir / 'text_risk_classifier.pkl'),
-            'organizational': str(base_dir / 'organizational_risk_model.pkl')
-        }
+        self.model_paths = self._resolve_model_paths()
+        
+        # Category scores keyed by feature-vector digest + model version; flushed whenever models change
+        self.prediction_cache = PredictionCache(
+            max_size=int(os.getenv('PREDICTION_CACHE_SIZE', '10000')),
+            ttl_seconds=float(os.getenv('PREDICTION_CACHE_TTL_SECONDS', '3600'))
+        )
+        # Text analyses keyed by normalized-text digest + classifier version, persisted on OpenTextResponse rows
+        self.text_analysis_cache = TextAnalysisCache(
+            self.text_classifier,
+            max_size=int(os.getenv('TEXT_ANALYSIS_CACHE_SIZE', '10000')),
+            ttl_seconds=float(os.getenv('TEXT_ANALYSIS_CACHE_TTL_SECONDS', '3600'))
+        )
         
         # Pipeline status
         self.models_loaded = False
@@ -122,21 +136,37 @@ class HSEGMLPipeline:
             traceback.print_exc()
             return False
 
+    def _resolve_model_paths(self) -> Dict[str, str]:
+        """
+        Artifact paths for the pipeline version: each model's files come from
+        app/models/trained/<version>/ when that directory holds the model, else from app/models/trained/
+        (an individual-model update writes only the individual artifacts into its version directory)
+        """
+        root = Path("app/models/trained")
+        version_dir = root / self.model_version
+        groups = {
+            'individual': {'individual': 'individual_risk_model.pkl', 'individual_onnx': 'individual_risk_model.onnx',
+                           'individual_flat': 'individual_risk_model.npy'},
+            # Text model: prefer .pt (torch checkpoint). If missing, fallback to rule-based.
+            'text': {'text_pt': 'text_risk_classifier.pt', 'text_pkl': 'text_risk_classifier.pkl'},
+            'organizational': {'organizational': 'organizational_risk_model.pkl'}
+        }
+        paths = {}
+        for files in groups.values():
+            base_dir = version_dir if any((version_dir / name).exists() for name in files.values()) else root
+            paths.update({key: str(base_dir / name) for key, name in files.items()})
+        return paths
+    
     async def reload_models(self) -> bool:
         """Reload models from disk without training (for API reload)."""
         try:
             logger.info("Reloading HSEG models from disk...")
             # Recompute versioned paths in case version changed externally
-            version_dir = Path(f"app/models/trained/{self.model_version}")
-            base_dir = version_dir if version_dir.exists() else Path("app/models/trained")
-            self.model_paths.update({
-                'individual': str(base_dir / 'individual_risk_model.pkl'),
-                'text_pt': str(base_dir / 'text_risk_classifier.pt'),
-                'text_pkl': str(base_dir / 'text_risk_classifier.pkl'),
-                'organizational': str(base_dir / 'organizational_risk_model.pkl')
-            })
+            self.model_paths.update(self._resolve_model_paths())
 
             loaded = await self._load_existing_models()
+            # Cached scores belong to the previous models, even when the version string is unchanged
+            self.prediction_cache.clear()
             self.models_loaded = loaded
             self.pipeline_ready = loaded
             return loaded
@@ -150,24 +180,38 @@ class HSEGMLPipeline:
         
         try:
             # Load individual model
-            if Path(self.model_paths['individual']).exists():
+            if self.individual_backend == 'flat' and self._flat_artifact_current():
+                self.individual_model.load_flat_model(self.model_paths['individual_flat'])
+                models_loaded += 1
+                logger.info("Individual risk model loaded (memory-mapped flat artifact)")
+            elif Path(self.model_paths['individual']).exists():
                 self.individual_model.load_model(self.model_paths['individual'])
                 models_loaded += 1
                 logger.info("Individual risk model loaded")
+                self._attach_individual_backend()
             
             # Load text classifier (optional)
+            text_path = None
             if Path(self.model_paths['text_pt']).exists():
                 self.text_classifier.load_model(self.model_paths['text_pt'])
+                text_path = self.model_paths['text_pt']
                 models_loaded += 1
                 logger.info("Text risk classifier loaded (.pt)")
             elif Path(self.model_paths['text_pkl']).exists():
                 # Attempt to load legacy .pkl if present
                 try:
                     self.text_classifier.load_model(self.model_paths['text_pkl'])
+                    text_path = self.model_paths['text_pkl']
                     models_loaded += 1
                     logger.info("Text risk classifier loaded (.pkl)")
                 except Exception as e:
                     logger.warning(f"Failed to load text classifier checkpoint: {e}. Will use rule-based fallback.")
+            # Stored text analyses are only reused for the same classifier artifact
+            self.text_analysis_cache.reset(file_digest(text_path) if text_path else None)
+            if os.getenv('TEXT_MODEL_WARMUP', 'false').lower() == 'true':
+                # Load the text components now instead of stalling the first request
+                components = self.text_classifier.warmup()
+                logger.info(f"Text classifier warmed up: {[name for name, c in components.items() if c.get('resident')]}")
             
             # Load organizational model
             if Path(self.model_paths['organizational']).exists():
@@ -183,6 +227,74 @@ class HSEGMLPipeline:
             logger.error(f"Error loading models: {e}")
             return False
     
+    def _flat_artifact_current(self) -> bool:
+        """
+        Whether the flat artifact can be served: it must exist and, when the pickle is present,
+        have been written from that same pickle (a promoted or updated .pkl may sit next to an old .npy)
+        """
+        flat_path, pickle_path = self.model_paths['individual_flat'], self.model_paths['individual']
+        if not Path(flat_path).exists():
+            return False
+        if not Path(pickle_path).exists():
+            return True
+        try:
+            metadata = read_flat_metadata(flat_path)
+        except Exception as e:
+            logger.warning(f"Failed to read {flat_path}: {e}. Using the pickled model.")
+            return False
+        if metadata.get('source_sha256') != file_digest(pickle_path):
+            logger.warning(f"{flat_path} (model version {metadata.get('model_version')}) was not written from "
+                           f"{pickle_path}. Using the pickled model.")
+            return False
+        return True
+    
+    def _attach_individual_backend(self):
+        """Score the individual model through onnxruntime when that backend is selected"""
+        if self.individual_backend != 'onnx':
+            return
+        
+        onnx_path = self.model_paths['individual_onnx']
+        if not Path(onnx_path).exists():
+            logger.warning(f"ONNX backend selected but {onnx_path} not found. Using sklearn backend.")
+            return
+        
+        try:
+            self.individual_model.enable_onnx_backend(
+                onnx_path,
+                num_threads=int(os.getenv('ONNX_NUM_THREADS', '0')) or None,
+                source_digest=file_digest(self.model_paths['individual'])
+            )
+            logger.info("Individual risk model scoring through onnxruntime")
+        except Exception as e:
+            logger.warning(f"Failed to enable ONNX backend: {e}. Using sklearn backend.")
+
+    def update_individual_model(self, new_responses: List[Dict], new_version: Optional[str] = None,
+                                **update_kwargs) -> Dict[str, Any]:
+        """
+        Warm-start the loaded individual model on new responses and save it as a new version
+        Only app/models/trained/<new version>/ is written, and the pipeline then points at it;
+        the previous version's artifacts are left untouched so it can be rolled back to
+        """
+        report = self.individual_model.update(new_responses, new_version=new_version, **update_kwargs)
+
+        version = self.individual_model.model_version
+        version_dir = Path(f"app/models/trained/{version}")
+        version_dir.mkdir(parents=True, exist_ok=True)
+        versioned_path = str(version_dir / 'individual_risk_model.pkl')
+        self.individual_model.save_model(versioned_path)
+        self.individual_model.save_flat_model(str(version_dir / 'individual_risk_model.npy'),
+                                              source_digest=file_digest(versioned_path))
+        # Text and organizational models keep the artifacts they were loaded from
+        self.model_version = version
+        self.model_paths.update({key: path for key, path in self._resolve_model_paths().items()
+                                 if key.startswith('individual')})
+
+        # Scores cached under the old version can no longer be served
+        self.prediction_cache.clear()
+        logger.info(f"Individual risk model updated to {version} ({versioned_path})")
+
+        return {**report, 'artifact_path': versioned_path}
+
     async def _train_all_models(self):
         """Train all models with sample data"""
         try:
@@ -200,14 +312,23 @@ class HSEGMLPipeline:
             
             # Train individual model
             logger.info("Training individual risk model...")
-            individual_metrics = self.individual_model.train(individual_training_data)
+            individual_metrics = self.individual_model.train(
+                individual_training_data,
+                n_workers=int(os.getenv('TRAINING_WORKERS', '0')) or None
+            )
             self.individual_model.save_model(self.model_paths['individual'])
+            self.individual_model.save_flat_model(self.model_paths['individual_flat'],
+                                                  source_digest=file_digest(self.model_paths['individual']))
+            self.prediction_cache.clear()
             
             # Train text classifier
             logger.info("Training text risk classifier...")
             text_metrics = self.text_classifier.train(text_training_data, epochs=2)
             # Save torch checkpoint under trained path
             self.text_classifier.save_model(self.model_paths['text_pt'])
+            self.text_classifier.prepare_for_inference()
+            text_path = self.model_paths['text_pt']
+            self.text_analysis_cache.reset(file_digest(text_path) if Path(text_path).exists() else None)
             
             # Organizational model in this codebase loads from a pre-trained artifact.
             # Skipping training here as there is no training method implemented.
@@ -220,63 +341,8 @@ class HSEGMLPipeline:
     
     def _generate_individual_training_data(self, num_samples: int) -> List[Dict]:
         """Generate synthetic individual training data"""
-        training_data = []
-        
-        for i in range(num_samples):
-            # Generate varied risk profiles
-            risk_level = np.random.choice(['low', 'medium', 'high', 'crisis'], p=[0.3, 0.4, 0.2, 0.1])
-            
-            if risk_level == 'crisis':
-                base_scores = np.random.uniform(1.0, 2.0, 6)
-            elif risk_level == 'high':
-                base_scores = np.random.uniform(1.5, 2.5, 6)
-            elif risk_level == 'medium':
-                base_scores = np.random.uniform(2.0, 3.0, 6)
-            else:
-                base_scores = np.random.uniform(2.5, 4.0, 6)
-            
-            # Add some noise
-            base_scores += np.random.normal(0, 0.2, 6)
-            base_scores = np.clip(base_scores, 1.0, 4.0)
-            
-            data = {
-                'response_id': f'train_{i}',
-                'domain': np.random.choice(['Healthcare', 'University', 'Business']),
-                'survey_responses': {f'q{j}': score for j, score in enumerate(base_scores[:22], 1)},
-                'demographics': {
-                    'age_range': np.random.choice(['18-24', '25-34', '35-44', '45-54', '55+']),
-                    'gender_identity': np.random.choice(['Man', 'Woman', 'Non-binary']),
-                    'tenure_range': np.random.choice(['<1_year', '1-3_years', '4-7_years', '8+_years']),
-                    'position_level': np.random.choice(['Entry', 'Mid', 'Senior', 'Executive']),
-                    'department': np.random.choice(['Engineering', 'Sales', 'HR', 'Operations']),
-                    'supervises_others': np.random.choice([True, False]),
-                    'work_location': np.random.choice(['On_Site', 'Remote', 'Hybrid']),
-                    'employment_status': 'Full_Time',
-                    'education_level': np.random.choice(['High_School', 'Bachelors', 'Graduate']),
-                    'ethnicity_group': np.random.choice(['White', 'Hispanic', 'Asian', 'Black', 'Mixed'])
-                },
-                'response_quality': {
-                    'completion_time_seconds': np.random.randint(120, 600),
-                    'response_quality_score': np.random.uniform(0.6, 1.0),
-                    'attention_check_passed': np.random.choice([True, False], p=[0.9, 0.1]),
-                    'straight_line_response': np.random.choice([True, False], p=[0.1, 0.9]),
-                    'text_response_quality': np.random.uniform(0.5, 1.0)
-                },
-                'text_analysis': {
-                    'sentiment_mean': np.random.uniform(-0.5, 0.5),
-                    'sentiment_variance': np.random.uniform(0.1, 0.4),
-                    'risk_keyword_count': np.random.randint(0, 5),
-                    'crisis_language_present': risk_level == 'crisis',
-                    'specific_incident_described': np.random.choice([True, False]),
-                    'emotional_intensity_score': np.random.uniform(0.0, 1.0),
-                    'category_signals': {str(j): np.random.uniform(0.0, 1.0) for j in range(1, 7)}
-                },
-                'risk_scores': {str(j): float(score) for j, score in enumerate(base_scores, 1)}
-            }
-            
-            training_data.append(data)
-        
-        return training_data
+        workload = generate_workload(num_samples)
+        return individual_training_records(workload['survey_responses'])
     
     def _generate_text_training_data(self, num_samples: int) -> List[Dict]:
         """Generate synthetic text training data"""
@@ -329,76 +395,37 @@ class HSEGMLPipeline:
         return training_data
     
     def _generate_organizational_training_data(self, num_orgs: int) -> List[Dict]:
-        """Generate synthetic organizational training data"""
-        training_data = []
+        """Generate synthetic organizational training data (orgs without responses are skipped)"""
+        workload = generate_workload(num_orgs * DEFAULT_RESPONSES_PER_ORG, n_orgs=num_orgs)
+        return organizational_training_records(workload)
+
+    @staticmethod
+    def _combined_response_text(response_data: Dict) -> str:
+        """A response's open-text answers joined into one text"""
+        text_responses = response_data.get('text_responses', {}) or {}
+        return ' '.join([str(text) for text in text_responses.values() if text])
+    
+    def _analyze_response_text(self, response_data: Dict) -> Dict[str, Any]:
+        """Run text risk analysis over a response's open-text answers"""
+        combined_text = self._combined_response_text(response_data)
         
-        for i in range(num_orgs):
-            # Generate organization info
-            domain = np.random.choice(['Healthcare', 'University', 'Business'])
-            employee_count = np.random.randint(50, 2000)
-            
-            # Generate individual predictions for this org
-            num_responses = np.random.randint(20, 100)
-            individual_preds = []
-            
-            # Set org risk level
-            org_risk = np.random.choice(['crisis', 'at_risk', 'mixed', 'safe'], p=[0.2, 0.3, 0.3, 0.2])
-            
-            for j in range(num_responses):
-                if org_risk == 'crisis':
-                    overall_score = np.random.uniform(7, 12)
-                elif org_risk == 'at_risk':
-                    overall_score = np.random.uniform(13, 16)
-                elif org_risk == 'mixed':
-                    overall_score = np.random.uniform(17, 20)
-                else:
-                    overall_score = np.random.uniform(21, 28)
-                
-                individual_pred = {
-                    'response_id': f'org_{i}_resp_{j}',
-                    'overall_hseg_score': overall_score,
-                    'overall_risk_tier': org_risk.replace('_', ' ').title(),
-                    'category_scores': {
-                        k: max(1.0, min(4.0, overall_score/7 + np.random.normal(0, 0.3)))
-                        for k in range(1, 7)
-                    },
-                    'confidence_score': np.random.uniform(0.7, 0.95),
-                    'demographics': {
-                        'age_range': np.random.choice(['25-34', '35-44', '45-54']),
-                        'gender_identity': np.random.choice(['Man', 'Woman']),
-                        'tenure_range': np.random.choice(['1-3_years', '4-7_years']),
-                        'position_level': np.random.choice(['Entry', 'Mid', 'Senior']),
-                        'department': np.random.choice(['Dept_A', 'Dept_B', 'Dept_C'])
-                    }
-                }
-                individual_preds.append(individual_pred)
-            
-            # Generate targets
-            overall_score_mean = np.mean([p['overall_hseg_score'] for p in individual_preds])
-            
-            org_data = {
-                'organization_info': {
-                    'org_id': f'org_{i:03d}',
-                    'org_name': f'Organization {i+1}',
-                    'domain': domain,
-                    'employee_count': employee_count,
-                    'founded_year': np.random.randint(1990, 2020),
-                    'is_public_company': np.random.choice([True, False])
-                },
-                'individual_predictions': individual_preds,
-                'targets': {
-                    'overall_hseg_score': overall_score_mean,
-                    'risk_tier': org_risk.replace('_', ' ').title(),
-                    'predicted_turnover_rate': max(0.0, min(1.0, 
-                        0.5 - (overall_score_mean - 17.5) / 35 + np.random.normal(0, 0.1))),
-                    'predicted_legal_risk': max(0.0, min(1.0,
-                        0.3 - (overall_score_mean - 17.5) / 50 + np.random.normal(0, 0.05)))
-                }
-            }
-            
-            training_data.append(org_data)
+        text_analysis = {}
+        if combined_text.strip():
+            text_analysis = self.text_analysis_cache.analyze([combined_text])[0]
         
-        return training_data
+        return text_analysis
+    
+    def _analyze_response_texts(self, responses: List[Dict]) -> List[Dict[str, Any]]:
+        """Text risk analysis for many responses; texts missing from the cache go through one batched call"""
+        combined_texts = [self._combined_response_text(response_data) for response_data in responses]
+        with_text = [i for i, text in enumerate(combined_texts) if text.strip()]
+        
+        text_analyses: List[Dict[str, Any]] = [{} for _ in responses]
+        if with_text:
+            batch = self.text_analysis_cache.analyze([combined_texts[i] for i in with_text])
+            for i, text_analysis in zip(with_text, batch):
+                text_analyses[i] = text_analysis
+        return text_analyses
     
     async def predict_individual_risk(self, response_data: Dict) -> Dict[str, Any]:
         """
@@ -407,24 +434,12 @@ class HSEGMLPipeline:
         start_time = datetime.now()
         
         try:
-            # Extract text responses if available
-            text_responses = response_data.get('text_responses', {})
-            
-            # Analyze text if present
-            text_analysis = {}
-            if text_responses:
-                combined_text = ' '.join([
-                    str(text) for text in text_responses.values() if text
-                ])
-                
-                if combined_text.strip():
-                    text_analysis = self.text_classifier.predict_text_risk(combined_text)
-            
-            # Add text analysis to response data
+            # Analyze text if present and add it to response data
+            text_analysis = self._analyze_response_text(response_data)
             response_data['text_analysis'] = text_analysis
             
             # Predict individual risk
-            individual_prediction = self.individual_model.predict(response_data)
+            individual_prediction = self.individual_model.predict(response_data, score_cache=self.prediction_cache)
             
             # Combine predictions
             combined_prediction = {
@@ -453,6 +468,69 @@ class HSEGMLPipeline:
                 'processing_time_ms': (datetime.now() - start_time).total_seconds() * 1000
             }
     
+    async def predict_individual_risk_batch(self, responses: List[Dict],
+                                            include_feature_importance: bool = True,
+                                            text_analyses: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Predict individual psychological risk for many responses in one model pass
+        Returns one prediction (or error dict) per response, in input order
+        include_feature_importance=False drops the per-response importance block from bulk output
+        text_analyses, when given, are used instead of analyzing the responses' text again
+        """
+        start_time = datetime.now()
+        
+        try:
+            if text_analyses is None:
+                text_analyses = self._analyze_response_texts(responses)
+            for response_data, text_analysis in zip(responses, text_analyses):
+                response_data['text_analysis'] = text_analysis
+            
+            individual_predictions = self.individual_model.predict_batch(
+                responses, include_feature_importance=include_feature_importance,
+                score_cache=self.prediction_cache
+            )
+            
+            # Processing time is amortized across the batch
+            per_response_ms = (datetime.now() - start_time).total_seconds() * 1000 / max(len(responses), 1)
+            
+            combined_predictions = []
+            for response_data, text_analysis, individual_prediction in zip(
+                responses, text_analyses, individual_predictions
+            ):
+                if 'error' in individual_prediction:
+                    self.prediction_stats['failed_predictions'] += 1
+                    combined_predictions.append({**individual_prediction, 'processing_time_ms': per_response_ms})
+                    continue
+                
+                combined_prediction = {
+                    **individual_prediction,
+                    'text_risk_analysis': text_analysis,
+                    'processing_time_ms': per_response_ms
+                }
+                if not combined_prediction.get('response_id'):
+                    combined_prediction['response_id'] = response_data.get('response_id') or 'unknown'
+                
+                self.prediction_stats['total_predictions'] += 1
+                self.prediction_stats['successful_predictions'] += 1
+                combined_predictions.append(combined_prediction)
+            
+            return combined_predictions
+            
+        except Exception as e:
+            logger.error(f"Batch individual prediction failed: {e}")
+            self.prediction_stats['failed_predictions'] += len(responses)
+            
+            processing_time_ms = (datetime.now() - start_time).total_seconds() * 1000
+            return [
+                {
+                    'error': str(e),
+                    'response_id': response_data.get('response_id', 'unknown'),
+                    'prediction_timestamp': datetime.now().isoformat(),
+                    'processing_time_ms': processing_time_ms
+                }
+                for response_data in responses
+            ]
+    
     async def predict_organizational_risk(self, org_id: str, 
                                         individual_predictions: List[Dict],
                                         organization_info: Dict) -> Dict[str, Any]:
@@ -514,16 +592,16 @@ class HSEGMLPipeline:
                     'is_public_company': organization.is_public_company
                 }
                 
-                # Process individual responses
+                # Process individual responses in a single batch
                 individual_predictions = []
                 
-                for response in responses:
-                    # Prepare response data
-                    response_data = self._prepare_response_data(response, db)
-                    
-                    # Predict individual risk
-                    individual_pred = await self.predict_individual_risk(response_data)
-                    
+                response_batch = [self._prepare_response_data(response, db) for response in responses]
+                text_analyses = self._analyze_campaign_texts(responses, response_batch, db)
+                batch_predictions = await self.predict_individual_risk_batch(
+                    response_batch, include_feature_importance=False, text_analyses=text_analyses
+                )
+                
+                for response, individual_pred in zip(responses, batch_predictions):
                     if 'error' not in individual_pred:
                         individual_predictions.append(individual_pred)
                         
@@ -567,6 +645,31 @@ class HSEGMLPipeline:
                 'processing_time_ms': (datetime.now() - start_time).total_seconds() * 1000
             }
     
+    def _analyze_campaign_texts(self, responses: List[SurveyResponse], response_batch: List[Dict],
+                                db: Session) -> List[Dict[str, Any]]:
+        """
+        Text analyses of the responses' combined answers (the same text the API paths analyze);
+        each response stores the analysis of its combined answers and each OpenTextResponse row
+        that of its own answer, recomputed only when the text or classifier version changed
+        """
+        combined_texts = [self._combined_response_text(response_data) for response_data in response_batch]
+        with_text = [i for i, text in enumerate(combined_texts) if text.strip()]
+        
+        text_analyses: List[Dict[str, Any]] = [{} for _ in responses]
+        if with_text:
+            batch = self.text_analysis_cache.analyze_responses(
+                [combined_texts[i] for i in with_text],
+                [responses[i] for i in with_text]
+            )
+            for i, text_analysis in zip(with_text, batch):
+                text_analyses[i] = text_analysis
+            try:
+                db.commit()
+            except Exception as e:
+                logger.error(f"Error storing text analyses: {e}")
+                db.rollback()
+        return text_analyses
+    
     def _prepare_response_data(self, response: SurveyResponse, db: Session) -> Dict:
         """Prepare response data for ML prediction"""
         
@@ -702,10 +805,13 @@ class HSEGMLPipeline:
             'pipeline_ready': self.pipeline_ready,
             'models_loaded': self.models_loaded,
             'model_version': self.model_version,
+            'individual_backend': self.individual_model.get_model_info()['inference_backend'],
             'individual_model_trained': self.individual_model.is_trained,
             'text_classifier_trained': self.text_classifier.is_trained,
             'organizational_model_loaded': getattr(self.org_model, 'is_loaded', False),
             'performance_stats': self.prediction_stats,
+            'prediction_cache': self.prediction_cache.get_stats(),
+            'text_analysis_cache': self.text_analysis_cache.get_stats(),
             'model_info': {
                 'individual': self.individual_model.get_model_info(),
                 'text': self.text_classifier.get_model_info(),
@@ -826,6 +932,11 @@ async def predict_individual(response_data: Dict) -> Dict[str, Any]:
     """Predict individual risk using global pipeline"""
     return await pipeline.predict_individual_risk(response_data)
 
+async def predict_individual_batch(responses: List[Dict],
+                                   include_feature_importance: bool = True) -> List[Dict[str, Any]]:
+    """Predict individual risk for a batch of responses using global pipeline"""
+    return await pipeline.predict_individual_risk_batch(responses, include_feature_importance)
+
 async def predict_organization(org_id: str, individual_predictions: List[Dict], 
                              organization_info: Dict) -> Dict[str, Any]:
     """Predict organizational risk using global pipeline"""
@@ -864,6 +975,7 @@ __all__ = [
     'pipeline',
     'initialize_ml_pipeline',
     'predict_individual',
+    'predict_individual_batch',
     'predict_organization', 
     'process_campaign',
     'get_pipeline_status',
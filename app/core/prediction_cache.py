@@ -0,0 +1,91 @@
+"""
+HSEG Prediction Cache - Content-addressed LRU/TTL cache for model scores
+Entries are keyed by a stable digest of the extracted feature vector and the
+model version, so identical responses are scored once per loaded model
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+def feature_digest(features: np.ndarray, model_version: str) -> str:
+    """
+    Process-independent digest of one feature row
+    Uses the float32 bytes, so equal vectors always share a key across workers and restarts
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model_version.encode('utf-8'))
+    digest.update(np.ascontiguousarray(features, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with per-entry time-to-live
+    max_size=0 disables caching; ttl_seconds=0 keeps entries until evicted or cleared
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600.0):
+        self.max_size = max(int(max_size), 0)
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'flushes': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            value, stored_at = entry
+            if self.ttl_seconds and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        return [self.get(key) for key in keys]
+
+    def put(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        """Drop every entry (called whenever the models behind the keys change)"""
+        with self._lock:
+            self._entries.clear()
+            self.stats['flushes'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                **self.stats,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0
+            }
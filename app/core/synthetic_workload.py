@@ -0,0 +1,607 @@
+#!/usr/bin/env python3
+"""
+HSEG Synthetic Workload Generator - seedable, vectorized survey data at scale
+
+Organizations and their survey campaigns are drawn first; responses are then
+drawn in chunks, each chunk in one vectorized pass (risk levels, Likert answer
+matrix, demographics, template-based free text, response quality). Every
+organization has a climate tier that shifts its employees' risk levels, so
+org-level targets carry signal.
+
+Outputs:
+  parquet  organizations / survey_campaigns / survey_responses (final-dataset columns)
+  sqlite   rows for the tables in app.models.database_models
+  ndjson   one SurveyResponseData request body per line (/predict/individual)
+
+The same seed, sizes and chunk size always produce the same workload.
+
+Usage:
+  python -m app.core.synthetic_workload --responses 1000000 --format parquet --out data/synthetic
+  python -m app.core.synthetic_workload --responses 50000 --format sqlite --out database/load_test.db
+  python -m app.core.synthetic_workload --responses 10000 --format ndjson --out requests.ndjson --seed 7
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.scoring import CATEGORY_CONFIG, CATEGORY_WEIGHTS, NORMALIZED_MAX, NORMALIZED_MIN, \
+    THRESHOLDS_28, normalize_points_to_28
+
+DEFAULT_CHUNK_SIZE = 200000
+DEFAULT_RESPONSES_PER_ORG = 60
+MISSING_ANSWER_RATE = 0.02
+
+SURVEY_COLUMNS = [f'q{i}' for i in range(1, 23)]
+TEXT_COLUMNS = ['q23', 'q24', 'q25']
+# Category (0-based) of each of q1-q22, in question order
+QUESTION_CATEGORY = np.repeat(np.arange(len(CATEGORY_CONFIG)),
+                              [int(CATEGORY_CONFIG[c]['num_questions']) for c in sorted(CATEGORY_CONFIG)])
+
+DOMAINS = ['Healthcare', 'University', 'Business']
+ORG_TIERS = ['crisis', 'at_risk', 'mixed', 'safe']
+ORG_TIER_P = [0.2, 0.3, 0.3, 0.2]
+RISK_LEVELS = ['crisis', 'high', 'medium', 'low']
+# Chance of each response risk level (columns) within an org of each tier (rows)
+RISK_LEVEL_P = np.array([
+    [0.35, 0.35, 0.20, 0.10],
+    [0.15, 0.35, 0.35, 0.15],
+    [0.05, 0.20, 0.45, 0.30],
+    [0.02, 0.08, 0.30, 0.60],
+])
+# Range of the 1-4 category scores for each risk level
+SCORE_LOW = np.array([1.0, 1.5, 2.0, 2.5])
+SCORE_HIGH = np.array([2.0, 2.5, 3.0, 4.0])
+
+DEMOGRAPHIC_CHOICES = {
+    'age_range': (['18-24', '25-34', '35-44', '45-54', '55-64', '65+'], [0.12, 0.3, 0.25, 0.18, 0.12, 0.03]),
+    'gender_identity': (['Man', 'Woman', 'Non-binary', 'Prefer_not_to_say'], [0.47, 0.47, 0.03, 0.03]),
+    'ethnicity_group': (['White', 'Hispanic', 'Asian', 'Black', 'Mixed', 'Prefer_not_to_say'],
+                        [0.5, 0.17, 0.12, 0.12, 0.05, 0.04]),
+    'education_level': (['High_School', 'Associate', 'Bachelors', 'Graduate'], [0.2, 0.15, 0.4, 0.25]),
+    'tenure_range': (['<1_year', '1-3_years', '4-7_years', '8+_years'], [0.2, 0.35, 0.25, 0.2]),
+    'position_level': (['Entry', 'Mid', 'Senior', 'Executive'], [0.35, 0.4, 0.2, 0.05]),
+    'employment_status': (['Full_Time', 'Part_Time', 'Contract'], [0.8, 0.12, 0.08]),
+    'work_location': (['On_Site', 'Remote', 'Hybrid'], [0.5, 0.2, 0.3]),
+}
+DEPARTMENTS = {
+    'Healthcare': ['Nursing', 'Medicine', 'Administration', 'Support_Services', 'Pharmacy'],
+    'University': ['Faculty', 'Research', 'Administration', 'Student_Services', 'Facilities'],
+    'Business': ['Engineering', 'Sales', 'HR', 'Operations', 'Finance'],
+}
+# Chance of supervising others per position level
+SUPERVISES_P = np.array([0.05, 0.3, 0.7, 0.9])
+
+# Free text: an opening and a detail per risk level (crisis, high, medium, low) for each question
+TEXT_TEMPLATES = {
+    'q23': (
+        [["Remove the manager who", "Stop leadership that", "Fire the director who"],
+         ["Hold accountable the supervisors who", "Change how management", "Address the leaders who"],
+         ["Improve how management", "Make sure leadership", "Better support from people who"],
+         ["Keep the leaders who", "Nothing major, management", "Continue supporting the team that"]],
+        [["threatened me and covers up harassment.", "uses retaliation and bullying against anyone who speaks up.",
+          "created a toxic culture of abuse and discrimination."],
+         ["ignore complaints and play favorites.", "shut down feedback in meetings.",
+          "make people afraid of retaliation."],
+         ["communicates changes late.", "listens but rarely follows through.", "handles workload unevenly."],
+         ["listen and act on feedback.", "treats everyone fairly.", "makes time for every concern."]],
+    ),
+    'q24': (
+        [["I have had a breakdown because", "I can't sleep since", "I have severe depression now because"],
+         ["My anxiety has grown because", "I dread coming in because", "I feel burned out because"],
+         ["Some weeks are stressful because", "I feel tired at times because", "Stress is manageable although"],
+         ["My mental health is good because", "I feel supported because", "I rarely feel stressed because"]],
+        [["of the panic attacks and trauma from being bullied.", "harassment here made me think about self-harm.",
+          "the gaslighting left me destroyed."],
+         ["the pressure and hostility never let up.", "I am excluded from decisions.", "workloads keep growing."],
+         ["deadlines pile up.", "staffing is thin.", "priorities change often."],
+         ["workloads are realistic.", "my team looks out for each other.", "leave is encouraged."]],
+    ),
+    'q25': (
+        [["The only strength is", "Honestly nothing, except", "Hard to name one beyond"],
+         ["Some strength in", "A few things work, like", "Occasionally good"],
+         ["Generally good", "A real strength is", "We do well with"],
+         ["Excellent", "Our biggest strength is", "Outstanding"]],
+        [["a few coworkers who also feel violated.", "colleagues who survive the abuse together.",
+          "the patients or students, not the workplace."],
+         ["peer support among frontline staff.", "the benefits package.", "some team leads."],
+         ["collaboration within teams.", "flexible scheduling.", "training opportunities."],
+         ["psychological safety and open communication.", "respect and transparency.",
+          "mentoring and growth."]],
+    ),
+}
+# Share of respondents who answer each free-text question
+TEXT_RESPONSE_RATE = {'q23': 0.8, 'q24': 0.7, 'q25': 0.75}
+
+HEADQUARTERS = ['Austin, TX', 'Boston, MA', 'Chicago, IL', 'Denver, CO', 'Atlanta, GA',
+                'Seattle, WA', 'Phoenix, AZ', 'Columbus, OH', 'Nashville, TN', 'Portland, OR']
+INDUSTRY_CODES = {'Healthcare': ['6221', '6211', '6231'], 'University': ['6113', '6112'],
+                  'Business': ['5415', '5221', '4451', '3361', '5242']}
+CAMPAIGN_START = np.datetime64('2023-01-01T00:00:00')
+CAMPAIGN_SPAN_DAYS = 3 * 365
+CAMPAIGN_DAYS = (14, 45)
+
+
+def _pick(rng: np.random.Generator, values: List, size: int, p: Optional[List[float]] = None) -> np.ndarray:
+    """Vectorized categorical draw returning an object array"""
+    return np.array(values, dtype=object)[rng.choice(len(values), size=size, p=p)]
+
+
+def _rowwise_choice(rng: np.random.Generator, probabilities: np.ndarray) -> np.ndarray:
+    """One categorical draw per row of a probability matrix"""
+    cumulative = probabilities.cumsum(axis=1)
+    u = rng.random((len(probabilities), 1))
+    return np.minimum((u > cumulative).sum(axis=1), probabilities.shape[1] - 1)
+
+
+def generate_structure(n_orgs: int, campaigns_per_org: int = 1, seed: Optional[int] = None,
+                       id_prefix: str = 'syn') -> Dict[str, pd.DataFrame]:
+    """Organizations and survey campaigns (columns of the organizations / survey_campaigns tables)"""
+    rng = np.random.default_rng(seed)
+    org_index = np.arange(n_orgs)
+    domain = _pick(rng, DOMAINS, n_orgs)
+    industry = np.empty(n_orgs, dtype=object)
+    for name, codes in INDUSTRY_CODES.items():
+        mask = domain == name
+        industry[mask] = _pick(rng, codes, int(mask.sum()))
+
+    organizations = pd.DataFrame({
+        'org_id': np.char.add(f'{id_prefix}_org_', np.char.zfill(org_index.astype(str), 6)).astype(object),
+        'org_name': np.char.add('Organization ', (org_index + 1).astype(str)).astype(object),
+        'domain': domain,
+        'industry_code': industry,
+        'employee_count': np.clip(rng.lognormal(6.0, 1.2, n_orgs), 20, 50000).astype(np.int64),
+        'headquarters_location': _pick(rng, HEADQUARTERS, n_orgs),
+        'founded_year': rng.integers(1950, 2021, n_orgs),
+        'is_public_company': rng.random(n_orgs) < 0.3,
+        'climate': _pick(rng, ORG_TIERS, n_orgs, p=ORG_TIER_P),
+    })
+
+    n_campaigns = n_orgs * campaigns_per_org
+    campaign_org = np.repeat(org_index, campaigns_per_org)
+    wave = np.tile(np.arange(campaigns_per_org), n_orgs)
+    start = CAMPAIGN_START + (rng.random(n_campaigns) * CAMPAIGN_SPAN_DAYS * 86400).astype('timedelta64[s]')
+    duration = rng.integers(CAMPAIGN_DAYS[0], CAMPAIGN_DAYS[1] + 1, n_campaigns).astype('timedelta64[D]')
+    campaigns = pd.DataFrame({
+        'campaign_id': np.char.add(np.char.add(organizations['org_id'].to_numpy()[campaign_org].astype(str), '_c'),
+                                   (wave + 1).astype(str)).astype(object),
+        'org_id': organizations['org_id'].to_numpy()[campaign_org],
+        'campaign_name': np.char.add('Wave ', (wave + 1).astype(str)).astype(object),
+        'survey_type': np.where(wave == 0, 'Full_Assessment', 'Pulse_Survey').astype(object),
+        'start_date': start,
+        'end_date': start + duration,
+        'target_sample_size': np.maximum(organizations['employee_count'].to_numpy()[campaign_org] // 2, 5),
+        'survey_method': 'Anonymous',
+        'status': 'Completed',
+    })
+    return {'organizations': organizations, 'survey_campaigns': campaigns}
+
+
+def _free_text(rng: np.random.Generator, question: str, level: np.ndarray) -> np.ndarray:
+    """Template text for one question; None where the respondent left it blank"""
+    openings, details = TEXT_TEMPLATES[question]
+    n = len(level)
+    flat_openings = np.array([o for group in openings for o in group], dtype=object)
+    flat_details = np.array([d for group in details for d in group], dtype=object)
+    opening_offset = np.cumsum([0] + [len(g) for g in openings])[:-1]
+    detail_offset = np.cumsum([0] + [len(g) for g in details])[:-1]
+    opening_count = np.array([len(g) for g in openings])
+    detail_count = np.array([len(g) for g in details])
+
+    first = opening_offset[level] + (rng.random(n) * opening_count[level]).astype(np.int64)
+    second = detail_offset[level] + (rng.random(n) * detail_count[level]).astype(np.int64)
+    text = flat_openings[first] + ' ' + flat_details[second]
+    text[rng.random(n) >= TEXT_RESPONSE_RATE[question]] = None
+    return text
+
+
+def generate_responses(structure: Dict[str, pd.DataFrame], n: int, seed=None,
+                       start_index: int = 0, id_prefix: str = 'syn') -> pd.DataFrame:
+    """
+    One chunk of responses in the final dataset's flat layout (q1-q25, demographic columns,
+    organization_name/domain/employee_count) plus ids, quality fields and ground truth
+    (risk_level, risk_score_1..6)
+    """
+    rng = np.random.default_rng(seed)
+    organizations, campaigns = structure['organizations'], structure['survey_campaigns']
+    campaigns_per_org = len(campaigns) // len(organizations)
+
+    # Larger organizations contribute more responses (sublinearly, so small ones still reach a sample)
+    employees = organizations['employee_count'].to_numpy(dtype=np.float64)
+    org = rng.choice(len(organizations), size=n, p=np.sqrt(employees) / np.sqrt(employees).sum())
+    campaign = org * campaigns_per_org + rng.integers(campaigns_per_org, size=n)
+    tier = pd.Categorical(organizations['climate'], categories=ORG_TIERS).codes[org]
+    level = _rowwise_choice(rng, RISK_LEVEL_P[tier])
+
+    # Category scores, then each answer around its category's score
+    low, high = SCORE_LOW[level][:, None], SCORE_HIGH[level][:, None]
+    category_scores = np.clip(low + (high - low) * rng.random((n, len(CATEGORY_CONFIG)))
+                              + rng.normal(0, 0.2, (n, len(CATEGORY_CONFIG))), 1.0, 4.0)
+    answers = np.clip(np.rint(category_scores[:, QUESTION_CATEGORY] + rng.normal(0, 0.5, (n, len(SURVEY_COLUMNS)))),
+                      1.0, 4.0)
+    straight_line = rng.random(n) < 0.03
+    answers[straight_line] = answers[straight_line, :1]
+    answers[rng.random(answers.shape) < MISSING_ANSWER_RATE] = np.nan
+
+    frame = pd.DataFrame(answers, columns=SURVEY_COLUMNS)
+    for question in TEXT_COLUMNS:
+        frame[question] = _free_text(rng, question, level)
+
+    domain = organizations['domain'].to_numpy()[org]
+    for col, (values, p) in DEMOGRAPHIC_CHOICES.items():
+        frame[col] = _pick(rng, values, n, p=p)
+    department = np.empty(n, dtype=object)
+    for name, values in DEPARTMENTS.items():
+        mask = domain == name
+        department[mask] = _pick(rng, values, int(mask.sum()))
+    frame['department'] = department
+    position = pd.Categorical(frame['position_level'], categories=DEMOGRAPHIC_CHOICES['position_level'][0]).codes
+    frame['supervises_others'] = rng.random(n) < SUPERVISES_P[position]
+
+    start = campaigns['start_date'].to_numpy()[campaign]
+    span = (campaigns['end_date'].to_numpy()[campaign] - start).astype('timedelta64[s]').astype(np.int64)
+    frame['response_id'] = np.char.add(f'{id_prefix}_resp_',
+                                       np.char.zfill(np.arange(start_index, start_index + n).astype(str), 9)).astype(object)
+    frame['org_id'] = organizations['org_id'].to_numpy()[org]
+    frame['campaign_id'] = campaigns['campaign_id'].to_numpy()[campaign]
+    frame['organization_name'] = organizations['org_name'].to_numpy()[org]
+    frame['domain'] = domain
+    frame['employee_count'] = employees[org].astype(np.int64)
+    frame['response_timestamp'] = start + (rng.random(n) * span).astype('timedelta64[s]')
+    frame['completion_time_seconds'] = rng.integers(120, 900, n)
+    frame['response_quality_score'] = np.round(rng.uniform(0.6, 1.0, n), 3)
+    frame['attention_check_passed'] = rng.random(n) < 0.95
+    frame['straight_line_response'] = straight_line
+    frame['risk_level'] = np.array(RISK_LEVELS, dtype=object)[level]
+    for cid in range(len(CATEGORY_CONFIG)):
+        frame[f'risk_score_{cid + 1}'] = category_scores[:, cid]
+    return frame
+
+
+def iter_workload(n_responses: int, n_orgs: Optional[int] = None, campaigns_per_org: int = 1,
+                  seed: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  id_prefix: str = 'syn') -> Iterator[Dict[str, pd.DataFrame]]:
+    """
+    Yield the structure first ({'organizations', 'survey_campaigns'}), then {'survey_responses'} chunks
+    Chunks draw from independent child seeds, so memory is bounded by chunk_size
+    """
+    n_orgs = n_orgs or max(n_responses // DEFAULT_RESPONSES_PER_ORG, 1)
+    structure_seed, response_seed = np.random.SeedSequence(seed).spawn(2)
+    structure = generate_structure(n_orgs, campaigns_per_org, seed=structure_seed, id_prefix=id_prefix)
+    yield structure
+
+    starts = range(0, n_responses, chunk_size)
+    for start, chunk_seed in zip(starts, response_seed.spawn(len(starts))):
+        yield {'survey_responses': generate_responses(structure, min(chunk_size, n_responses - start),
+                                                      seed=chunk_seed, start_index=start, id_prefix=id_prefix)}
+
+
+def generate_workload(n_responses: int, n_orgs: Optional[int] = None, campaigns_per_org: int = 1,
+                      seed: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      id_prefix: str = 'syn') -> Dict[str, pd.DataFrame]:
+    """Whole workload in memory: organizations, survey_campaigns and survey_responses frames"""
+    parts = iter_workload(n_responses, n_orgs, campaigns_per_org, seed, chunk_size, id_prefix)
+    workload = dict(next(parts))
+    chunks = [part['survey_responses'] for part in parts]
+    workload['survey_responses'] = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    return workload
+
+
+def overall_hseg_scores(category_scores: np.ndarray) -> np.ndarray:
+    """28-point overall scores for an (n, 6) matrix of 1-4 category scores"""
+    weights = np.array([CATEGORY_WEIGHTS[c] for c in sorted(CATEGORY_WEIGHTS)])
+    return np.clip(normalize_points_to_28(category_scores @ weights), NORMALIZED_MIN, NORMALIZED_MAX)
+
+
+def risk_tiers(overall: np.ndarray) -> np.ndarray:
+    """RiskTier values for 28-point scores"""
+    bounds = [THRESHOLDS_28['crisis_max'], THRESHOLDS_28['at_risk_max'],
+              THRESHOLDS_28['mixed_max'], THRESHOLDS_28['safe_max']]
+    tiers = np.array(['Crisis', 'At_Risk', 'Mixed', 'Safe', 'Thriving'], dtype=object)
+    return tiers[np.searchsorted(bounds, overall, side='left')]
+
+
+# ---------------------------------------------------------------------------
+# Training records (the shapes HSEGMLPipeline trains on)
+# ---------------------------------------------------------------------------
+
+def individual_training_records(responses: pd.DataFrame, seed: Optional[int] = None) -> List[Dict]:
+    """IndividualRiskPredictor.train records: API-shaped responses with text_analysis and risk_scores"""
+    rng = np.random.default_rng(seed)
+    n = len(responses)
+    crisis = (responses['risk_level'] == 'crisis').to_numpy()
+    text_analysis = pd.DataFrame({
+        'sentiment_mean': rng.uniform(-0.5, 0.5, n) - 0.3 * crisis,
+        'sentiment_variance': rng.uniform(0.1, 0.4, n),
+        'risk_keyword_count': rng.integers(0, 3, n) + 2 * crisis,
+        'crisis_language_present': crisis,
+        'specific_incident_described': rng.random(n) < 0.5,
+        'emotional_intensity_score': np.clip(rng.uniform(0.0, 0.8, n) + 0.2 * crisis, 0.0, 1.0),
+    }).to_dict('records')
+    signals = pd.DataFrame(rng.random((n, 6)), columns=[str(c) for c in range(1, 7)]).to_dict('records')
+    risk_scores = (responses[[f'risk_score_{c}' for c in range(1, 7)]]
+                   .set_axis([str(c) for c in range(1, 7)], axis=1).to_dict('records'))
+    text_quality = rng.uniform(0.5, 1.0, n)
+
+    records = []
+    for i, request in enumerate(iter_api_requests(responses)):
+        request['survey_responses'] = {q: request['survey_responses'].get(q, 2.5) for q in SURVEY_COLUMNS}
+        request['response_quality']['text_response_quality'] = float(text_quality[i])
+        request['text_analysis'] = {**text_analysis[i], 'category_signals': signals[i]}
+        request['risk_scores'] = risk_scores[i]
+        records.append(request)
+    return records
+
+
+def organizational_training_records(workload: Dict[str, pd.DataFrame], seed: Optional[int] = None) -> List[Dict]:
+    """Organizational training records: organization_info, individual_predictions and targets per org"""
+    rng = np.random.default_rng(seed)
+    organizations, responses = workload['organizations'], workload['survey_responses']
+    category_scores = responses[[f'risk_score_{c}' for c in range(1, 7)]].to_numpy()
+    overall = overall_hseg_scores(category_scores)
+    predictions = pd.DataFrame({
+        'response_id': responses['response_id'].to_numpy(),
+        'overall_hseg_score': overall,
+        'overall_risk_tier': risk_tiers(overall),
+        'category_scores': pd.DataFrame(category_scores, columns=range(1, 7)).to_dict('records'),
+        'confidence_score': rng.uniform(0.7, 0.95, len(responses)),
+        'demographics': responses[['age_range', 'gender_identity', 'tenure_range', 'position_level',
+                                   'department']].to_dict('records'),
+    })
+    by_org = dict(list(predictions.groupby(responses['org_id'].to_numpy(), sort=False)))
+
+    records = []
+    for org in organizations.itertuples(index=False):
+        group = by_org.get(org.org_id)
+        if group is None:
+            continue
+        mean_score = float(group['overall_hseg_score'].mean())
+        records.append({
+            'organization_info': {
+                'org_id': org.org_id, 'org_name': org.org_name, 'domain': org.domain,
+                'employee_count': int(org.employee_count), 'founded_year': int(org.founded_year),
+                'is_public_company': bool(org.is_public_company),
+            },
+            'individual_predictions': group.to_dict('records'),
+            'targets': {
+                'overall_hseg_score': mean_score,
+                'risk_tier': str(risk_tiers(np.array([mean_score]))[0]),
+                'predicted_turnover_rate': float(np.clip(0.5 - (mean_score - 17.5) / 35 + rng.normal(0, 0.1), 0.0, 1.0)),
+                'predicted_legal_risk': float(np.clip(0.3 - (mean_score - 17.5) / 50 + rng.normal(0, 0.05), 0.0, 1.0)),
+            },
+        })
+    return records
+
+
+# ---------------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------------
+
+DEMOGRAPHIC_COLUMNS = ['age_range', 'gender_identity', 'ethnicity_group', 'education_level', 'tenure_range',
+                       'position_level', 'department', 'supervises_others', 'employment_status', 'work_location']
+QUALITY_COLUMNS = ['completion_time_seconds', 'response_quality_score', 'attention_check_passed',
+                   'straight_line_response']
+
+
+def iter_api_requests(responses: pd.DataFrame) -> Iterator[Dict]:
+    """SurveyResponseData bodies: unanswered questions and blank free text are left out"""
+    survey = responses[SURVEY_COLUMNS].to_numpy()
+    answered = ~np.isnan(survey)
+    text = responses[TEXT_COLUMNS].to_numpy(dtype=object)
+    text = np.where(pd.isna(text), None, text)
+    demographics = responses[DEMOGRAPHIC_COLUMNS].to_dict('records')
+    quality = responses[QUALITY_COLUMNS].to_dict('records')
+    for i, (response_id, domain) in enumerate(zip(responses['response_id'], responses['domain'])):
+        yield {
+            'response_id': response_id,
+            'domain': domain,
+            'survey_responses': {q: float(survey[i, j]) for j, q in enumerate(SURVEY_COLUMNS) if answered[i, j]},
+            'text_responses': {q.upper(): text[i, j] for j, q in enumerate(TEXT_COLUMNS) if text[i, j] is not None},
+            'demographics': {k: (bool(v) if k == 'supervises_others' else v) for k, v in demographics[i].items()},
+            'response_quality': {
+                'completion_time_seconds': int(quality[i]['completion_time_seconds']),
+                'response_quality_score': float(quality[i]['response_quality_score']),
+                'attention_check_passed': bool(quality[i]['attention_check_passed']),
+                'straight_line_response': bool(quality[i]['straight_line_response']),
+            },
+        }
+
+
+def write_ndjson(parts: Iterator[Dict[str, pd.DataFrame]], path: str) -> Dict[str, int]:
+    """One /predict/individual request body per line"""
+    rows = 0
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for part in parts:
+            if 'survey_responses' not in part:
+                continue
+            f.writelines(json.dumps(request, separators=(',', ':')) + '\n'
+                         for request in iter_api_requests(part['survey_responses']))
+            rows += len(part['survey_responses'])
+    os.replace(tmp_path, path)
+    return {'survey_responses': rows}
+
+
+def write_parquet(parts: Iterator[Dict[str, pd.DataFrame]], out_dir: str) -> Dict[str, int]:
+    """<table>.parquet per frame; responses are appended chunk by chunk as row groups"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(out_dir, exist_ok=True)
+    counts: Dict[str, int] = {}
+    writer, schema = None, None
+    try:
+        for part in parts:
+            for table_name, frame in part.items():
+                path = os.path.join(out_dir, f'{table_name}.parquet')
+                if table_name != 'survey_responses':
+                    frame.to_parquet(path, index=False)
+                    counts[table_name] = len(frame)
+                    continue
+                if writer is None:
+                    inferred = pa.Schema.from_pandas(frame, preserve_index=False)
+                    # Free-text columns may be entirely blank in a chunk; pin them to string
+                    schema = pa.schema([pa.field(f.name, pa.string()) if f.name in TEXT_COLUMNS else f
+                                        for f in inferred])
+                    writer = pq.ParquetWriter(path, schema)
+                writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+                counts[table_name] = counts.get(table_name, 0) + len(frame)
+    finally:
+        if writer is not None:
+            writer.close()
+    return counts
+
+
+# Tables of app.models.database_models filled by write_sqlite (created from the models when missing)
+SQLITE_TABLES = ['organizations', 'survey_campaigns', 'survey_responses', 'respondent_demographics',
+                 'question_responses', 'open_text_responses']
+# SQLAlchemy's Enum columns persist member names
+ENUM_NAMES = {
+    'domain': {'Healthcare': 'HEALTHCARE', 'University': 'UNIVERSITY', 'Business': 'BUSINESS'},
+    'survey_type': {'Full_Assessment': 'FULL_ASSESSMENT', 'Pulse_Survey': 'PULSE_SURVEY', 'Follow_Up': 'FOLLOW_UP'},
+    'status': {'Planning': 'PLANNING', 'Active': 'ACTIVE', 'Completed': 'COMPLETED', 'Cancelled': 'CANCELLED'},
+}
+
+
+def _sqlite_datetimes(values: pd.Series) -> np.ndarray:
+    """datetime64 values in SQLAlchemy's SQLite storage format"""
+    return pd.to_datetime(values).dt.strftime('%Y-%m-%d %H:%M:%S.%f').to_numpy(dtype=object)
+
+
+def _insert(conn: sqlite3.Connection, table: str, frame: pd.DataFrame):
+    placeholders = ', '.join('?' for _ in frame.columns)
+    # itertuples yields numpy scalars; object columns keep them as Python values sqlite3 accepts
+    rows = frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+    conn.executemany(f"INSERT INTO {table} ({', '.join(frame.columns)}) VALUES ({placeholders})", rows)
+
+
+def _sqlite_rows(part: Dict[str, pd.DataFrame], question_ids: Dict[str, int]) -> Dict[str, pd.DataFrame]:
+    """Table name -> rows to insert, in database_models column names and storage formats"""
+    tables: Dict[str, pd.DataFrame] = {}
+    if 'organizations' in part:
+        orgs = part['organizations']
+        tables['organizations'] = orgs.drop(columns=['climate']).assign(
+            domain=orgs['domain'].map(ENUM_NAMES['domain']),
+            is_public_company=orgs['is_public_company'].astype(int),
+        )
+    if 'survey_campaigns' in part:
+        campaigns = part['survey_campaigns']
+        tables['survey_campaigns'] = campaigns.assign(
+            survey_type=campaigns['survey_type'].map(ENUM_NAMES['survey_type']),
+            status=campaigns['status'].map(ENUM_NAMES['status']),
+            start_date=_sqlite_datetimes(campaigns['start_date']),
+            end_date=_sqlite_datetimes(campaigns['end_date']),
+        )
+    if 'survey_responses' in part:
+        responses = part['survey_responses']
+        tables['survey_responses'] = pd.DataFrame({
+            'response_id': responses['response_id'],
+            'campaign_id': responses['campaign_id'],
+            'org_id': responses['org_id'],
+            'response_timestamp': _sqlite_datetimes(responses['response_timestamp']),
+            'completion_time_seconds': responses['completion_time_seconds'],
+            'response_quality_score': responses['response_quality_score'],
+            'attention_check_passed': responses['attention_check_passed'].astype(int),
+            'straight_line_response': responses['straight_line_response'].astype(int),
+            'survey_version': 'v1.0',
+        })
+        tables['respondent_demographics'] = responses[['response_id'] + DEMOGRAPHIC_COLUMNS].assign(
+            supervises_others=responses['supervises_others'].astype(int))
+
+        # Long format, only for questions defined in survey_questions
+        codes = [q for q in SURVEY_COLUMNS if q.upper() in question_ids]
+        if codes:
+            answers = responses[['response_id'] + codes].melt(id_vars='response_id', var_name='code',
+                                                              value_name='normalized_score').dropna()
+            tables['question_responses'] = pd.DataFrame({
+                'response_id': answers['response_id'],
+                'question_id': answers['code'].str.upper().map(question_ids),
+                'raw_response': answers['normalized_score'].astype(int).astype(str),
+                'normalized_score': answers['normalized_score'],
+            })
+        texts = responses[['response_id'] + TEXT_COLUMNS].melt(id_vars='response_id', var_name='code',
+                                                               value_name='response_text').dropna()
+        tables['open_text_responses'] = pd.DataFrame({
+            'response_id': texts['response_id'],
+            'question_code': texts['code'].str.upper(),
+            'response_text': texts['response_text'],
+            'text_length': texts['response_text'].str.len(),
+        })
+    return tables
+
+
+def _create_sqlite_tables(db_path: str):
+    """Create the SQLITE_TABLES missing from db_path with the database_models schema"""
+    # Imported here so the parquet/ndjson writers do not need SQLAlchemy
+    from sqlalchemy import create_engine
+    from app.models.database_models import Base
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    try:
+        Base.metadata.create_all(engine, tables=[Base.metadata.tables[name] for name in SQLITE_TABLES])
+    finally:
+        engine.dispose()
+
+
+def write_sqlite(parts: Iterator[Dict[str, pd.DataFrame]], db_path: str) -> Dict[str, int]:
+    """
+    Append the workload to the database_models tables of a SQLite database
+    question_responses only covers questions that exist in survey_questions (see create_database)
+    """
+    _create_sqlite_tables(db_path)
+    conn = sqlite3.connect(db_path)
+    counts: Dict[str, int] = {}
+    try:
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        try:
+            question_ids = {code.upper(): qid for qid, code in
+                            conn.execute("SELECT question_id, question_code FROM survey_questions")}
+        except sqlite3.OperationalError:
+            question_ids = {}
+        if not question_ids:
+            print("Warning: survey_questions is empty or missing; question_responses will not be written")
+
+        for part in parts:
+            with conn:
+                for table, frame in _sqlite_rows(part, question_ids).items():
+                    _insert(conn, table, frame)
+                    counts[table] = counts.get(table, 0) + len(frame)
+    finally:
+        conn.close()
+    return counts
+
+
+WRITERS = {'parquet': write_parquet, 'sqlite': write_sqlite, 'ndjson': write_ndjson}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a seedable synthetic HSEG survey workload')
+    parser.add_argument('--responses', type=int, required=True, help='Number of survey responses')
+    parser.add_argument('--orgs', type=int, default=None,
+                        help=f'Number of organizations (default: responses / {DEFAULT_RESPONSES_PER_ORG})')
+    parser.add_argument('--campaigns-per-org', type=int, default=1)
+    parser.add_argument('--format', choices=sorted(WRITERS), default='parquet')
+    parser.add_argument('--out', required=True, help='Directory (parquet), database file (sqlite) or file (ndjson)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--id-prefix', default='syn', help='Prefix of generated ids (keeps runs apart in one database)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    parts = iter_workload(args.responses, args.orgs, args.campaigns_per_org, args.seed, args.chunk_size,
+                          args.id_prefix)
+    counts = WRITERS[args.format](parts, args.out)
+    seconds = time.perf_counter() - start
+    print(f"Wrote {args.format} workload to {args.out} in {seconds:.1f}s: "
+          + ', '.join(f'{table}={rows}' for table, rows in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
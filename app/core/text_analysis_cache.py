@@ -0,0 +1,158 @@
+"""
+HSEG Text Analysis Cache - Two-tier cache for open-text risk analysis
+Analyses are keyed by a digest of the normalized text and the classifier version. An
+in-memory LRU serves repeated texts (boilerplate answers like "N/A" are analyzed once);
+each OpenTextResponse row keeps the analysis of its own answer and each SurveyResponse the
+analysis of its combined answers, so re-processing a campaign only analyzes responses that
+are new or changed
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.prediction_cache import PredictionCache
+from app.models.keyword_matcher import normalize_text
+
+
+def text_digest(text: str, classifier_version: str) -> str:
+    """Digest of normalized text, so answers differing only in case, symbols or spacing share a key"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(classifier_version.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_text(text).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def classifier_version(classifier, artifact_digest: Optional[str] = None) -> str:
+    """
+    Version tag of the analyses a classifier produces: model version, active backend,
+    a digest of its keyword lists and, when a model file is loaded, the file's digest
+    """
+    if classifier.model is not None:
+        backend = 'transformer-int8' if classifier.quantized else 'transformer-fp32'
+    elif classifier.sklearn_pipeline is not None:
+        backend = 'sklearn'
+    else:
+        backend = 'rules'
+    rules = hashlib.blake2b(repr(classifier.keyword_matcher.groups).encode('utf-8'), digest_size=4).hexdigest()
+    version = f"{classifier.model_version}:{backend}-{rules}"
+    return f"{version}:{artifact_digest[:12]}" if artifact_digest else version
+
+
+class TextAnalysisCache:
+    """
+    Runs TextRiskClassifier.batch_predict only for texts missing from both tiers
+    Analyses are returned as shallow copies, so callers may add keys without touching the cache;
+    fields describing the input itself (text lengths) are recomputed for each caller's text
+    """
+
+    def __init__(self, classifier, max_size: int = 10000, ttl_seconds: float = 3600.0):
+        self.classifier = classifier
+        self.memory = PredictionCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.version = classifier_version(classifier)
+        self.stats = {'analyzed': 0, 'deduplicated': 0, 'stored_hits': 0, 'stored_writes': 0}
+
+    def reset(self, artifact_digest: Optional[str] = None):
+        """Re-read the classifier version after its model changed and drop in-memory analyses"""
+        self.version = classifier_version(self.classifier, artifact_digest)
+        self.memory.clear()
+
+    def _for_text(self, analysis: Dict[str, Any], text: str) -> Dict[str, Any]:
+        """Copy of a shared analysis with the per-input fields of text"""
+        analysis = dict(analysis)
+        if 'error' not in analysis:
+            analysis['text_length'] = len(text)
+            analysis['processed_text_length'] = len(self.classifier.preprocess_text(text))
+        return analysis
+
+    def analyze(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Analyses of texts in input order; identical normalized texts are analyzed once"""
+        keys = [text_digest(text, self.version) for text in texts]
+        analyses: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        for i, (key, cached) in enumerate(zip(keys, self.memory.get_many(keys))):
+            if cached is not None:
+                analyses[i] = self._for_text(cached, texts[i])
+            else:
+                pending.setdefault(key, []).append(i)
+
+        if pending:
+            batch = self.classifier.batch_predict([texts[positions[0]] for positions in pending.values()])
+            self.stats['analyzed'] += len(pending)
+            for (key, positions), analysis in zip(pending.items(), batch):
+                self.stats['deduplicated'] += len(positions) - 1
+                # Errors are not cached, so the next request retries them
+                if 'error' not in analysis:
+                    self.memory.put(key, analysis)
+                for i in positions:
+                    analyses[i] = self._for_text(analysis, texts[i])
+        return analyses
+
+    def analyze_responses(self, texts: List[str], responses: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Analyses of responses' combined answer texts, in input order; responses are the
+        SurveyResponse rows the texts were built from. A response (and each of its OpenTextResponse
+        rows) that stores the digest of its current text and classifier version keeps its stored
+        analysis; the rest are analyzed in one batch (identical texts once) and their analysis
+        columns updated (the caller commits)
+        """
+        stale_rows = []
+        for response in responses:
+            for row in response.text_responses:
+                if not (row.response_text and row.response_text.strip()):
+                    continue
+                key = text_digest(row.response_text, self.version)
+                if row.text_digest == key and row.ai_model_version == self.version and row.ai_analysis:
+                    self.memory.put(key, row.ai_analysis)
+                    self.stats['stored_hits'] += 1
+                else:
+                    stale_rows.append(row)
+
+        analyses: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        stale = []
+        for i, (text, response) in enumerate(zip(texts, responses)):
+            key = text_digest(text, self.version)
+            if response.text_analysis_digest == key and response.text_analysis:
+                self.memory.put(key, response.text_analysis)
+                self.stats['stored_hits'] += 1
+                analyses[i] = self._for_text(response.text_analysis, text)
+            else:
+                stale.append(i)
+
+        if stale_rows or stale:
+            # One batch, so a single-answer response's combined text shares its row's analysis
+            batch = self.analyze([row.response_text for row in stale_rows] + [texts[i] for i in stale])
+            processed_at = datetime.now()
+            for row, analysis in zip(stale_rows, batch):
+                if 'error' not in analysis:
+                    self._store(row, analysis, processed_at)
+            for i, analysis in zip(stale, batch[len(stale_rows):]):
+                if 'error' not in analysis:
+                    responses[i].text_analysis = analysis
+                    responses[i].text_analysis_digest = text_digest(texts[i], self.version)
+                    self.stats['stored_writes'] += 1
+                analyses[i] = analysis
+        return analyses
+
+    def _store(self, row: Any, analysis: Dict[str, Any], processed_at: datetime):
+        """
+        Write the analysis of a row's answer into its analysis columns: sentiment, keywords,
+        risk level and category tags, plus the full analysis for reuse
+        """
+        keywords = [keyword for category_keywords in analysis['risk_keywords'].values()
+                    for keyword in category_keywords]
+        keywords += analysis['crisis_detection']['crisis_keywords']
+        row.text_length = len(row.response_text)
+        row.sentiment_score = analysis['sentiment_analysis']['sentiment_score']
+        row.risk_keywords = list(dict.fromkeys(keywords))
+        row.ai_risk_classification = analysis['overall_risk_level']
+        row.ai_category_tags = list(analysis['risk_keywords'])
+        row.ai_analysis = analysis
+        row.ai_model_version = self.version
+        row.text_digest = text_digest(row.response_text, self.version)
+        row.processed_at = processed_at
+        self.stats['stored_writes'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'version': self.version, 'memory': self.memory.get_stats(), **self.stats}
@@ -102,6 +102,8 @@ class SurveyResponse(Base):
     ip_address_hash = Column(String(64))  # Anonymized for duplicate detection
     user_agent_hash = Column(String(64))
     survey_version = Column(String(10), default="v1.0")
+    text_analysis = Column(JSON)  # TextRiskClassifier output for the combined answers
+    text_analysis_digest = Column(String(32))  # Digest of the normalized combined answers + classifier version
     
     # Relationships
     campaign = relationship("SurveyCampaign", back_populates="responses")
@@ -202,6 +204,9 @@ class OpenTextResponse(Base):
     risk_keywords = Column(JSON)  # ["panic attacks", "threatened", "retaliation"]
     ai_risk_classification = Column(String(20))  # Low, Medium, High, Critical
     ai_category_tags = Column(JSON)  # ["power_abuse", "mental_health"]
+    ai_analysis = Column(JSON)  # TextRiskClassifier output for this answer
+    ai_model_version = Column(String(64))  # Classifier version that produced the analysis
+    text_digest = Column(String(32))  # Digest of the normalized answer + classifier version
     processed_at = Column(DateTime)
     
     # Relationships
@@ -0,0 +1,79 @@
+"""
+HSEG Ensemble Containers - Weighted, fold-averaged and stacked ensembles used by the
+Individual Risk Model; complements sklearn's VotingRegressor for layouts it cannot express
+"""
+
+import numpy as np
+from typing import Any, Dict, List, Tuple
+
+
+class MultiOutputEnsemble:
+    """
+    Weighted average of multi-output regressors
+    Every member predicts all targets in one pass; weights are per member and per target
+    """
+
+    def __init__(self, estimators: List[Tuple[str, Any]], weights: np.ndarray = None):
+        self.estimators = estimators
+        n_members = len(estimators)
+        # weights: (n_members x n_targets); None means equal weighting
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64).reshape(n_members, -1)
+
+    @property
+    def named_estimators_(self) -> Dict[str, Any]:
+        return dict(self.estimators)
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'MultiOutputEnsemble':
+        for _, estimator in self.estimators:
+            estimator.fit(X, y)
+        return self
+
+    def predict_members(self, X: np.ndarray) -> np.ndarray:
+        """Stacked member predictions: (n_members x n_samples x n_targets)"""
+        preds = [np.asarray(estimator.predict(X), dtype=np.float64) for _, estimator in self.estimators]
+        return np.stack([p.reshape(X.shape[0], -1) for p in preds])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        member_preds = self.predict_members(X)
+        if self.weights is None:
+            return member_preds.mean(axis=0)
+        weights = self.weights / self.weights.sum(axis=0, keepdims=True)
+        return np.einsum('mnt,mt->nt', member_preds, weights)
+
+
+class FoldAveragedRegressor:
+    """
+    Mean of the models fitted on each cross-validation fold
+    Used as an ensemble member in place of a refit on the full training set
+    """
+
+    def __init__(self, estimators: List[Any]):
+        self.estimators_ = list(estimators)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.mean([np.asarray(estimator.predict(X), dtype=np.float64) for estimator in self.estimators_], axis=0)
+
+
+class StackedEnsemble:
+    """
+    Linear stacker over member predictions, fitted on out-of-fold predictions
+    coef: (n_members x n_targets), intercept: (n_targets,); single-target stacks predict 1-D
+    """
+
+    def __init__(self, estimators: List[Tuple[str, Any]], coef: np.ndarray, intercept: np.ndarray):
+        self.estimators = estimators
+        self.coef = np.asarray(coef, dtype=np.float64).reshape(len(estimators), -1)
+        self.intercept = np.asarray(intercept, dtype=np.float64).reshape(-1)
+
+    @property
+    def named_estimators_(self) -> Dict[str, Any]:
+        return dict(self.estimators)
+
+    def predict_members(self, X: np.ndarray) -> np.ndarray:
+        """Stacked member predictions: (n_members x n_samples x n_targets)"""
+        preds = [np.asarray(estimator.predict(X), dtype=np.float64) for _, estimator in self.estimators]
+        return np.stack([p.reshape(X.shape[0], -1) for p in preds])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        stacked = np.einsum('mnt,mt->nt', self.predict_members(X), self.coef) + self.intercept
+        return stacked[:, 0] if stacked.shape[1] == 1 else stacked
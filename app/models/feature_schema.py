@@ -0,0 +1,258 @@
+"""
+HSEG Feature Schema - Declared feature layout for the Individual Risk Model
+Each feature names its source path, encoding and default; the schema is compiled
+into a columnar extractor shared by training and serving
+"""
+
+import math
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """Declaration of a single model input column"""
+    name: str
+    source: Tuple[str, ...]
+    encoding: str = 'numeric'  # numeric | category | flag | hash_bucket | contains_any | clipped_linear
+    default: Any = 0.0
+    categories: Dict[str, int] = field(default_factory=dict)
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+QUESTION_LABELS = [
+    'Safe_Speaking', 'Leadership_Silencing', 'Fear_Consequences', 'Domain_Specific',
+    'Fair_Treatment', 'Equal_Access', 'Exclusion_Witnessed',
+    'Emotional_Manipulation', 'Forced_Positivity', 'Wellbeing_Respected',
+    'Transparent_Handling', 'Fair_Investigations', 'Open_Information', 'Action_On_Reports',
+    'Work_Anxiety', 'Work_Hopelessness', 'Burnout_Level', 'Emotional_Support',
+    'Input_Valued', 'Work_Autonomy', 'Concerns_Dismissed', 'Empowered_Improvement'
+]
+
+
+# Marks a key absent from its record (distinct from a stored None)
+_ABSENT = object()
+
+
+def _is_missing(value: Any) -> bool:
+    """An absent key, None and NaN fall back to the declared default"""
+    return value is _ABSENT or value is None or (isinstance(value, float) and math.isnan(value))
+
+
+# Quantitative Survey Responses (22 features)
+_SURVEY_FEATURES = [
+    FeatureSpec(f'Q{q}_{label}', ('survey_responses', f'q{q}'), 'numeric', 2.5)
+    for q, label in enumerate(QUESTION_LABELS, 1)
+]
+
+# Demographic Features (11 features)
+_DEMOGRAPHIC_FEATURES = [
+    FeatureSpec('Age_Range', ('demographics', 'age_range'), 'category', 1,
+                {'18-24': 0, '25-34': 1, '35-44': 2, '45-54': 3, '55-64': 4, '65+': 5}),
+    FeatureSpec('Gender_Identity', ('demographics', 'gender_identity'), 'category', 3,
+                {'Man': 0, 'Woman': 1, 'Non-binary': 2, 'Prefer_not_to_say': 3}),
+    FeatureSpec('Tenure_Range', ('demographics', 'tenure_range'), 'category', 1,
+                {'<1_year': 0, '1-3_years': 1, '4-7_years': 2, '8+_years': 3}),
+    FeatureSpec('Position_Level', ('demographics', 'position_level'), 'category', 1,
+                {'Entry': 0, 'Mid': 1, 'Senior': 2, 'Executive': 3}),
+    FeatureSpec('Department', ('demographics', 'department'), 'hash_bucket', 'Other',
+                params={'buckets': 10}),
+    FeatureSpec('Supervises_Others', ('demographics', 'supervises_others'), 'flag', False),
+    FeatureSpec('Work_Location', ('demographics', 'work_location'), 'category', 0,
+                {'On_Site': 0, 'Remote': 1, 'Hybrid': 2}),
+    FeatureSpec('Employment_Status', ('demographics', 'employment_status'), 'category', 0,
+                {'Full_Time': 0, 'Part_Time': 1, 'Contract': 2, 'Intern': 3}),
+    FeatureSpec('Education_Level', ('demographics', 'education_level'), 'category', 2,
+                {'High_School': 0, 'Some_College': 1, 'Bachelors': 2, 'Graduate': 3}),
+    FeatureSpec('Ethnicity_Diverse', ('demographics', 'ethnicity_group'), 'contains_any', '',
+                params={'tokens': (',', 'Multiracial')}),
+    FeatureSpec('Domain', ('domain',), 'category', 2,
+                {'Healthcare': 0, 'University': 1, 'Business': 2}),
+]
+
+# Response Quality Features (5 features)
+_QUALITY_FEATURES = [
+    FeatureSpec('Completion_Time_Normalized', ('response_quality', 'completion_time_seconds'),
+                'clipped_linear', 300, params={'offset': 120, 'scale': 600}),  # 2-10 minutes
+    FeatureSpec('Response_Quality_Score', ('response_quality', 'response_quality_score'), 'numeric', 0.8),
+    FeatureSpec('Attention_Check_Passed', ('response_quality', 'attention_check_passed'), 'flag', True),
+    FeatureSpec('Straight_Line_Response', ('response_quality', 'straight_line_response'), 'flag', False),
+    FeatureSpec('Text_Response_Quality', ('response_quality', 'text_response_quality'), 'numeric', 0.5),
+]
+
+# Text-Derived Features (12 features)
+_TEXT_FEATURES = [
+    FeatureSpec('Text_Sentiment_Mean', ('text_analysis', 'sentiment_mean'), 'numeric', 0.0),
+    FeatureSpec('Text_Sentiment_Variance', ('text_analysis', 'sentiment_variance'), 'numeric', 0.1),
+    FeatureSpec('Text_Risk_Keyword_Count', ('text_analysis', 'risk_keyword_count'), 'numeric', 0),
+    FeatureSpec('Text_Crisis_Language', ('text_analysis', 'crisis_language_present'), 'flag', False),
+    FeatureSpec('Text_Specific_Incident', ('text_analysis', 'specific_incident_described'), 'flag', False),
+    FeatureSpec('Text_Emotional_Intensity', ('text_analysis', 'emotional_intensity_score'), 'numeric', 0.0),
+] + [
+    FeatureSpec(f'Text_Category_{cat_id}_Signal', ('text_analysis', 'category_signals', str(cat_id)),
+                'numeric', 0.0)
+    for cat_id in range(1, 7)
+]
+
+INDIVIDUAL_FEATURE_SCHEMA: List[FeatureSpec] = (
+    _SURVEY_FEATURES + _DEMOGRAPHIC_FEATURES + _QUALITY_FEATURES + _TEXT_FEATURES
+)
+
+
+class FeatureExtractor:
+    """
+    Compiled batch extractor for a feature schema
+    Fills a preallocated float32 matrix column by column from dicts or a DataFrame
+    """
+
+    def __init__(self, schema: Sequence[FeatureSpec]):
+        self.schema = list(schema)
+        self.feature_names = [spec.name for spec in self.schema]
+        self._encoders = [self._compile(spec) for spec in self.schema]
+
+    @property
+    def n_features(self) -> int:
+        return len(self.schema)
+
+    def transform(self, records: Union[List[Dict], pd.DataFrame]) -> np.ndarray:
+        """
+        Extract an (n x features) float32 matrix
+        Raises on the first value that cannot be encoded
+        """
+        if isinstance(records, pd.DataFrame):
+            return self._transform_frame(records)
+        return self._transform_records(records)
+
+    def transform_valid(self, records: List[Dict]) -> Tuple[np.ndarray, List[int], Dict[int, str]]:
+        """
+        Extract rows that can be encoded and report the ones that cannot
+        Returns: (matrix of valid rows, valid row indices, {row index: error})
+        """
+        try:
+            return self._transform_records(records), list(range(len(records))), {}
+        except Exception:
+            pass
+
+        # Slow path only when the batch contains a malformed record
+        rows, valid_idx, errors = [], [], {}
+        for i, record in enumerate(records):
+            try:
+                rows.append(self._transform_records([record]))
+                valid_idx.append(i)
+            except Exception as e:
+                errors[i] = str(e)
+
+        matrix = np.vstack(rows) if rows else np.empty((0, self.n_features), dtype=np.float32)
+        return matrix, valid_idx, errors
+
+    def _transform_records(self, records: List[Dict]) -> np.ndarray:
+        out = np.empty((len(records), self.n_features), dtype=np.float32)
+        parents: Dict[Tuple[str, ...], List[Any]] = {(): records}
+
+        for j, spec in enumerate(self.schema):
+            parent_path, key = spec.source[:-1], spec.source[-1]
+            containers = self._resolve(parents, parent_path)
+            values = [c.get(key, _ABSENT) for c in containers]
+            out[:, j] = self._encoders[j](values)
+
+        return out
+
+    def _resolve(self, parents: Dict[Tuple[str, ...], List[Any]], path: Tuple[str, ...]) -> List[Any]:
+        """Resolve (and memoize) the nested dicts holding a feature's value"""
+        if path not in parents:
+            outer = self._resolve(parents, path[:-1])
+            parents[path] = [(c.get(path[-1]) or {}) for c in outer]
+        return parents[path]
+
+    def _transform_frame(self, frame: pd.DataFrame) -> np.ndarray:
+        out = np.empty((len(frame), self.n_features), dtype=np.float32)
+
+        for j, spec in enumerate(self.schema):
+            column = self._frame_column(frame, spec)
+            if column is None:
+                out[:, j] = self._encoders[j]([_ABSENT])[0]
+            elif spec.encoding == 'numeric' and pd.api.types.is_numeric_dtype(column.dtype):
+                out[:, j] = column.fillna(spec.default).to_numpy(dtype=np.float32)
+            elif spec.encoding == 'category':
+                # Categorical codes index a lookup table; unknown and missing values (-1) hit the default
+                codes = pd.Categorical(column, categories=list(spec.categories)).codes
+                lookup = np.array(list(spec.categories.values()) + [spec.default], dtype=np.float32)
+                out[:, j] = lookup[codes]
+            elif spec.encoding == 'clipped_linear' and pd.api.types.is_numeric_dtype(column.dtype):
+                offset, scale = spec.params['offset'], spec.params['scale']
+                scaled = (column.fillna(spec.default).to_numpy(dtype=np.float64) - offset) / scale
+                out[:, j] = np.clip(scaled, 0.0, 1.0)
+            else:
+                out[:, j] = self._encode_distinct(j, column)
+
+        return out
+
+    def _encode_distinct(self, j: int, column: pd.Series) -> np.ndarray:
+        """
+        Run the value-list encoder once per distinct value and broadcast it back by code
+        Null cells are stored values, not absent keys: each is encoded as the record path encodes it
+        (a flag maps None to 0 and NaN to 1), and only a missing column falls back to the default
+        """
+        codes, uniques = pd.factorize(column, use_na_sentinel=True)
+        encoded = np.empty(len(column), dtype=np.float32)
+        nulls = codes < 0
+        encoded[~nulls] = np.asarray(self._encoders[j](list(uniques)), dtype=np.float32)[codes[~nulls]]
+        if nulls.any():
+            encoded[nulls] = self._encoders[j](column[nulls].tolist())
+        return encoded
+
+    @staticmethod
+    def _frame_column(frame: pd.DataFrame, spec: FeatureSpec) -> Optional[pd.Series]:
+        """Match a feature to a flattened ('survey_responses.q1') or flat ('q1') column"""
+        for name in ('.'.join(spec.source), spec.source[-1]):
+            if name in frame.columns:
+                return frame[name]
+        return None
+
+    def _compile(self, spec: FeatureSpec):
+        """Build the value-list encoder for one feature"""
+        default = spec.default
+
+        if spec.encoding == 'numeric':
+            return lambda values: [default if _is_missing(v) else float(v) for v in values]
+
+        if spec.encoding == 'category':
+            mapping = spec.categories
+            return lambda values: [mapping.get(v, default) for v in values]
+
+        if spec.encoding == 'flag':
+            # Python truthiness of the stored value, as the model was trained: None encodes 0 and any
+            # non-empty string (including 'false') 1; the default applies only when the key is absent
+            return lambda values: [
+                1.0 if (default if v is _ABSENT else v) else 0.0 for v in values
+            ]
+
+        if spec.encoding == 'hash_bucket':
+            # CRC32 rather than hash(): str hashes are salted per process (PYTHONHASHSEED)
+            buckets = spec.params['buckets']
+            return lambda values: [
+                zlib.crc32(str(default if _is_missing(v) else v).encode('utf-8')) % buckets for v in values
+            ]
+
+        if spec.encoding == 'contains_any':
+            tokens = spec.params['tokens']
+            return lambda values: [
+                1.0 if any(t in str(default if _is_missing(v) else v) for t in tokens) else 0.0
+                for v in values
+            ]
+
+        if spec.encoding == 'clipped_linear':
+            offset, scale = spec.params['offset'], spec.params['scale']
+            return lambda values: [
+                min(max(((default if _is_missing(v) else float(v)) - offset) / scale, 0.0), 1.0)
+                for v in values
+            ]
+
+        raise ValueError(f"Unknown feature encoding: {spec.encoding}")
+
+
+INDIVIDUAL_FEATURE_EXTRACTOR = FeatureExtractor(INDIVIDUAL_FEATURE_SCHEMA)
@@ -0,0 +1,305 @@
+"""
+HSEG Flat Artifact - Memory-mappable storage for the Individual Risk Model
+Tree arrays, MLP weights, scaler parameters and ensemble weights are written as
+flat little-endian buffers inside a single .npy file and scored directly from a
+read-only memory map, so every worker process shares the same page-cache pages
+instead of holding its own unpickled copy of the ensemble
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.onnx_backend import MEMBER_NAMES, NUM_CATEGORIES, _ensemble_members, _xgboost_trees
+
+FLAT_FORMAT = 'hseg-flat-v1'
+# Buffer offsets are aligned so every array view is aligned for its dtype (and cache lines)
+_ALIGNMENT = 64
+# Leading bytes holding the manifest length
+_HEADER_BYTES = 8
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class _BufferWriter:
+    """Collects named arrays and assigns their aligned offsets in the data section"""
+
+    def __init__(self):
+        self.arrays: List[Tuple[str, np.ndarray]] = []
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self.size = 0
+
+    def add(self, name: str, array: np.ndarray, dtype: str) -> str:
+        array = np.ascontiguousarray(array, dtype=np.dtype(dtype))
+        self.size = _align(self.size)
+        self.index[name] = {'offset': self.size, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+        self.arrays.append((name, array))
+        self.size += array.nbytes
+        return name
+
+
+def _concat_trees(trees: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Concatenate trees into one node table; child ids become global, leaves keep -1"""
+    parts = {key: [] for key in ('left', 'right', 'feature', 'threshold', 'default_left', 'value')}
+    roots, offset = [], 0
+    for tree in trees:
+        n_nodes = len(tree['left'])
+        roots.append(offset)
+        for side in ('left', 'right'):
+            children = np.asarray(tree[side], dtype=np.int64)
+            parts[side].append(np.where(children >= 0, children + offset, -1))
+        parts['feature'].append(np.where(np.asarray(tree['left']) >= 0, tree['feature'], 0))
+        parts['threshold'].append(tree['threshold'])
+        parts['default_left'].append(tree['default_left'])
+        parts['value'].append(tree['leaf_values'])
+        offset += n_nodes
+    table = {key: np.concatenate(values) for key, values in parts.items()}
+    table['roots'] = np.asarray(roots, dtype=np.int64)
+    return table
+
+
+def _random_forest_trees(estimator) -> List[Dict[str, np.ndarray]]:
+    trees = []
+    for tree_model in estimator.estimators_:
+        tree = tree_model.tree_
+        trees.append({
+            'left': tree.children_left,
+            'right': tree.children_right,
+            'feature': tree.feature,
+            'threshold': tree.threshold,
+            'default_left': np.ones(tree.node_count, dtype=np.int64),
+            'leaf_values': tree.value[:, :, 0].reshape(tree.node_count, -1),
+        })
+    return trees
+
+
+def save_flat_model(predictor, filepath: str, source_digest: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Write a trained IndividualRiskPredictor as one memory-mappable .npy file
+    Returns: the manifest stored at the start of the file
+    """
+    if not predictor.is_trained or not predictor.models:
+        raise ValueError("Model must be trained before saving a flat artifact")
+
+    members, weights, intercept = _ensemble_members(predictor)
+    scaler = predictor.scalers['features']
+    writer = _BufferWriter()
+
+    blocks = []
+    for name in ('xgb', 'rf'):
+        for i, (target_ids, estimator, scale) in enumerate(members[name]):
+            prefix = f'{name}/{i}'
+            if name == 'xgb':
+                trees, base_score = _xgboost_trees(estimator)
+                # XGBoost compares float32 features against float32 thresholds (x < threshold)
+                threshold_dtype, value_dtype = '<f4', '<f4'
+            else:
+                trees, base_score = _random_forest_trees(estimator), np.zeros(len(target_ids))
+                # sklearn compares float32 features against float64 thresholds (x <= threshold)
+                threshold_dtype, value_dtype = '<f8', '<f8'
+                scale = scale / len(estimator.estimators_)
+            table = _concat_trees(trees)
+            blocks.append({
+                'member': name,
+                'target_ids': list(target_ids),
+                'scale': float(scale),
+                'base': [float(v) * scale if name == 'xgb' else 0.0 for v in base_score],
+                'arrays': {
+                    'roots': writer.add(f'{prefix}/roots', table['roots'], '<i4'),
+                    'left': writer.add(f'{prefix}/left', table['left'], '<i4'),
+                    'right': writer.add(f'{prefix}/right', table['right'], '<i4'),
+                    'feature': writer.add(f'{prefix}/feature', table['feature'], '<i4'),
+                    'threshold': writer.add(f'{prefix}/threshold', table['threshold'], threshold_dtype),
+                    'default_left': writer.add(f'{prefix}/default_left', table['default_left'], '|b1'),
+                    'value': writer.add(f'{prefix}/value', table['value'], value_dtype),
+                }
+            })
+
+    mlps = []
+    for i, (target_ids, estimator, scale) in enumerate(members['nn']):
+        if estimator.activation != 'relu':
+            raise ValueError(f"Unsupported MLP activation for flat artifact: {estimator.activation}")
+        mlps.append({
+            'target_ids': list(target_ids),
+            'scale': float(scale),
+            'coefs': [writer.add(f'nn/{i}/coef{j}', coef, '<f8') for j, coef in enumerate(estimator.coefs_)],
+            'intercepts': [writer.add(f'nn/{i}/intercept{j}', b, '<f8')
+                           for j, b in enumerate(estimator.intercepts_)],
+        })
+
+    importances = {
+        category: {member: writer.add(f'importance/{category}/{member}', values, '<f8')
+                   for member, values in per_member.items()}
+        for category, per_member in predictor.feature_importances.items()
+    }
+
+    manifest = {
+        'format': FLAT_FORMAT,
+        'arrays': writer.index,
+        'scaler': {
+            'mean': writer.add('scaler/mean', scaler.mean_, '<f8'),
+            'scale': writer.add('scaler/scale', scaler.scale_, '<f8'),
+        },
+        'weights': writer.add('ensemble/weights', weights, '<f8'),
+        'intercept': writer.add('ensemble/intercept', intercept, '<f8'),
+        'tree_blocks': blocks,
+        'mlps': mlps,
+        'feature_importances': importances,
+        'metadata': {
+            'model_version': predictor.model_version,
+            'model_layout': predictor.model_layout,
+            'ensemble_strategy': predictor.ensemble_strategy,
+            'feature_names': list(predictor.feature_names),
+            'category_weights': {str(k): v for k, v in predictor.category_weights.items()},
+            'risk_thresholds_28': predictor.risk_thresholds_28,
+            'update_history': predictor.update_history,
+            'rf_compaction': predictor.rf_compaction,
+            'member_selection': predictor.member_selection,
+        }
+    }
+    if source_digest:
+        # Ties the flat artifact to the pickle it was written alongside
+        manifest['metadata']['source_sha256'] = source_digest
+
+    manifest_bytes = json.dumps(manifest, default=float).encode('utf-8')
+    data_start = _align(_HEADER_BYTES + len(manifest_bytes))
+
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+    buffer = np.lib.format.open_memmap(filepath, mode='w+', dtype=np.uint8, shape=(data_start + writer.size,))
+    buffer[:_HEADER_BYTES] = np.array([len(manifest_bytes)], dtype='<u8').view(np.uint8)
+    buffer[_HEADER_BYTES:_HEADER_BYTES + len(manifest_bytes)] = np.frombuffer(manifest_bytes, np.uint8)
+    for name, array in writer.arrays:
+        start = data_start + writer.index[name]['offset']
+        buffer[start:start + array.nbytes] = array.reshape(-1).view(np.uint8)
+    buffer.flush()
+    del buffer
+
+    print(f"Flat model saved to {filepath}")
+    return manifest
+
+
+def _predict_trees(block: Dict[str, Any], features: np.ndarray) -> np.ndarray:
+    """Sum of leaf values over every tree of a block, walking all (row, tree) pairs level by level"""
+    left, right = block['left'], block['right']
+    feature, threshold, default_left = block['feature'], block['threshold'], block['default_left']
+    roots = block['roots']
+    n_rows, n_trees = features.shape[0], len(roots)
+
+    node = np.tile(roots, n_rows).astype(np.int64)
+    rows = np.repeat(np.arange(n_rows), n_trees)
+    active = np.flatnonzero(left[node] >= 0)
+    strict = block['member'] == 'xgb'
+    while active.size:
+        current = node[active]
+        x = features[rows[active], feature[current]]
+        go_left = x < threshold[current] if strict else x <= threshold[current]
+        missing = np.isnan(x)
+        if missing.any():
+            go_left = np.where(missing, default_left[current], go_left)
+        node[active] = np.where(go_left, left[current], right[current])
+        active = active[left[node[active]] >= 0]
+
+    leaf_values = block['value'][node].reshape(n_rows, n_trees, -1)
+    return leaf_values.sum(axis=1, dtype=np.float64)
+
+
+def _read_manifest(buffer: np.ndarray) -> Tuple[Dict[str, Any], int]:
+    """Manifest of a flat artifact buffer and the length of its encoded form"""
+    manifest_length = int(buffer[:_HEADER_BYTES].view('<u8')[0])
+    manifest = json.loads(buffer[_HEADER_BYTES:_HEADER_BYTES + manifest_length].tobytes())
+    if manifest.get('format') != FLAT_FORMAT:
+        raise ValueError(f"Unsupported flat artifact format: {manifest.get('format')}")
+    return manifest, manifest_length
+
+
+def read_flat_metadata(filepath: str) -> Dict[str, Any]:
+    """Metadata of a flat artifact, read through a memory map without touching its arrays"""
+    manifest, _ = _read_manifest(np.load(filepath, mmap_mode='r').view(np.ndarray))
+    return manifest['metadata']
+
+
+class FlatIndividualScorer:
+    """
+    Scores (n x 50) feature matrices straight from a flat artifact
+    Drop-in replacement for the per-member sklearn calls in predict_category_scores
+    """
+
+    def __init__(self, filepath: str, mmap: bool = True):
+        self.filepath = filepath
+        self.mmap = mmap
+        # Plain ndarray view: slicing the np.memmap subclass adds overhead to every call
+        self._buffer = np.load(filepath, mmap_mode='r' if mmap else None).view(np.ndarray)
+        self.manifest, manifest_length = _read_manifest(self._buffer)
+        self._data_start = _align(_HEADER_BYTES + manifest_length)
+        self.metadata = self.manifest['metadata']
+
+        self.scaler_mean = self.array(self.manifest['scaler']['mean'])
+        self.scaler_scale = self.array(self.manifest['scaler']['scale'])
+        self.weights = self.array(self.manifest['weights'])
+        self.intercept = self.array(self.manifest['intercept'])
+        self.tree_blocks = [
+            {**{key: block[key] for key in ('member', 'target_ids', 'scale')},
+             'base': np.asarray(block['base'], dtype=np.float64),
+             **{key: self.array(name) for key, name in block['arrays'].items()}}
+            for block in self.manifest['tree_blocks']
+        ]
+        self.mlps = [
+            {'target_ids': mlp['target_ids'], 'scale': mlp['scale'],
+             'coefs': [self.array(name) for name in mlp['coefs']],
+             'intercepts': [self.array(name) for name in mlp['intercepts']]}
+            for mlp in self.manifest['mlps']
+        ]
+
+    def array(self, name: str) -> np.ndarray:
+        """Zero-copy view of one stored array"""
+        spec = self.manifest['arrays'][name]
+        dtype = np.dtype(spec['dtype'])
+        start = self._data_start + spec['offset']
+        count = int(np.prod(spec['shape'], dtype=np.int64))
+        return self._buffer[start:start + count * dtype.itemsize].view(dtype).reshape(spec['shape'])
+
+    def feature_importances(self) -> Dict[str, Dict[str, np.ndarray]]:
+        return {category: {member: np.array(self.array(name)) for member, name in per_member.items()}
+                for category, per_member in self.manifest['feature_importances'].items()}
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """(n x 50) features -> (n x 6) raw category scores"""
+        # Scale in float64 exactly like StandardScaler.transform; trees see the float32 values
+        scaled_64 = (np.asarray(features, dtype=np.float64) - self.scaler_mean) / self.scaler_scale
+        scaled_32 = scaled_64.astype(np.float32)
+
+        member_scores = {name: np.zeros((scaled_64.shape[0], NUM_CATEGORIES)) for name in MEMBER_NAMES}
+        for block in self.tree_blocks:
+            block_scores = _predict_trees(block, scaled_32) * block['scale'] + block['base']
+            member_scores[block['member']][:, block['target_ids']] += block_scores
+
+        for mlp in self.mlps:
+            activations = scaled_64
+            n_layers = len(mlp['coefs'])
+            for layer, (coef, intercept) in enumerate(zip(mlp['coefs'], mlp['intercepts'])):
+                activations = activations @ coef + intercept
+                if layer < n_layers - 1:
+                    np.maximum(activations, 0, out=activations)
+            member_scores['nn'][:, mlp['target_ids']] += activations * mlp['scale']
+
+        scores = np.tile(self.intercept, (scaled_64.shape[0], 1))
+        for row, name in enumerate(MEMBER_NAMES):
+            scores += member_scores[name] * self.weights[row]
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._buffer.nbytes)
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            'backend': 'flat_arrays',
+            'model_path': self.filepath,
+            'memory_mapped': self.mmap,
+            'artifact_bytes': self.nbytes,
+            'tree_blocks': len(self.tree_blocks),
+        }
@@ -7,11 +7,18 @@ import numpy as np
 import pandas as pd
 import joblib
 import json
-from typing import Dict, List, Tuple, Optional, Any
+import copy
+import re
+from typing import Dict, List, Tuple, Optional, Any, Union
 from datetime import datetime
+import time
 import warnings
 from pathlib import Path
 from app.core import scoring as HSEG_SCORING
+from app.models.feature_schema import INDIVIDUAL_FEATURE_EXTRACTOR
+from app.models.ensemble import MultiOutputEnsemble, FoldAveragedRegressor, StackedEnsemble
+from app.core.prediction_cache import PredictionCache, feature_digest
+from app.models import model_compaction
 
 # ML Libraries
 from sklearn.ensemble import RandomForestRegressor, VotingRegressor
@@ -19,6 +26,7 @@ from sklearn.neural_network import MLPRegressor
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+from sklearn.utils import Bunch
 import xgboost as xgb
 
 # Data Processing
@@ -34,139 +42,128 @@ class IndividualRiskPredictor:
     Uses ensemble of XGBoost + Neural Network + Random Forest
     """
     
-    def __init__(self, model_version: str = "v1.0.0"):
+    # Per-category risk levels on the 1.0-4.0 scale (upper bounds are exclusive)
+    CATEGORY_RISK_BOUNDS = [1.5, 2.5, 3.0, 3.5]
+    CATEGORY_RISK_LEVELS = ["Crisis", "At Risk", "Mixed", "Safe", "Thriving"]
+    
+    # Overall tiers, ordered to match the 28-point thresholds
+    OVERALL_RISK_TIERS = ["Crisis", "At Risk", "Mixed", "Safe", "Thriving"]
+    
+    RISK_FACTOR_NAMES = {
+        1: "Authority abuse and retaliation fears",
+        2: "Discrimination and exclusion experiences",
+        3: "Emotional manipulation and boundary violations",
+        4: "System accountability failures",
+        5: "Work-related mental health harm",
+        6: "Voice suppression and disempowerment"
+    }
+    
+    INTERVENTION_LIBRARY = {
+        1: {
+            'category': 'Power Abuse & Suppression',
+            'intervention': 'Management training on psychological safety',
+            'urgency': 'Immediate',
+            'effort': 'Medium',
+            'impact': 'High'
+        },
+        2: {
+            'category': 'Discrimination & Exclusion',
+            'intervention': 'DEI training and policy enforcement',
+            'urgency': 'High',
+            'effort': 'Medium',
+            'impact': 'High'
+        },
+        3: {
+            'category': 'Manipulative Work Culture',
+            'intervention': 'Culture alignment and values training',
+            'urgency': 'Medium',
+            'effort': 'Low',
+            'impact': 'Medium'
+        },
+        4: {
+            'category': 'Failure of Accountability',
+            'intervention': 'Investigation process overhaul',
+            'urgency': 'Immediate',
+            'effort': 'High',
+            'impact': 'High'
+        },
+        5: {
+            'category': 'Mental Health Harm',
+            'intervention': 'Employee assistance program expansion',
+            'urgency': 'Immediate',
+            'effort': 'Low',
+            'impact': 'High'
+        },
+        6: {
+            'category': 'Erosion of Voice & Autonomy',
+            'intervention': 'Employee empowerment initiatives',
+            'urgency': 'Medium',
+            'effort': 'Medium',
+            'impact': 'Medium'
+        }
+    }
+    
+    # per_category: one VotingRegressor per category (6 x 3 members)
+    # multi_output: one ensemble whose members predict all 6 categories in a single pass
+    MODEL_LAYOUTS = ('per_category', 'multi_output')
+    
+    # refit: KFold only estimates weights, members are refit on the full training set
+    # oof_average: the KFold models are kept and averaged; weights come from their out-of-fold error
+    # oof_stacking: as oof_average, with a non-negative linear stacker fitted on out-of-fold predictions
+    ENSEMBLE_STRATEGIES = ('refit', 'oof_average', 'oof_stacking')
+    
+    def __init__(self, model_version: str = "v1.0.0", model_layout: str = "per_category"):
+        if model_layout not in self.MODEL_LAYOUTS:
+            raise ValueError(f"Unknown model layout: {model_layout}. Expected one of {self.MODEL_LAYOUTS}")
         self.model_version = model_version
+        self.model_layout = model_layout
+        self.ensemble_strategy = 'refit'
+        # Incremental updates applied on top of the last full training run
+        self.update_history: List[Dict[str, Any]] = []
         self.models = {}
         self.scalers = {}
         self.encoders = {}
-        self.feature_names = []
+        # Declared feature layout shared by training and serving
+        self.feature_extractor = INDIVIDUAL_FEATURE_EXTRACTOR
+        self.feature_names = list(self.feature_extractor.feature_names)
         # HSEG scoring configuration (centralized)
         self.category_config = HSEG_SCORING.CATEGORY_CONFIG
         self.category_weights = HSEG_SCORING.CATEGORY_WEIGHTS
         self.risk_thresholds_28 = HSEG_SCORING.THRESHOLDS_28
         self.is_trained = False
+        # Optional onnxruntime scorer replacing the sklearn/XGBoost member calls
+        self.onnx_scorer = None
+        # Set when serving from a memory-mapped flat artifact (no fitted estimators in memory)
+        self.flat_scorer = None
+        # Per-category, per-member importance vectors, fixed for the life of the fitted models
+        self.feature_importances: Dict[str, Dict[str, np.ndarray]] = {}
+        self._feature_importance_summary: Dict = {}
+        # Approximate bytes per model key and member, refreshed whenever the members change
+        self.model_sizes: Dict[str, Dict[str, int]] = {}
+        # Chosen random-forest compaction (see compact_random_forests), None for full forests
+        self.rf_compaction: Optional[Dict[str, Any]] = None
+        # Latency-aware member subset chosen at training time (see _select_members), None when disabled
+        self.member_selection: Optional[Dict[str, Any]] = None
     
     def extract_features(self, response_data: Dict) -> np.ndarray:
         """
         Extract features from survey response data
-        Returns: Feature vector for ML prediction
+        Returns: (1 x 50) feature vector for ML prediction
         """
-        features = []
-        
-        # Quantitative Survey Responses (22 features)
-        survey_responses = response_data.get('survey_responses', {})
-        for q_num in range(1, 23):  # Q1 through Q22
-            q_key = f'q{q_num}'
-            score = survey_responses.get(q_key, 2.5)  # Default to neutral
-            features.append(float(score))
-        
-        # Demographic Features (11 features)
-        demographics = response_data.get('demographics', {})
-        
-        # Age range encoding (0-5)
-        age_mapping = {'18-24': 0, '25-34': 1, '35-44': 2, '45-54': 3, '55-64': 4, '65+': 5}
-        age_encoded = age_mapping.get(demographics.get('age_range', '25-34'), 1)
-        features.append(age_encoded)
-        
-        # Gender encoding (0-3)
-        gender_mapping = {'Man': 0, 'Woman': 1, 'Non-binary': 2, 'Prefer_not_to_say': 3}
-        gender_encoded = gender_mapping.get(demographics.get('gender_identity', 'Prefer_not_to_say'), 3)
-        features.append(gender_encoded)
-        
-        # Tenure encoding (0-3)
-        tenure_mapping = {'<1_year': 0, '1-3_years': 1, '4-7_years': 2, '8+_years': 3}
-        tenure_encoded = tenure_mapping.get(demographics.get('tenure_range', '1-3_years'), 1)
-        features.append(tenure_encoded)
-        
-        # Position level encoding (0-3)
-        position_mapping = {'Entry': 0, 'Mid': 1, 'Senior': 2, 'Executive': 3}
-        position_encoded = position_mapping.get(demographics.get('position_level', 'Mid'), 1)
-        features.append(position_encoded)
-        
-        # Department encoding (0-10, domain-specific)
-        department = demographics.get('department', 'Other')
-        dept_encoded = hash(department) % 10  # Simple hash-based encoding
-        features.append(dept_encoded)
-        
-        # Supervises others (0 or 1)
-        supervises = 1 if demographics.get('supervises_others', False) else 0
-        features.append(supervises)
-        
-        # Work location encoding (0-2)
-        location_mapping = {'On_Site': 0, 'Remote': 1, 'Hybrid': 2}
-        location_encoded = location_mapping.get(demographics.get('work_location', 'On_Site'), 0)
-        features.append(location_encoded)
-        
-        # Employment status encoding (0-3)
-        status_mapping = {'Full_Time': 0, 'Part_Time': 1, 'Contract': 2, 'Intern': 3}
-        status_encoded = status_mapping.get(demographics.get('employment_status', 'Full_Time'), 0)
-        features.append(status_encoded)
-        
-        # Education level encoding (0-3)
-        education_mapping = {'High_School': 0, 'Some_College': 1, 'Bachelors': 2, 'Graduate': 3}
-        education_encoded = education_mapping.get(demographics.get('education_level', 'Bachelors'), 2)
-        features.append(education_encoded)
-        
-        # Ethnicity diversity flag (0 or 1)
-        ethnicity = demographics.get('ethnicity_group', '')
-        is_diverse = 1 if ',' in ethnicity or 'Multiracial' in ethnicity else 0
-        features.append(is_diverse)
-        
-        # Domain encoding (0-2)
-        domain_mapping = {'Healthcare': 0, 'University': 1, 'Business': 2}
-        domain_encoded = domain_mapping.get(response_data.get('domain', 'Business'), 2)
-        features.append(domain_encoded)
-        
-        # Response Quality Features (5 features)
-        quality_data = response_data.get('response_quality', {})
-        
-        # Completion time normalized (0.0-1.0)
-        completion_time = quality_data.get('completion_time_seconds', 300)
-        completion_normalized = min(max((completion_time - 120) / 600, 0.0), 1.0)  # 2-10 minutes
-        features.append(completion_normalized)
-        
-        # Response quality score (0.0-1.0)
-        quality_score = quality_data.get('response_quality_score', 0.8)
-        features.append(quality_score)
-        
-        # Attention check passed (0 or 1)
-        attention_passed = 1 if quality_data.get('attention_check_passed', True) else 0
-        features.append(attention_passed)
-        
-        # Straight line response flag (0 or 1)
-        straight_line = 1 if quality_data.get('straight_line_response', False) else 0
-        features.append(straight_line)
-        
-        # Text response quality (0.0-1.0)
-        text_quality = quality_data.get('text_response_quality', 0.5)
-        features.append(text_quality)
-        
-        # Text-Derived Features (12 features)
-        text_analysis = response_data.get('text_analysis', {})
-        
-        # Sentiment features
-        features.append(text_analysis.get('sentiment_mean', 0.0))  # -1.0 to 1.0
-        features.append(text_analysis.get('sentiment_variance', 0.1))  # 0.0 to 1.0
-        
-        # Risk indicators
-        features.append(text_analysis.get('risk_keyword_count', 0))  # 0-N
-        features.append(1 if text_analysis.get('crisis_language_present', False) else 0)  # 0 or 1
-        features.append(1 if text_analysis.get('specific_incident_described', False) else 0)  # 0 or 1
-        features.append(text_analysis.get('emotional_intensity_score', 0.0))  # 0.0-1.0
-        
-        # Category-specific text signals (6 features)
-        text_categories = text_analysis.get('category_signals', {})
-        for cat_id in range(1, 7):
-            cat_signal = text_categories.get(str(cat_id), 0.0)
-            features.append(cat_signal)
-        
-        return np.array(features).reshape(1, -1)
+        return self.feature_extractor.transform([response_data])
     
-    def create_ensemble_model(self, weights: Optional[List[float]] = None) -> VotingRegressor:
-        """Create ensemble model with XGBoost, Neural Network, and Random Forest"""
+    def extract_feature_matrix(self, responses: Union[List[Dict], pd.DataFrame]) -> np.ndarray:
+        """
+        Extract features for a batch of responses (list of dicts or DataFrame)
+        Returns: (n x 50) float32 feature matrix laid out by the feature schema
+        """
+        return self.feature_extractor.transform(responses)
+    
+    def _create_base_estimators(self, multi_output: bool = False) -> List[Tuple[str, Any]]:
+        """Create fresh XGBoost, Neural Network and Random Forest members"""
         
         # XGBoost with tuned parameters (better generalization)
-        xgb_model = xgb.XGBRegressor(
+        xgb_params = dict(
             n_estimators=300,
             max_depth=5,
             learning_rate=0.05,
@@ -177,6 +174,10 @@ class IndividualRiskPredictor:
             random_state=42,
             objective='reg:squarederror'
         )
+        if multi_output:
+            # Native multi-target trees: one tree per round with a 6-value leaf
+            xgb_params.update(tree_method='hist', multi_strategy='multi_output_tree')
+        xgb_model = xgb.XGBRegressor(**xgb_params)
         
         # Neural Network with psychological risk-optimized architecture
         nn_model = MLPRegressor(
@@ -201,14 +202,21 @@ class IndividualRiskPredictor:
             random_state=42
         )
         
-        # Ensemble with equal weighting (weights can be tuned later if needed)
-        ensemble = VotingRegressor([
+        # MLP and Random Forest fit 2D targets natively
+        return [
             ('xgb', xgb_model),
-            ('nn', nn_model), 
+            ('nn', nn_model),
             ('rf', rf_model)
-        ], weights=weights)
-
-        return ensemble
+        ]
+    
+    def create_ensemble_model(self, weights: Optional[List[float]] = None) -> VotingRegressor:
+        """Create ensemble model with XGBoost, Neural Network, and Random Forest"""
+        # Ensemble with equal weighting (weights can be tuned later if needed)
+        return VotingRegressor(self._create_base_estimators(), weights=weights)
+    
+    def create_multi_output_model(self, weights: Optional[np.ndarray] = None) -> MultiOutputEnsemble:
+        """Create one ensemble whose members predict all 6 category scores"""
+        return MultiOutputEnsemble(self._create_base_estimators(multi_output=True), weights=weights)
 
     def _estimate_ensemble_weights(self, X: np.ndarray, y: np.ndarray, n_splits: int = 3) -> List[float]:
         """Estimate per-estimator weights via KFold CV using inverse MSE."""
@@ -216,7 +224,6 @@ class IndividualRiskPredictor:
         from sklearn.base import clone
         kf = KFold(n_splits=n_splits, shuffle=True, random_state=42)
         mse_sums = {'xgb': 0.0, 'nn': 0.0, 'rf': 0.0}
-        eps = 1e-6
         for train_idx, val_idx in kf.split(X):
             Xtr, Xval = X[train_idx], X[val_idx]
             ytr, yval = y[train_idx], y[val_idx]
@@ -233,49 +240,183 @@ class IndividualRiskPredictor:
             mse_sums['xgb'] += mean_squared_error(yval, xgb_est.predict(Xval))
             mse_sums['nn'] += mean_squared_error(yval, nn_est.predict(Xval))
             mse_sums['rf'] += mean_squared_error(yval, rf_est.predict(Xval))
+        return self._inverse_mse_weights(mse_sums, n_splits)
+    
+    def _estimate_multi_output_weights(self, X: np.ndarray, y: np.ndarray, n_splits: int = 3) -> np.ndarray:
+        """Estimate per-estimator, per-category weights via KFold CV using inverse MSE."""
+        from sklearn.model_selection import KFold
+        kf = KFold(n_splits=n_splits, shuffle=True, random_state=42)
+        mse_sums = {'xgb': 0.0, 'nn': 0.0, 'rf': 0.0}
+        for train_idx, val_idx in kf.split(X):
+            ensemble = self.create_multi_output_model()
+            ensemble.fit(X[train_idx], y[train_idx])
+            for name, member_pred in zip(mse_sums, ensemble.predict_members(X[val_idx])):
+                mse_sums[name] += mean_squared_error(y[val_idx], member_pred, multioutput='raw_values')
+        return self._inverse_mse_weights(mse_sums, n_splits)
+    
+    @staticmethod
+    def _inverse_mse_weights(mse_sums: Dict[str, Any], n_splits: int, eps: float = 1e-6):
+        """
+        Normalized inverse mean-CV-MSE weights in xgb, nn, rf order
+        Scalar MSE sums give a list of 3 weights; per-category arrays give a (3 x 6) matrix
+        """
         inv = {k: 1.0 / (v / n_splits + eps) for k, v in mse_sums.items()}
         weights = [inv['xgb'], inv['nn'], inv['rf']]
-        total = sum(weights)
-        return [w / total for w in weights]
+        if np.ndim(weights[0]) == 0:
+            total = sum(weights)
+            return [w / total for w in weights]
+        weights = np.array(weights)
+        return weights / weights.sum(axis=0, keepdims=True)
     
-    def prepare_training_data(self, training_responses: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    def _fit_models_parallel(self, X: np.ndarray, y: np.ndarray, n_workers: int,
+                             threads_per_worker: Optional[int] = None, n_splits: int = 3):
+        """
+        Fit every category x fold x estimator over a process pool
+        Produces the same models and weights as the sequential path, for any worker count
+        """
+        from app.models.parallel_training import fit_members
+        multi_output = self.model_layout == 'multi_output'
+        prototypes = self._create_base_estimators(multi_output=multi_output)
+        targets = [None] if multi_output else list(range(6))
+        
+        fold_scores, fitted = fit_members(prototypes, X, y, targets, n_splits=n_splits,
+                                          n_workers=n_workers, threads_per_worker=threads_per_worker)
+        
+        for target in targets:
+            # Fold MSEs are summed in fold order, exactly as the sequential estimators do
+            mse_sums = {}
+            for name, _ in prototypes:
+                mse_sums[name] = 0.0
+                for fold in range(n_splits):
+                    mse_sums[name] += fold_scores[(target, name, fold)]
+            weights = self._inverse_mse_weights(mse_sums, n_splits)
+            estimators = [(name, fitted[(target, name, None)]) for name, _ in prototypes]
+            
+            if multi_output:
+                self.models['multi_output'] = MultiOutputEnsemble(estimators, weights=weights)
+            else:
+                self.models[f'category_{target + 1}'] = self._assemble_voting_regressor(estimators, weights)
+    
+    def _fit_models_oof(self, X: np.ndarray, y: np.ndarray, stacking: bool = False,
+                        n_workers: Optional[int] = None, threads_per_worker: Optional[int] = None,
+                        n_splits: int = 3):
+        """
+        Keep the KFold models as the final members instead of refitting
+        Member weights (or a linear stacker) come from the out-of-fold prediction matrix
+        """
+        from app.models.parallel_training import fit_members, cv_folds
+        multi_output = self.model_layout == 'multi_output'
+        prototypes = self._create_base_estimators(multi_output=multi_output)
+        targets = [None] if multi_output else list(range(6))
+        folds = cv_folds(len(X), n_splits)
+        
+        fold_results, _ = fit_members(prototypes, X, y, targets, n_splits=n_splits, n_workers=n_workers or 1,
+                                      threads_per_worker=threads_per_worker, keep_fold_models=True)
+        
+        for target in targets:
+            y_target = y if target is None else y[:, target]
+            oof = np.empty((len(prototypes),) + y_target.shape, dtype=np.float64)
+            members, mse_sums = [], {}
+            
+            for m, (name, _) in enumerate(prototypes):
+                fold_models = []
+                mse_sums[name] = 0.0
+                for fold, (_, val_idx) in enumerate(folds):
+                    estimator, y_pred = fold_results[(target, name, fold)]
+                    oof[m][val_idx] = y_pred
+                    mse_sums[name] += mean_squared_error(
+                        y_target[val_idx], y_pred, multioutput='raw_values' if multi_output else 'uniform_average'
+                    )
+                    fold_models.append(estimator)
+                members.append((name, FoldAveragedRegressor(fold_models)))
+            
+            if stacking:
+                model = StackedEnsemble(members, *self._fit_stacker(oof, y_target))
+            elif multi_output:
+                model = MultiOutputEnsemble(members, weights=self._inverse_mse_weights(mse_sums, n_splits))
+            else:
+                model = self._assemble_voting_regressor(members, self._inverse_mse_weights(mse_sums, n_splits))
+            
+            self.models['multi_output' if multi_output else f'category_{target + 1}'] = model
+    
+    @staticmethod
+    def _fit_stacker(oof: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Non-negative least squares over out-of-fold member predictions, one stacker per target"""
+        from sklearn.linear_model import LinearRegression
+        n_members = oof.shape[0]
+        oof = oof.reshape(n_members, oof.shape[1], -1)
+        y = y.reshape(len(y), -1)
+        coef = np.empty((n_members, y.shape[1]))
+        intercept = np.empty(y.shape[1])
+        for t in range(y.shape[1]):
+            stacker = LinearRegression(positive=True).fit(oof[:, :, t].T, y[:, t])
+            coef[:, t] = stacker.coef_
+            intercept[t] = stacker.intercept_
+        return coef, intercept
+    
+    def _assemble_voting_regressor(self, estimators: List[Tuple[str, Any]], weights: List[float]) -> VotingRegressor:
+        """VotingRegressor around already-fitted members (what VotingRegressor.fit would produce)"""
+        ensemble = self.create_ensemble_model(weights=weights)
+        # Member selection may keep only some of the prototypes
+        names = [name for name, _ in estimators]
+        ensemble.estimators = [pair for pair in ensemble.estimators if pair[0] in names]
+        ensemble.estimators_ = [estimator for _, estimator in estimators]
+        ensemble.named_estimators_ = Bunch(**dict(estimators))
+        return ensemble
+    
+    def prepare_training_data(self, training_responses: Union[List[Dict], pd.DataFrame]) -> Tuple[np.ndarray, np.ndarray]:
         """
         Prepare training data from survey responses
+        A DataFrame with flattened columns ('survey_responses.q1', 'risk_scores.1', ...)
+        is encoded column by column without building per-row dicts
         Returns: (X features, y targets)
         """
-        X_list = []
-        y_list = []
+        if isinstance(training_responses, pd.DataFrame):
+            return self._prepare_training_frame(training_responses)
         
-        for response in training_responses:
-            try:
-                # Extract features
-                features = self.extract_features(response)
-                X_list.append(features.flatten())
-                
-                # Extract target scores (6 category scores)
-                targets = []
-                risk_scores = response.get('risk_scores', {})
-                for cat_id in range(1, 7):
-                    score = risk_scores.get(str(cat_id), 2.5)
-                    targets.append(float(score))
-                
-                y_list.append(targets)
-                
-            except Exception as e:
-                print(f"Warning: Skipping response due to error: {e}")
-                continue
+        X, valid_idx, errors = self.feature_extractor.transform_valid(training_responses)
+        for idx, error in errors.items():
+            print(f"Warning: Skipping response due to error: {error}")
         
-        X = np.array(X_list)
-        y = np.array(y_list)
+        # Extract target scores (6 category scores)
+        y = np.array([
+            [float(training_responses[i].get('risk_scores', {}).get(str(cat_id), 2.5)) for cat_id in range(1, 7)]
+            for i in valid_idx
+        ]).reshape(-1, 6)
         
         print(f"Prepared training data: {X.shape[0]} samples, {X.shape[1]} features, {y.shape[1]} targets")
         return X, y
     
-    def train(self, training_responses: List[Dict], validation_split: float = 0.2) -> Dict[str, float]:
+    def _prepare_training_frame(self, frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        X = self.feature_extractor.transform(frame)
+        
+        # Missing target columns or values default to the scale midpoint, as in the dict path
+        y = np.full((len(frame), 6), 2.5)
+        for j, cat_id in enumerate(range(1, 7)):
+            column = f'risk_scores.{cat_id}'
+            if column in frame.columns:
+                y[:, j] = pd.to_numeric(frame[column], errors='coerce').fillna(2.5).to_numpy(dtype=np.float64)
+        
+        print(f"Prepared training data: {X.shape[0]} samples, {X.shape[1]} features, {y.shape[1]} targets")
+        return X, y
+    
+    def train(self, training_responses: Union[List[Dict], pd.DataFrame], validation_split: float = 0.2,
+              n_workers: Optional[int] = None, threads_per_worker: Optional[int] = None,
+              ensemble_strategy: str = 'refit', select_members: bool = False,
+              accuracy_tolerance: float = 0.02, latency_target_ms: Optional[float] = None) -> Dict[str, float]:
         """
         Train the individual risk prediction model
+        n_workers > 0 spreads category x fold x estimator fits over a process pool
+        (threads_per_worker caps BLAS/OpenMP/estimator threads in each worker)
+        ensemble_strategy selects refit or out-of-fold reuse (see ENSEMBLE_STRATEGIES)
+        select_members keeps the smallest member subset whose validation MSE stays within
+        accuracy_tolerance (relative) of the full ensemble and whose p95 row latency meets latency_target_ms
+        (chosen on half of the validation split, checked on the other half)
         Returns: Training metrics
         """
+        if ensemble_strategy not in self.ENSEMBLE_STRATEGIES:
+            raise ValueError(f"Unknown ensemble strategy: {ensemble_strategy}. Expected one of {self.ENSEMBLE_STRATEGIES}")
+        
         print("Starting individual risk model training...")
         
         # Prepare data
@@ -290,55 +431,450 @@ class IndividualRiskPredictor:
         )
         
         # Scale features
+        # Scale in float64 (features are stored as float32) so train and serve agree bit for bit
         self.scalers['features'] = StandardScaler()
-        X_train_scaled = self.scalers['features'].fit_transform(X_train)
-        X_val_scaled = self.scalers['features'].transform(X_val)
+        X_train_scaled = self.scalers['features'].fit_transform(X_train.astype(np.float64))
+        X_val_scaled = self.scalers['features'].transform(X_val.astype(np.float64))
         
-        # Train models for each category
-        metrics = {}
+        self.models = {}
+        self.ensemble_strategy = ensemble_strategy
+        self.update_history = []
+        self.scalers.pop('running', None)
+        self.flat_scorer = None
+        self.rf_compaction = None
+        self.member_selection = None
+        y_val_pred = np.empty_like(y_val, dtype=np.float64)
         
-        for cat_id in range(6):  # 6 categories
-            print(f"Training model for category {cat_id + 1}...")
+        if ensemble_strategy != 'refit':
+            print(f"Training {self.model_layout} models with {ensemble_strategy} (fold models reused)...")
+            self._fit_models_oof(X_train_scaled, y_train, stacking=ensemble_strategy == 'oof_stacking',
+                                 n_workers=n_workers, threads_per_worker=threads_per_worker)
+            y_val_pred[:] = self._predict_scaled(X_val_scaled)
+        elif n_workers:
+            print(f"Training {self.model_layout} models in parallel ({n_workers} workers)...")
+            self._fit_models_parallel(X_train_scaled, y_train, n_workers, threads_per_worker)
+            y_val_pred[:] = self._predict_scaled(X_val_scaled)
+        elif self.model_layout == 'multi_output':
+            print("Training multi-output model for all categories...")
             
-            # Estimate ensemble weights via KFold on training fold
-            weights = self._estimate_ensemble_weights(X_train_scaled, y_train[:, cat_id])
-            # Create and train ensemble with weights
-            model = self.create_ensemble_model(weights=weights)
-            model.fit(X_train_scaled, y_train[:, cat_id])
+            # Per-category member weights from one KFold pass over all targets
+            weights = self._estimate_multi_output_weights(X_train_scaled, y_train)
+            model = self.create_multi_output_model(weights=weights)
+            model.fit(X_train_scaled, y_train)
             
-            # Validate
-            y_pred = model.predict(X_val_scaled)
-            mse = mean_squared_error(y_val[:, cat_id], y_pred)
-            r2 = r2_score(y_val[:, cat_id], y_pred)
-            mae = mean_absolute_error(y_val[:, cat_id], y_pred)
+            self.models['multi_output'] = model
+            y_val_pred[:] = model.predict(X_val_scaled)
+        else:
+            # Train models for each category
+            for cat_id in range(6):  # 6 categories
+                print(f"Training model for category {cat_id + 1}...")
+                
+                # Estimate ensemble weights via KFold on training fold
+                weights = self._estimate_ensemble_weights(X_train_scaled, y_train[:, cat_id])
+                # Create and train ensemble with weights
+                model = self.create_ensemble_model(weights=weights)
+                model.fit(X_train_scaled, y_train[:, cat_id])
+                
+                self.models[f'category_{cat_id + 1}'] = model
+                y_val_pred[:, cat_id] = model.predict(X_val_scaled)
+        
+        # Validate
+        metrics = self._validation_metrics(y_val, y_val_pred)
+        
+        if select_members:
+            self.member_selection = self._select_members(X_val_scaled, y_val, accuracy_tolerance, latency_target_ms)
+            metrics = self._validation_metrics(y_val, self._predict_scaled(X_val_scaled), verbose=False)
+        
+        self.is_trained = True
+        self._refresh_feature_importances()
+        self._refresh_model_sizes()
+        print(f"Training completed - Overall R²: {metrics['overall']['r2']:.3f}")
+        
+        return metrics
+    
+    def _member_containers(self) -> List[Tuple[List[int], Any]]:
+        """(category indices, ensemble) for every fitted ensemble"""
+        if 'multi_output' in self.models:
+            return [(list(range(6)), self.models['multi_output'])]
+        return [([cat_id - 1], self.models[f'category_{cat_id}']) for cat_id in range(1, 7)]
+    
+    @staticmethod
+    def _combination_weights(ensemble, n_targets: int) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """(members x targets) weights and (targets,) intercept an ensemble combines its members with"""
+        n_members = len(ensemble.named_estimators_)
+        if isinstance(ensemble, StackedEnsemble):
+            return ensemble.coef, ensemble.intercept, True
+        if ensemble.weights is None:
+            weights = np.ones((n_members, n_targets))
+        else:
+            weights = np.asarray(ensemble.weights, dtype=np.float64).reshape(n_members, -1)
+        weights = np.broadcast_to(weights, (n_members, n_targets))
+        return weights / weights.sum(axis=0, keepdims=True), np.zeros(n_targets), False
+    
+    def _select_members(self, X_val_scaled: np.ndarray, y_val: np.ndarray, accuracy_tolerance: float,
+                        latency_target_ms: Optional[float], latency_rows: int = 30,
+                        selection_split: float = 0.5) -> Dict[str, Any]:
+        """
+        Benchmark every member subset and keep the smallest acceptable one
+        The validation split is divided in two: the subset is chosen on one part (selection_split
+        of it) and its MSE increase over the full ensemble is reported and checked against
+        accuracy_tolerance on the other, so the check uses rows the choice never saw; a subset
+        that fails the held-out check is not applied.
+        Subset weights are the full ensemble's weights re-normalized over the kept members
+        (stacker coefficients are rescaled to keep their per-category sum). Row latency is the
+        measured per-row time of the kept members summed over every category ensemble.
+        Returns: selection summary with the full trade-off table
+        """
+        import itertools
+        X_select, X_check, y_select, y_check = train_test_split(X_val_scaled, y_val, train_size=selection_split,
+                                                                random_state=42)
+        containers = self._member_containers()
+        names = list(containers[0][1].named_estimators_)
+        parts = {'select': X_select, 'check': X_check}
+        
+        member_preds = {part: np.zeros((len(names), X.shape[0], 6)) for part, X in parts.items()}
+        weights, intercept = np.zeros((len(names), 6)), np.zeros(6)
+        row_ms = np.zeros((len(names), latency_rows))
+        stacked = False
+        for target_ids, ensemble in containers:
+            container_weights, container_intercept, stacked = self._combination_weights(ensemble, len(target_ids))
+            weights[:, target_ids] = container_weights
+            intercept[target_ids] = container_intercept
+            for m, estimator in enumerate(ensemble.named_estimators_.values()):
+                for part, X in parts.items():
+                    member_preds[part][m][:, target_ids] = np.asarray(estimator.predict(X)).reshape(X.shape[0], -1)
+                estimator.predict(X_select[:1])  # warm up
+                for r in range(latency_rows):
+                    row = X_select[r % X_select.shape[0]:r % X_select.shape[0] + 1]
+                    start = time.perf_counter()
+                    estimator.predict(row)
+                    row_ms[m, r] += (time.perf_counter() - start) * 1000
+        
+        table = []
+        for size in range(1, len(names) + 1):
+            for subset in itertools.combinations(range(len(names)), size):
+                subset = list(subset)
+                subset_sum = weights[subset].sum(axis=0)
+                if np.any(subset_sum <= 0):
+                    continue  # every kept member has zero weight for some category
+                scale = weights.sum(axis=0) / subset_sum if stacked else 1.0 / subset_sum
+                subset_weights = weights[subset] * scale
+                mse = {part: float(np.mean((np.einsum('mnt,mt->nt', member_preds[part][subset], subset_weights)
+                                            + intercept - y_part) ** 2))
+                       for part, y_part in (('select', y_select), ('check', y_check))}
+                table.append({
+                    'members': [names[m] for m in subset],
+                    'selection_mse': mse['select'],
+                    'overall_mse': mse['check'],
+                    'p50_latency_ms': float(np.percentile(row_ms[subset].sum(axis=0), 50)),
+                    'p95_latency_ms': float(np.percentile(row_ms[subset].sum(axis=0), 95)),
+                    'weights': subset_weights.tolist(),
+                })
+        
+        full = table[-1]
+        for row in table:
+            row['selection_mse_increase'] = row['selection_mse'] / full['selection_mse'] - 1.0
+            row['mse_increase'] = row['overall_mse'] / full['overall_mse'] - 1.0
+            row['within_tolerance'] = row['selection_mse_increase'] <= accuracy_tolerance
+            row['meets_latency_target'] = latency_target_ms is None or row['p95_latency_ms'] <= latency_target_ms
+        
+        feasible = [row for row in table if row['within_tolerance'] and row['meets_latency_target']]
+        chosen = min(feasible, key=lambda row: (len(row['members']), row['p95_latency_ms'], row['selection_mse'])) \
+            if feasible else full
+        # The held-out part decides whether the choice is applied
+        held_out_ok = chosen['mse_increase'] <= accuracy_tolerance
+        if not held_out_ok:
+            chosen = full
+        
+        if len(chosen['members']) < len(names):
+            kept = [names.index(name) for name in chosen['members']]
+            chosen_weights = np.asarray(chosen['weights'])
+            for key, (target_ids, ensemble) in zip(list(self.models), containers):
+                estimators = [(names[m], ensemble.named_estimators_[names[m]]) for m in kept]
+                container_weights = chosen_weights[:, target_ids]
+                if isinstance(ensemble, StackedEnsemble):
+                    self.models[key] = StackedEnsemble(estimators, container_weights, intercept[target_ids])
+                elif isinstance(ensemble, MultiOutputEnsemble):
+                    self.models[key] = MultiOutputEnsemble(estimators, weights=container_weights)
+                else:
+                    self.models[key] = self._assemble_voting_regressor(estimators, container_weights[:, 0].tolist())
+        
+        print(f"Member selection: kept {chosen['members']} "
+              f"(held-out MSE {chosen['mse_increase']:+.2%}, p95 {full['p95_latency_ms']:.2f}ms -> "
+              f"{chosen['p95_latency_ms']:.2f}ms)" + ("" if feasible else " - no subset met the targets")
+              + ("" if held_out_ok else " - chosen subset failed the held-out accuracy check"))
+        return {
+            'selected_members': chosen['members'],
+            'accuracy_tolerance': accuracy_tolerance,
+            'latency_target_ms': latency_target_ms,
+            'selection_rows': int(X_select.shape[0]),
+            'held_out_rows': int(X_check.shape[0]),
+            'held_out_mse_increase': chosen['mse_increase'],
+            'targets_met': bool(feasible) and held_out_ok,
+            'tradeoff_table': [{k: v for k, v in row.items() if k != 'weights'} for row in table],
+        }
+    
+    def _validation_metrics(self, y_true: np.ndarray, y_pred: np.ndarray, verbose: bool = True) -> Dict[str, Dict]:
+        """Per-category and averaged MSE, R² and MAE"""
+        metrics = {}
+        
+        for cat_id in range(6):
+            mse = mean_squared_error(y_true[:, cat_id], y_pred[:, cat_id])
+            r2 = r2_score(y_true[:, cat_id], y_pred[:, cat_id])
+            mae = mean_absolute_error(y_true[:, cat_id], y_pred[:, cat_id])
             
-            # Store model and metrics
-            self.models[f'category_{cat_id + 1}'] = model
             metrics[f'category_{cat_id + 1}'] = {
                 'mse': mse,
                 'r2': r2,
                 'mae': mae
             }
             
-            print(f"Category {cat_id + 1} - MSE: {mse:.3f}, R²: {r2:.3f}, MAE: {mae:.3f}")
+            if verbose:
+                print(f"Category {cat_id + 1} - MSE: {mse:.3f}, R²: {r2:.3f}, MAE: {mae:.3f}")
         
         # Calculate overall metrics
-        overall_mse = np.mean([metrics[f'category_{i}']['mse'] for i in range(1, 7)])
-        overall_r2 = np.mean([metrics[f'category_{i}']['r2'] for i in range(1, 7)])
-        overall_mae = np.mean([metrics[f'category_{i}']['mae'] for i in range(1, 7)])
-        
         metrics['overall'] = {
-            'mse': overall_mse,
-            'r2': overall_r2,
-            'mae': overall_mae
+            'mse': np.mean([metrics[f'category_{i}']['mse'] for i in range(1, 7)]),
+            'r2': np.mean([metrics[f'category_{i}']['r2'] for i in range(1, 7)]),
+            'mae': np.mean([metrics[f'category_{i}']['mae'] for i in range(1, 7)])
         }
+        return metrics
+    
+    def update(self, new_responses: Union[List[Dict], pd.DataFrame], new_version: Optional[str] = None,
+               xgb_rounds: int = 50, rf_trees: int = 50, mlp_epochs: int = 5,
+               validation_split: float = 0.2) -> Dict[str, Any]:
+        """
+        Incrementally update a trained model with new responses instead of retraining
+        XGBoost keeps boosting from its booster, each random forest grows rf_trees new trees
+        (warm_start) and each MLP runs mlp_epochs partial_fit passes; ensemble weights are kept.
+        The serving scaler stays frozen (every fitted member depends on it); its running
+        statistics are tracked alongside to report feature drift.
+        Returns: update report with holdout metrics before and after the update
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before it can be updated")
+        if not self.models:
+            raise ValueError("Flat artifacts hold no fitted estimators; load the pickled model to update it")
         
-        self.is_trained = True
-        print(f"Training completed - Overall R²: {overall_r2:.3f}")
+        print("Starting incremental individual risk model update...")
+        X, y = self.prepare_training_data(new_responses)
+        if X.shape[0] < 10:
+            raise ValueError("Insufficient update data. Need at least 10 samples.")
         
-        return metrics
+        X_fit, X_val, y_fit, y_val = train_test_split(X, y, test_size=validation_split, random_state=42)
+        
+        # Running feature statistics across every batch seen so far
+        running = self.scalers.get('running') or copy.deepcopy(self.scalers['features'])
+        running.partial_fit(X_fit.astype(np.float64))
+        self.scalers['running'] = running
+        serving = self.scalers['features']
+        mean_shift = np.abs(running.mean_ - serving.mean_) / serving.scale_
+        
+        X_fit_scaled = serving.transform(X_fit.astype(np.float64))
+        X_val_scaled = serving.transform(X_val.astype(np.float64))
+        metrics_before = self._validation_metrics(y_val, self._predict_scaled(X_val_scaled), verbose=False)
+        
+        for key, ensemble in self.models.items():
+            y_target = y_fit if key == 'multi_output' else y_fit[:, int(key.split('_')[1]) - 1]
+            for estimator in ensemble.named_estimators_.values():
+                self._update_member(estimator, X_fit_scaled, y_target, xgb_rounds, rf_trees, mlp_epochs)
+        
+        metrics_after = self._validation_metrics(y_val, self._predict_scaled(X_val_scaled))
+        
+        previous_version = self.model_version
+        self.model_version = new_version or self._next_version(previous_version)
+        update_record = {
+            'from_version': previous_version,
+            'to_version': self.model_version,
+            'timestamp': datetime.now().isoformat(),
+            'samples': int(X.shape[0]),
+            'xgb_rounds': xgb_rounds,
+            'rf_trees': rf_trees,
+            'mlp_epochs': mlp_epochs,
+            'max_feature_mean_shift': float(mean_shift.max()),
+            'drifted_features': [self.feature_names[i] for i in np.argsort(mean_shift)[::-1][:5]
+                                 if mean_shift[i] > 0.5]
+        }
+        self.update_history.append(update_record)
+        
+        # An exported ONNX graph describes the previous trees
+        self.onnx_scorer = None
+        self._refresh_feature_importances()
+        self._refresh_model_sizes()
+        print(f"Update completed - {previous_version} -> {self.model_version}, "
+              f"holdout R²: {metrics_before['overall']['r2']:.3f} -> {metrics_after['overall']['r2']:.3f}")
+        
+        return {**update_record, 'metrics_before': metrics_before, 'metrics_after': metrics_after}
+    
+    def _update_member(self, estimator, X: np.ndarray, y: np.ndarray,
+                       xgb_rounds: int, rf_trees: int, mlp_epochs: int):
+        """Continue training one fitted member in place"""
+        if isinstance(estimator, FoldAveragedRegressor):
+            for fold_model in estimator.estimators_:
+                self._update_member(fold_model, X, y, xgb_rounds, rf_trees, mlp_epochs)
+        elif isinstance(estimator, xgb.XGBRegressor):
+            total_rounds = estimator.get_booster().num_boosted_rounds() + xgb_rounds
+            estimator.set_params(n_estimators=xgb_rounds)
+            estimator.fit(X, y, xgb_model=estimator.get_booster())
+            estimator.set_params(n_estimators=total_rounds)
+        elif isinstance(estimator, RandomForestRegressor):
+            estimator.set_params(warm_start=True, n_estimators=len(estimator.estimators_) + rf_trees)
+            estimator.fit(X, y)
+            estimator.set_params(warm_start=False)
+        elif isinstance(estimator, MLPRegressor):
+            # partial_fit does not support early stopping; restore it for any later full refit
+            early_stopping = estimator.early_stopping
+            estimator.set_params(early_stopping=False)
+            if getattr(estimator, 'best_loss_', None) is None:
+                # Early-stopped fits track validation score instead of training loss
+                estimator.best_loss_ = min(estimator.loss_curve_)
+            for _ in range(mlp_epochs):
+                estimator.partial_fit(X, y)
+            estimator.set_params(early_stopping=early_stopping)
+        else:
+            raise ValueError(f"Cannot incrementally update estimator of type {type(estimator).__name__}")
+    
+    def compact_random_forests(self, training_responses: Union[List[Dict], pd.DataFrame], memory_budget_mb: Optional[float] = None,
+                               latency_budget_ms: Optional[float] = None, max_mse_increase: float = 0.01,
+                               depth_candidates: Tuple[Optional[int], ...] = (None, 20, 14, 10, 8),
+                               tree_fractions: Tuple[float, ...] = (1.0, 0.5, 0.25, 0.1),
+                               merge_tolerance: float = 0.01, validation_split: float = 0.2,
+                               ranking_split: float = 0.5,
+                               new_version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Prune the random-forest members after training (depth cap, leaf merging, dropping the least useful trees)
+        The validation split train() holds out is divided in two: trees are ranked on one part
+        (ranking_split of it) and every depth x tree-count candidate is scored on the other, so the
+        reported MSE increase is measured on rows the ranking never saw.
+        With a memory budget (whole model, MB) and/or a latency budget (single-row p95, ms) the most
+        accurate candidate within budget is kept; without one, the smallest candidate whose overall
+        validation MSE rises by at most max_mse_increase (relative) is kept.
+        Returns: report with the baseline, every candidate and the chosen one
+        """
+        if not self.is_trained or not self.models:
+            raise ValueError("Model must be trained (pickled estimators loaded) before compaction")
+        
+        print("Compacting random forest members...")
+        X, y = self.prepare_training_data(training_responses)
+        _, X_holdout, _, y_holdout = train_test_split(X, y, test_size=validation_split, random_state=42)
+        X_rank, X_val, y_rank, y_val = train_test_split(X_holdout, y_holdout, train_size=ranking_split,
+                                                        random_state=42)
+        X_rank_scaled = self.scalers['features'].transform(X_rank.astype(np.float64))
+        X_val_scaled = self.scalers['features'].transform(X_val.astype(np.float64))
+        
+        # (forest, its ranking targets, its original trees)
+        forests = []
+        for key, ensemble in self.models.items():
+            y_target = y_rank if key == 'multi_output' else y_rank[:, int(key.split('_')[1]) - 1]
+            for estimator in ensemble.named_estimators_.values():
+                for forest in model_compaction.random_forests(estimator):
+                    forests.append((forest, y_target, list(forest.estimators_)))
+        if not forests:
+            raise ValueError("Model has no random forest members to compact")
+        
+        def evaluate(**row) -> Dict[str, Any]:
+            mse = self._validation_metrics(y_val, self._predict_scaled(X_val_scaled), verbose=False)['overall']['mse']
+            summary = model_compaction.compaction_summary([forest for forest, _, _ in forests])
+            return {
+                **row,
+                'trees': summary['trees'],
+                'rf_nbytes': summary['nbytes'],
+                'model_nbytes': sum(model_compaction.estimator_nbytes(estimator)
+                                    for ensemble in self.models.values()
+                                    for estimator in ensemble.named_estimators_.values()),
+                # Timing every candidate is slow, so it is only measured when it is constrained
+                'p95_latency_ms': self._single_row_latency_ms(X_val) if latency_budget_ms is not None else None,
+                'overall_mse': float(mse),
+            }
+        
+        baseline = evaluate(max_depth=None, tree_fraction=1.0, merge_tolerance=0.0)
+        candidates = []
+        try:
+            for max_depth in depth_candidates:
+                pruned = []
+                for forest, y_target, original in forests:
+                    trees = [model_compaction.prune_tree(tree, max_depth, merge_tolerance) for tree in original]
+                    pruned.append((trees, model_compaction.rank_trees(trees, X_rank_scaled, y_target)))
+                for fraction in tree_fractions:
+                    for (forest, _, _), (trees, order) in zip(forests, pruned):
+                        keep = sorted(order[:max(1, int(round(fraction * len(trees))))])
+                        model_compaction.set_forest_trees(forest, [trees[i] for i in keep])
+                    row = evaluate(max_depth=max_depth, tree_fraction=fraction, merge_tolerance=merge_tolerance)
+                    row['mse_increase'] = row['overall_mse'] / baseline['overall_mse'] - 1.0
+                    candidates.append(row)
+                    latency = f" p95={row['p95_latency_ms']:.2f}ms" if row['p95_latency_ms'] is not None else ""
+                    print(f"  depth={max_depth} trees={row['trees']} size={row['model_nbytes'] / 1e6:.1f}MB"
+                          f"{latency} MSE={row['overall_mse']:.4f}")
+        finally:
+            for forest, _, original in forests:
+                model_compaction.set_forest_trees(forest, original)
+        
+        if memory_budget_mb is not None or latency_budget_ms is not None:
+            feasible = [row for row in candidates
+                        if (memory_budget_mb is None or row['model_nbytes'] <= memory_budget_mb * 1e6)
+                        and (latency_budget_ms is None or row['p95_latency_ms'] <= latency_budget_ms)]
+            if not feasible:
+                smallest = min(candidates, key=lambda row: row['model_nbytes'])
+                fastest = min(candidates, key=lambda row: row['p95_latency_ms'] or 0.0)
+                raise ValueError(
+                    f"No compaction fits the budget; smallest candidate is {smallest['model_nbytes'] / 1e6:.1f}MB"
+                    + (f", fastest is {fastest['p95_latency_ms']:.2f}ms p95" if latency_budget_ms is not None else "")
+                )
+            chosen = min(feasible, key=lambda row: row['overall_mse'])
+        else:
+            feasible = [row for row in candidates if row['mse_increase'] <= max_mse_increase]
+            chosen = min(feasible, key=lambda row: (row['model_nbytes'], row['overall_mse'])) if feasible else None
+        
+        if chosen is None:
+            print("No compaction stays within the accuracy tolerance; forests left unchanged")
+        else:
+            for forest, y_target, original in forests:
+                trees = [model_compaction.prune_tree(tree, chosen['max_depth'], chosen['merge_tolerance'])
+                         for tree in original]
+                order = model_compaction.rank_trees(trees, X_rank_scaled, y_target)
+                keep = sorted(order[:max(1, int(round(chosen['tree_fraction'] * len(trees))))])
+                model_compaction.set_forest_trees(forest, [trees[i] for i in keep])
+            
+            self.rf_compaction = {
+                'max_depth': chosen['max_depth'],
+                'tree_fraction': chosen['tree_fraction'],
+                'merge_tolerance': chosen['merge_tolerance'],
+                'trees': chosen['trees'],
+                'mse_increase': chosen['mse_increase'],
+                'memory_budget_mb': memory_budget_mb,
+                'latency_budget_ms': latency_budget_ms,
+            }
+            self.model_version = new_version or self._next_version(self.model_version)
+            self.onnx_scorer = None
+            self._refresh_feature_importances()
+            self._refresh_model_sizes()
+            print(f"Compaction completed - {baseline['model_nbytes'] / 1e6:.1f}MB -> "
+                  f"{chosen['model_nbytes'] / 1e6:.1f}MB, MSE {baseline['overall_mse']:.4f} -> "
+                  f"{chosen['overall_mse']:.4f}")
+        
+        return {'model_version': self.model_version, 'baseline': baseline,
+                'candidates': candidates, 'chosen': chosen}
+    
+    def _single_row_latency_ms(self, features: np.ndarray, repeats: int = 20) -> float:
+        """p95 of predict_category_scores over single rows"""
+        self.predict_category_scores(features[:1])  # warm up
+        timings = []
+        for i in range(repeats):
+            row = features[i % len(features):i % len(features) + 1]
+            start = time.perf_counter()
+            self.predict_category_scores(row)
+            timings.append((time.perf_counter() - start) * 1000)
+        return float(np.percentile(timings, 95))
     
-    def predict(self, response_data: Dict) -> Dict[str, Any]:
+    @staticmethod
+    def _next_version(version: str) -> str:
+        """v1.2.3 -> v1.2.4; other version strings get an .1 suffix"""
+        match = re.match(r'^(.*?)(\d+)$', version)
+        if match and '.' in version:
+            return f"{match.group(1)}{int(match.group(2)) + 1}"
+        return f"{version}.1"
+    
+    def predict(self, response_data: Dict, score_cache: Optional[PredictionCache] = None) -> Dict[str, Any]:
         """
         Predict individual psychological risk scores
         Returns: Complete risk assessment
@@ -346,123 +882,187 @@ class IndividualRiskPredictor:
         if not self.is_trained:
             raise ValueError("Model must be trained before making predictions")
         
-        try:
-            # Extract features
-            features = self.extract_features(response_data)
-            features_scaled = self.scalers['features'].transform(features)
-            
-            # Predict category scores
-            category_scores = {}
-            category_risks = {}
-            
-            for cat_id in range(1, 7):
-                model = self.models[f'category_{cat_id}']
-                score = model.predict(features_scaled)[0]
-                
-                # Ensure score is in valid range (1.0-4.0)
-                score = max(1.0, min(4.0, score))
-                category_scores[cat_id] = round(score, 2)
-                
-                # Determine risk level for category
-                if score < 1.5:
-                    risk_level = "Crisis"
-                elif score < 2.5:
-                    risk_level = "At Risk"
-                elif score < 3.0:
-                    risk_level = "Mixed"
-                elif score < 3.5:
-                    risk_level = "Safe"
-                else:
-                    risk_level = "Thriving"
-                
-                category_risks[cat_id] = risk_level
-            
-            # HSEG Comprehensive Scoring (Normalized to 28-point scale)
-            # For each category: contribution = (avg_score/4) * (num_questions * weight)
-            # Total max = 55.5; Normalized score = (total/55.5)*28
-            category_weighted_points = {}
-            total_weighted_points = 0.0
-            for cat_id, score in category_scores.items():
-                cfg = self.category_config.get(cat_id, {'weight': 2.0, 'num_questions': 3})
-                cat_max_points = cfg['num_questions'] * cfg['weight']
-                contribution = (score / 4.0) * cat_max_points
-                category_weighted_points[cat_id] = round(contribution, 3)
-                total_weighted_points += contribution
-
-            overall_score_28 = HSEG_SCORING.normalize_points_to_28(total_weighted_points)
+        return self.predict_batch([response_data], score_cache=score_cache)[0]
+    
+    def predict_batch(self, responses: List[Dict], include_feature_importance: bool = True,
+                      score_cache: Optional[PredictionCache] = None) -> List[Dict[str, Any]]:
+        """
+        Predict individual psychological risk scores for many responses at once
+        Builds one feature matrix, scales it once and runs each category model once
+        Returns: One risk assessment per response, in input order
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before making predictions")
+        
+        timestamp = datetime.now().isoformat()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(responses)
+        
+        # Extract the whole batch at once; a malformed response only fails itself
+        features, valid_idx, errors = self.feature_extractor.transform_valid(responses)
+        for i, error in errors.items():
+            results[i] = self._error_result(responses[i], error, timestamp)
+        
+        if valid_idx:
+            valid_responses = [responses[i] for i in valid_idx]
+            try:
+                scores = self._cached_category_scores(features, score_cache)
+                assessments = self._build_assessments(valid_responses, features, scores, timestamp,
+                                                      include_feature_importance)
+            except Exception as e:
+                assessments = [self._error_result(r, e, timestamp) for r in valid_responses]
             
-            # Determine overall risk tier
-            if overall_score_28 <= self.risk_thresholds_28['crisis_max']:
-                overall_tier = "Crisis"
-            elif overall_score_28 <= self.risk_thresholds_28['at_risk_max']:
-                overall_tier = "At Risk"
-            elif overall_score_28 <= self.risk_thresholds_28['mixed_max']:
-                overall_tier = "Mixed"
-            elif overall_score_28 <= self.risk_thresholds_28['safe_max']:
-                overall_tier = "Safe"
+            for i, assessment in zip(valid_idx, assessments):
+                results[i] = assessment
+        
+        return results
+    
+    def predict_category_scores(self, features: np.ndarray) -> np.ndarray:
+        """
+        Run every category model once over an (n x features) matrix
+        Returns: (n x 6) category scores clipped to the 1.0-4.0 range
+        """
+        if self.onnx_scorer is not None:
+            return np.clip(self.onnx_scorer.predict(features), 1.0, 4.0)
+        if self.flat_scorer is not None:
+            return np.clip(self.flat_scorer.predict(features), 1.0, 4.0)
+        
+        features_scaled = self.scalers['features'].transform(features.astype(np.float64))
+        return np.clip(self._predict_scaled(features_scaled), 1.0, 4.0)
+    
+    def _predict_scaled(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Unclipped (n x 6) ensemble output for already-scaled features"""
+        if 'multi_output' in self.models:
+            return self.models['multi_output'].predict(features_scaled)
+        
+        scores = np.empty((features_scaled.shape[0], 6), dtype=np.float64)
+        for cat_id in range(1, 7):
+            scores[:, cat_id - 1] = self.models[f'category_{cat_id}'].predict(features_scaled)
+        return scores
+    
+    def _cached_category_scores(self, features: np.ndarray,
+                                score_cache: Optional[PredictionCache] = None) -> np.ndarray:
+        """Category scores, running the ensemble only for feature vectors not already cached"""
+        if score_cache is None or not score_cache.enabled:
+            return self.predict_category_scores(features)
+        
+        keys = [feature_digest(row, self.model_version) for row in features]
+        scores = np.empty((features.shape[0], 6), dtype=np.float64)
+        
+        # Identical vectors within the batch are scored once
+        pending: Dict[str, List[int]] = {}
+        for i, (key, cached) in enumerate(zip(keys, score_cache.get_many(keys))):
+            if cached is None:
+                pending.setdefault(key, []).append(i)
             else:
-                overall_tier = "Thriving"
-            
-            # Generate prediction confidence
-            confidence = self._calculate_confidence(features_scaled, category_scores)
-            
-            # Identify contributing factors
-            contributing_factors = self._identify_risk_factors(response_data, category_scores)
-            
-            # Generate interventions
-            interventions = self._generate_interventions(category_scores, overall_tier)
+                scores[i] = cached
+        
+        if pending:
+            first_rows = [rows[0] for rows in pending.values()]
+            fresh = self.predict_category_scores(features[first_rows])
+            for (key, rows), row_scores in zip(pending.items(), fresh):
+                scores[rows] = row_scores
+                score_cache.put(key, row_scores.copy())
+        
+        return scores
+    
+    def enable_onnx_backend(self, filepath: str, num_threads: Optional[int] = None,
+                            source_digest: Optional[str] = None):
+        """Score through an exported ONNX graph (see scripts/export_individual_onnx.py)"""
+        from app.models.onnx_backend import OnnxIndividualScorer
+        scorer = OnnxIndividualScorer(filepath, num_threads=num_threads)
+        scorer.check_compatible(self, source_digest=source_digest)
+        self.onnx_scorer = scorer
+        print(f"ONNX backend enabled from {filepath}")
+    
+    def disable_onnx_backend(self):
+        """Return to the pickled sklearn/XGBoost members"""
+        self.onnx_scorer = None
+    
+    def _build_assessments(self, responses: List[Dict], features: np.ndarray, scores: np.ndarray,
+                           timestamp: str, include_feature_importance: bool = True) -> List[Dict[str, Any]]:
+        """Derive tiers, weighted points, confidence and interventions for a batch of score rows"""
+        cat_ids = list(range(1, 7))
+        
+        # Category risk levels from unrounded scores
+        category_levels = np.array(self.CATEGORY_RISK_LEVELS)[
+            np.digitize(scores, self.CATEGORY_RISK_BOUNDS)
+        ]
+        rounded_scores = np.round(scores, 2)
+        
+        # HSEG Comprehensive Scoring (Normalized to 28-point scale)
+        # For each category: contribution = (avg_score/4) * (num_questions * weight)
+        # Total max = 55.5; Normalized score = (total/55.5)*28
+        cat_configs = [self.category_config.get(cat_id, {'weight': 2.0, 'num_questions': 3}) for cat_id in cat_ids]
+        cat_max_points = np.array([cfg['num_questions'] * cfg['weight'] for cfg in cat_configs])
+        contributions = (rounded_scores / 4.0) * cat_max_points
+        total_weighted_points = contributions.sum(axis=1)
+        overall_scores_28 = HSEG_SCORING.normalize_points_to_28(total_weighted_points)
+        
+        # Overall risk tier from the 28-point thresholds
+        tier_bounds = [
+            self.risk_thresholds_28['crisis_max'],
+            self.risk_thresholds_28['at_risk_max'],
+            self.risk_thresholds_28['mixed_max'],
+            self.risk_thresholds_28['safe_max']
+        ]
+        overall_tiers = np.array(self.OVERALL_RISK_TIERS)[
+            np.searchsorted(tier_bounds, overall_scores_28, side='left')
+        ]
+        
+        # Prediction confidence from feature completeness and score consistency
+        confidences = np.full(len(responses), 0.7)
+        if features.shape[1] >= 50:
+            confidences += 0.1
+        score_variance = np.var(rounded_scores, axis=1)
+        confidences += np.where(score_variance < 0.5, 0.1, np.where(score_variance > 1.5, -0.1, 0.0))
+        confidences = np.clip(confidences, 0.5, 0.99)
+        
+        interventions = self._generate_interventions(rounded_scores, overall_tiers)
+        feature_importance = self._get_feature_importance() if include_feature_importance else None
+        
+        assessments = []
+        for row, response_data in enumerate(responses):
+            category_scores = {cat_id: float(rounded_scores[row, cat_id - 1]) for cat_id in cat_ids}
+            overall_tier = str(overall_tiers[row])
+            confidence = float(confidences[row])
             
-            return {
+            assessment = {
                 'response_id': response_data.get('response_id') or 'unknown',
-                'prediction_timestamp': datetime.now().isoformat(),
+                'prediction_timestamp': timestamp,
                 'model_version': self.model_version,
-                'overall_hseg_score': round(overall_score_28, 2),
+                'overall_hseg_score': float(np.round(overall_scores_28[row], 2)),
                 'overall_risk_tier': overall_tier,
                 'category_scores': category_scores,
-                'category_risk_levels': category_risks,
+                'category_risk_levels': {cat_id: str(category_levels[row, cat_id - 1]) for cat_id in cat_ids},
                 'confidence_score': confidence,
-                'contributing_factors': contributing_factors,
-                'recommended_interventions': interventions,
+                'contributing_factors': self._identify_risk_factors(response_data, category_scores),
+                'recommended_interventions': interventions[row],
                 'scoring_breakdown': {
-                    'category_weighted_points': category_weighted_points,
-                    'total_weighted_points_55_5': round(total_weighted_points, 3),
-                    'normalized_28_point_score': round(overall_score_28, 3)
+                    'category_weighted_points': {
+                        cat_id: float(np.round(contributions[row, cat_id - 1], 3)) for cat_id in cat_ids
+                    },
+                    'total_weighted_points_55_5': float(np.round(total_weighted_points[row], 3)),
+                    'normalized_28_point_score': float(np.round(overall_scores_28[row], 3))
                 },
-                'feature_importance': self._get_feature_importance(),
                 'processing_metadata': {
-                    'features_extracted': len(features.flatten()),
+                    'features_extracted': features.shape[1],
                     'models_used': len(self.models),
                     'prediction_quality': 'High' if confidence > 0.8 else 'Medium' if confidence > 0.6 else 'Low'
                 }
             }
-            
-        except Exception as e:
-            return {
-                'error': str(e),
-                'response_id': response_data.get('response_id', 'unknown'),
-                'prediction_timestamp': datetime.now().isoformat()
-            }
-    
-    def _calculate_confidence(self, features_scaled: np.ndarray, category_scores: Dict) -> float:
-        """Calculate prediction confidence based on model agreement and feature quality"""
-        
-        # Base confidence from feature quality
-        base_confidence = 0.7
-        
-        # Adjust for response quality
-        if len(features_scaled[0]) >= 50:  # Full feature set
-            base_confidence += 0.1
+            if include_feature_importance:
+                assessment['feature_importance'] = feature_importance
+            assessments.append(assessment)
         
-        # Adjust for score consistency (less variance = higher confidence)
-        scores = list(category_scores.values())
-        score_variance = np.var(scores)
-        if score_variance < 0.5:
-            base_confidence += 0.1
-        elif score_variance > 1.5:
-            base_confidence -= 0.1
-        
-        # Ensure confidence is in valid range
-        return max(0.5, min(0.99, base_confidence))
+        return assessments
+    
+    def _error_result(self, response_data: Dict, error: Union[Exception, str], timestamp: str) -> Dict[str, Any]:
+        """Error payload for a response that could not be scored"""
+        return {
+            'error': str(error),
+            'response_id': response_data.get('response_id', 'unknown'),
+            'prediction_timestamp': timestamp
+        }
     
     def _identify_risk_factors(self, response_data: Dict, category_scores: Dict) -> List[str]:
         """Identify key contributing risk factors"""
@@ -471,15 +1071,7 @@ class IndividualRiskPredictor:
         # Check for high-risk categories
         for cat_id, score in category_scores.items():
             if score < 2.0:
-                category_names = {
-                    1: "Authority abuse and retaliation fears",
-                    2: "Discrimination and exclusion experiences", 
-                    3: "Emotional manipulation and boundary violations",
-                    4: "System accountability failures",
-                    5: "Work-related mental health harm",
-                    6: "Voice suppression and disempowerment"
-                }
-                factors.append(category_names.get(cat_id, f"Category {cat_id} risk"))
+                factors.append(self.RISK_FACTOR_NAMES.get(cat_id, f"Category {cat_id} risk"))
         
         # Check text analysis for specific risks
         text_analysis = response_data.get('text_analysis', {})
@@ -496,98 +1088,104 @@ class IndividualRiskPredictor:
         
         return factors[:5]  # Return top 5 factors
     
-    def _generate_interventions(self, category_scores: Dict, overall_tier: str) -> List[Dict]:
-        """Generate targeted intervention recommendations"""
-        interventions = []
-        
-        if overall_tier in ["Crisis", "At Risk"]:
-            # Identify worst-performing categories
-            worst_categories = sorted(category_scores.items(), key=lambda x: x[1])[:3]
-            
-            for cat_id, score in worst_categories:
-                if score < 2.5:
-                    intervention_mapping = {
-                        1: {
-                            'category': 'Power Abuse & Suppression',
-                            'intervention': 'Management training on psychological safety',
-                            'urgency': 'Immediate',
-                            'effort': 'Medium',
-                            'impact': 'High'
-                        },
-                        2: {
-                            'category': 'Discrimination & Exclusion', 
-                            'intervention': 'DEI training and policy enforcement',
-                            'urgency': 'High',
-                            'effort': 'Medium',
-                            'impact': 'High'
-                        },
-                        3: {
-                            'category': 'Manipulative Work Culture',
-                            'intervention': 'Culture alignment and values training',
-                            'urgency': 'Medium',
-                            'effort': 'Low',
-                            'impact': 'Medium'
-                        },
-                        4: {
-                            'category': 'Failure of Accountability',
-                            'intervention': 'Investigation process overhaul',
-                            'urgency': 'Immediate',
-                            'effort': 'High',
-                            'impact': 'High'
-                        },
-                        5: {
-                            'category': 'Mental Health Harm',
-                            'intervention': 'Employee assistance program expansion',
-                            'urgency': 'Immediate',
-                            'effort': 'Low',
-                            'impact': 'High'
-                        },
-                        6: {
-                            'category': 'Erosion of Voice & Autonomy',
-                            'intervention': 'Employee empowerment initiatives',
-                            'urgency': 'Medium',
-                            'effort': 'Medium',
-                            'impact': 'Medium'
-                        }
-                    }
-                    
-                    intervention = intervention_mapping.get(cat_id)
-                    if intervention:
-                        interventions.append(intervention)
+    def _generate_interventions(self, category_scores: np.ndarray, overall_tiers: np.ndarray) -> List[List[Dict]]:
+        """
+        Targeted intervention recommendations per row of category scores (responses x 6):
+        for Crisis/At Risk tiers, the worst three categories scoring below 2.5
+        """
+        # Worst categories first (stable so ties keep category order)
+        worst_order = np.argsort(category_scores, axis=1, kind='stable')[:, :3]
+        needs_intervention = np.isin(overall_tiers, ["Crisis", "At Risk"])
         
+        interventions = []
+        for row in range(len(category_scores)):
+            interventions.append([
+                dict(self.INTERVENTION_LIBRARY[idx + 1])
+                for idx in worst_order[row]
+                if needs_intervention[row] and category_scores[row, idx] < 2.5
+            ])
         return interventions
     
     def _get_feature_importance(self) -> Dict:
-        """Get feature importance from random forest models"""
+        """Top 10 features of the first category's random forest (precomputed at train/load)"""
+        return self._feature_importance_summary
+    
+    def get_feature_importance(self, category_id: int = 1, member: str = 'rf', top_k: int = 10) -> Dict:
+        """Top features for one category and ensemble member (xgb, nn or rf)"""
+        importance = self.feature_importances.get(f'category_{category_id}', {}).get(member)
+        if importance is None:
+            return {}
+        return self._top_features(importance, top_k)
+    
+    def _top_features(self, importance: np.ndarray, top_k: int = 10) -> Dict:
         importance_dict = {}
-        
+        top_indices = np.argsort(importance)[-top_k:][::-1]
+        for i, idx in enumerate(top_indices):
+            if idx < len(self.feature_names):
+                importance_dict[f'feature_{i+1}'] = {
+                    'name': self.feature_names[idx],
+                    'importance': float(importance[idx])
+                }
+        return importance_dict
+    
+    def _compute_feature_importances(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Importance vectors for every category and ensemble member
+        Trees use their impurity/gain importances; the MLP uses normalized mean |first-layer weight|
+        """
+        importances = {}
+        for cat_id in range(1, 7):
+            # Multi-output members are shared, so every category gets the same vectors
+            ensemble = self.models.get(f'category_{cat_id}') or self.models.get('multi_output')
+            if ensemble is None:
+                continue
+            members = {}
+            for name, estimator in ensemble.named_estimators_.items():
+                importance = self._member_importance(estimator)
+                if importance is not None:
+                    members[name] = importance
+            importances[f'category_{cat_id}'] = members
+        return importances
+    
+    @classmethod
+    def _member_importance(cls, estimator) -> Optional[np.ndarray]:
+        if isinstance(estimator, FoldAveragedRegressor):
+            fold_importances = [cls._member_importance(fold_model) for fold_model in estimator.estimators_]
+            return None if any(i is None for i in fold_importances) else np.mean(fold_importances, axis=0)
+        if hasattr(estimator, 'feature_importances_'):
+            return np.asarray(estimator.feature_importances_, dtype=np.float64)
+        if hasattr(estimator, 'coefs_'):
+            importance = np.abs(estimator.coefs_[0]).mean(axis=1)
+            return importance / max(importance.sum(), 1e-12)
+        return None
+    
+    def _refresh_feature_importances(self, importances: Optional[Dict[str, Dict[str, np.ndarray]]] = None):
+        """Install importance vectors (computing them if needed) and the per-response summary"""
+        self._feature_importance_summary = {}
         try:
-            # Get importance from first category's random forest model
-            if 'category_1' in self.models:
-                rf_model = self.models['category_1'].named_estimators_['rf']
-                importance = rf_model.feature_importances_
-                
-                feature_names = [
-                    'Q1_Safe_Speaking', 'Q2_Leadership_Silencing', 'Q3_Fear_Consequences',
-                    'Q4_Domain_Specific', 'Q5_Fair_Treatment', 'Q6_Equal_Access',
-                    # ... (would include all 50+ feature names)
-                ]
-                
-                # Get top 10 most important features
-                top_indices = np.argsort(importance)[-10:][::-1]
-                for i, idx in enumerate(top_indices):
-                    if idx < len(feature_names):
-                        importance_dict[f'feature_{i+1}'] = {
-                            'name': feature_names[idx],
-                            'importance': float(importance[idx])
-                        }
+            self.feature_importances = importances if importances is not None else self._compute_feature_importances()
+            # Random forest importances when the member is kept, else the first remaining member's
+            category_1 = self.feature_importances.get('category_1', {})
+            summary_importance = category_1.get('rf', next(iter(category_1.values()), None))
+            if summary_importance is not None:
+                self._feature_importance_summary = self._top_features(summary_importance)
         except Exception as e:
-            importance_dict['error'] = str(e)
-        
-        return importance_dict
+            self.feature_importances = {}
+            self._feature_importance_summary = {'error': str(e)}
+    
+    def _refresh_model_sizes(self):
+        """Approximate bytes of every member, per category (or for the shared multi-output ensemble)"""
+        self.model_sizes = {}
+        for key, ensemble in self.models.items():
+            sizes = {name: model_compaction.estimator_nbytes(estimator)
+                     for name, estimator in ensemble.named_estimators_.items()}
+            sizes['total'] = sum(sizes.values())
+            self.model_sizes[key] = sizes
     
     def save_model(self, filepath: str):
         """Save trained model to disk"""
+        if not self.models:
+            raise ValueError("No fitted estimators to pickle (model was loaded from a flat artifact)")
         model_data = {
             'models': self.models,
             'scalers': self.scalers,
@@ -595,8 +1193,14 @@ class IndividualRiskPredictor:
             'category_weights': self.category_weights,
             'risk_thresholds_28': self.risk_thresholds_28,
             'model_version': self.model_version,
+            'model_layout': self.model_layout,
+            'ensemble_strategy': self.ensemble_strategy,
+            'update_history': self.update_history,
+            'rf_compaction': self.rf_compaction,
+            'member_selection': self.member_selection,
             'is_trained': self.is_trained,
-            'feature_names': self.feature_names
+            'feature_names': self.feature_names,
+            'feature_importances': self.feature_importances
         }
         
         with open(filepath, 'wb') as f:
@@ -616,21 +1220,93 @@ class IndividualRiskPredictor:
         # Backward-compat: accept either key
         self.risk_thresholds_28 = model_data.get('risk_thresholds_28', model_data.get('risk_thresholds', self.risk_thresholds_28))
         self.model_version = model_data['model_version']
+        self.model_layout = model_data.get('model_layout', 'per_category')
+        self.ensemble_strategy = model_data.get('ensemble_strategy', 'refit')
+        self.update_history = model_data.get('update_history', [])
+        self.rf_compaction = model_data.get('rf_compaction')
+        self.member_selection = model_data.get('member_selection')
         self.is_trained = model_data['is_trained']
-        self.feature_names = model_data.get('feature_names', [])
+        self.feature_names = model_data.get('feature_names') or list(self.feature_extractor.feature_names)
+        # A previously attached ONNX graph or flat artifact belongs to the old model
+        self.onnx_scorer = None
+        self.flat_scorer = None
+        # Older artifacts do not carry importances; compute them once here
+        self._refresh_feature_importances(model_data.get('feature_importances'))
+        self._refresh_model_sizes()
         
         print(f"Model loaded from {filepath}")
     
+    def save_flat_model(self, filepath: str, source_digest: Optional[str] = None):
+        """
+        Save the fitted ensemble as flat numpy buffers that load with np.load(mmap_mode='r')
+        source_digest (file_digest of the pickle saved alongside) lets loaders detect a stale flat file
+        """
+        from app.models.flat_artifact import save_flat_model
+        save_flat_model(self, filepath, source_digest=source_digest)
+    
+    def load_flat_model(self, filepath: str, mmap: bool = True):
+        """
+        Serve from a flat artifact without unpickling any estimator
+        With mmap=True the arrays stay in the OS page cache, shared by every worker process
+        Training, updates and ONNX export need the pickled model instead
+        """
+        from app.models.flat_artifact import FlatIndividualScorer
+        scorer = FlatIndividualScorer(filepath, mmap=mmap)
+        metadata = scorer.metadata
+        
+        self.models = {}
+        self.scalers = {}
+        self.category_weights = {int(k): v for k, v in metadata['category_weights'].items()}
+        self.risk_thresholds_28 = metadata['risk_thresholds_28']
+        self.model_version = metadata['model_version']
+        self.model_layout = metadata['model_layout']
+        self.ensemble_strategy = metadata['ensemble_strategy']
+        self.update_history = metadata['update_history']
+        self.feature_names = metadata['feature_names']
+        self.is_trained = True
+        self.onnx_scorer = None
+        self.flat_scorer = scorer
+        self.rf_compaction = metadata.get('rf_compaction')
+        self.member_selection = metadata.get('member_selection')
+        self._refresh_feature_importances(scorer.feature_importances())
+        self.model_sizes = {}
+        
+        print(f"Flat model loaded from {filepath}")
+    
     def get_model_info(self) -> Dict:
         """Get model information and status"""
         return {
             'model_version': self.model_version,
             'is_trained': self.is_trained,
-            'num_categories': len(self.models),
+            'model_layout': self.model_layout,
+            'ensemble_strategy': self.ensemble_strategy,
+            'updates_since_training': len(self.update_history),
+            'rf_compaction': self.rf_compaction,
+            'ensemble_members': self._ensemble_member_names(),
+            'member_selection': None if self.member_selection is None else {
+                k: v for k, v in self.member_selection.items() if k != 'tradeoff_table'},
+            'model_size_bytes': self.model_sizes if self.flat_scorer is None else {'flat_artifact': self.flat_scorer.nbytes},
+            'inference_backend': self._inference_backend(),
+            'num_categories': 6 if 'multi_output' in self.models or self.flat_scorer is not None else len(self.models),
             'category_weights': self.category_weights,
             'risk_thresholds_28': self.risk_thresholds_28,
-            'feature_count': len(self.feature_names) if self.feature_names else 'Unknown'
+            'feature_count': len(self.feature_names) if self.feature_names else 'Unknown',
+            'feature_names': self.feature_names
         }
+    
+    def _ensemble_member_names(self) -> List[str]:
+        if self.member_selection is not None:
+            return list(self.member_selection['selected_members'])
+        if self.models:
+            return list(next(iter(self.models.values())).named_estimators_)
+        return []
+    
+    def _inference_backend(self) -> str:
+        if self.onnx_scorer is not None:
+            return 'onnxruntime'
+        if self.flat_scorer is not None:
+            return 'flat_mmap' if self.flat_scorer.mmap else 'flat_arrays'
+        return 'sklearn'
 
 # Example usage and testing functions
 def create_sample_response_data() -> Dict:
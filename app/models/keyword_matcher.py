@@ -0,0 +1,45 @@
+"""
+HSEG Keyword Matcher - one normalization and one scan per text for risk analysis
+Keyword lists (risk categories, crisis language, emotional words, incident markers)
+are compiled once into a single deduplicated needle set; a scan reports the hits of
+every list at once over text that has been normalized exactly once
+"""
+
+import re
+from typing import Dict, Iterable, List
+
+_KEEP = re.compile(r'[\w\s.,!?;:-]')
+_DROP = re.compile(r'[^\w\s.,!?;:-]')
+# ASCII characters normalize_text removes, for the str.translate fast path
+_ASCII_DROP = {code: None for code in range(128) if not _KEEP.match(chr(code))}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase, drop special characters (punctuation used for context is kept) and collapse whitespace
+    Idempotent, so text normalized once never needs to be normalized again
+    """
+    if not text or not isinstance(text, str):
+        return ""
+    text = text.lower()
+    text = text.translate(_ASCII_DROP) if text.isascii() else _DROP.sub('', text)
+    # str.split() and the regex \s agree on what whitespace is
+    return ' '.join(text.split())
+
+
+class KeywordMatcher:
+    """
+    Named keyword lists compiled for matching against normalized (lowercase) text
+    Needles are lowercased and deduplicated across lists, so a keyword shared by several
+    lists is searched once. Substring semantics: 'bias' also matches 'biased'
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self.groups: Dict[str, tuple] = {name: tuple(k for k in keywords if k) for name, keywords in groups.items()}
+        self._needles = tuple(dict.fromkeys(k.lower() for keywords in self.groups.values() for k in keywords))
+
+    def scan(self, text: str) -> Dict[str, List[str]]:
+        """Keywords of each list found in text, in list order"""
+        # CPython's substring search beats a compiled alternation/trie regex for lists of this size
+        found = {needle for needle in self._needles if needle in text} if text else set()
+        return {name: [k for k in keywords if k.lower() in found] for name, keywords in self.groups.items()}
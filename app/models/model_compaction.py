@@ -0,0 +1,147 @@
+"""
+HSEG Model Compaction - Size accounting and random-forest pruning for the Individual Risk Model
+Fitted trees are pruned by capping their depth and merging sibling leaves with
+near-identical values; whole trees are ranked by how much the forest's
+validation error depends on them so the least useful ones can be dropped
+"""
+
+import copy
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import xgboost as xgb
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.neural_network import MLPRegressor
+from sklearn.tree._tree import Tree
+
+from app.models.ensemble import FoldAveragedRegressor
+
+TREE_LEAF = -1
+TREE_UNDEFINED = -2
+
+
+def estimator_nbytes(estimator) -> int:
+    """Approximate in-memory size of a fitted member (node tables, weights or serialized booster)"""
+    if isinstance(estimator, FoldAveragedRegressor):
+        return sum(estimator_nbytes(fold_model) for fold_model in estimator.estimators_)
+    if isinstance(estimator, RandomForestRegressor):
+        return sum(tree_nbytes(tree_model.tree_) for tree_model in estimator.estimators_)
+    if isinstance(estimator, xgb.XGBRegressor):
+        return len(estimator.get_booster().save_raw('ubj'))
+    if isinstance(estimator, MLPRegressor):
+        return int(sum(a.nbytes for a in estimator.coefs_) + sum(b.nbytes for b in estimator.intercepts_))
+    return 0
+
+
+def tree_nbytes(tree: Tree) -> int:
+    """One sklearn tree: a 64-byte node record plus its value row per node"""
+    return int(tree.node_count * (64 + tree.value[0].nbytes))
+
+
+def random_forests(estimator) -> List[RandomForestRegressor]:
+    """The forests inside a member (fold-averaged members hold one per fold)"""
+    if isinstance(estimator, FoldAveragedRegressor):
+        return [forest for fold_model in estimator.estimators_ for forest in random_forests(fold_model)]
+    return [estimator] if isinstance(estimator, RandomForestRegressor) else []
+
+
+def _node_depths(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    depth = np.zeros(len(left), dtype=np.int64)
+    frontier, level = np.array([0]), 0
+    while frontier.size:
+        depth[frontier] = level
+        children = np.concatenate([left[frontier], right[frontier]])
+        frontier, level = children[children >= 0], level + 1
+    return depth
+
+
+def prune_tree(tree_model, max_depth: Optional[int] = None, merge_tolerance: float = 0.0):
+    """
+    Copy of a fitted DecisionTreeRegressor with a depth cap and merged leaves
+    Internal nodes already store the mean target of their samples, so turning one
+    into a leaf predicts exactly what a tree grown to that depth would
+    merge_tolerance: siblings whose leaf values differ by at most this much collapse into their parent
+    """
+    state = tree_model.tree_.__getstate__()
+    nodes, values = state['nodes'].copy(), state['values']
+    left, right = nodes['left_child'], nodes['right_child']
+
+    if max_depth is not None:
+        depth = _node_depths(left, right)
+        left[depth >= max_depth] = TREE_LEAF
+        right[depth >= max_depth] = TREE_LEAF
+
+    if merge_tolerance > 0:
+        while True:
+            is_leaf = left == TREE_LEAF
+            internal = np.flatnonzero(~is_leaf)
+            both_leaves = internal[is_leaf[left[internal]] & is_leaf[right[internal]]]
+            spread = np.abs(values[left[both_leaves]] - values[right[both_leaves]]).reshape(len(both_leaves), -1)
+            mergeable = both_leaves[spread.max(axis=1) <= merge_tolerance] if len(both_leaves) else both_leaves
+            if not mergeable.size:
+                break
+            left[mergeable] = TREE_LEAF
+            right[mergeable] = TREE_LEAF
+
+    # Keep the nodes still reachable from the root, renumbered in their original order
+    reachable = np.zeros(len(nodes), dtype=bool)
+    frontier = np.array([0])
+    while frontier.size:
+        reachable[frontier] = True
+        children = np.concatenate([left[frontier], right[frontier]])
+        frontier = children[children >= 0]
+    new_ids = np.cumsum(reachable) - 1
+
+    kept = nodes[reachable]
+    is_leaf = kept['left_child'] == TREE_LEAF
+    kept['left_child'] = np.where(is_leaf, TREE_LEAF, new_ids[np.maximum(kept['left_child'], 0)])
+    kept['right_child'] = np.where(is_leaf, TREE_LEAF, new_ids[np.maximum(kept['right_child'], 0)])
+    kept['feature'][is_leaf] = TREE_UNDEFINED
+    kept['threshold'][is_leaf] = TREE_UNDEFINED
+
+    tree = tree_model.tree_
+    pruned = Tree(tree.n_features, np.ones(tree.n_outputs, dtype=np.intp), tree.n_outputs)
+    pruned.__setstate__({
+        'max_depth': int(_node_depths(kept['left_child'], kept['right_child']).max()),
+        'node_count': int(reachable.sum()),
+        'nodes': np.ascontiguousarray(kept),
+        'values': np.ascontiguousarray(values[reachable]),
+    })
+    pruned_model = copy.copy(tree_model)
+    pruned_model.tree_ = pruned
+    return pruned_model
+
+
+def rank_trees(trees: List[Any], X_val: np.ndarray, y_val: np.ndarray) -> np.ndarray:
+    """
+    Tree indices ordered from most to least useful
+    A tree's contribution is how much the forest's validation MSE rises without it
+    """
+    X_val = np.asarray(X_val, dtype=np.float32)
+    predictions = np.stack([tree.predict(X_val).reshape(len(X_val), -1) for tree in trees])
+    y_val = np.asarray(y_val, dtype=np.float64).reshape(len(X_val), -1)
+
+    total = predictions.sum(axis=0)
+    n_trees = len(trees)
+    without = (total[None] - predictions) / max(n_trees - 1, 1)
+    mse_without = ((without - y_val[None]) ** 2).mean(axis=(1, 2))
+    mse_all = ((total / n_trees - y_val) ** 2).mean()
+    # Stable sort keeps the original order between equally useful trees
+    return np.argsort(-(mse_without - mse_all), kind='stable')
+
+
+def set_forest_trees(forest: RandomForestRegressor, trees: List[Any]):
+    """Replace a fitted forest's trees in place"""
+    forest.estimators_ = list(trees)
+    forest.n_estimators = len(forest.estimators_)
+
+
+def compaction_summary(forests: List[RandomForestRegressor]) -> Dict[str, Any]:
+    trees = [tree_model.tree_ for forest in forests for tree_model in forest.estimators_]
+    return {
+        'forests': len(forests),
+        'trees': len(trees),
+        'nodes': int(sum(tree.node_count for tree in trees)),
+        'max_depth': int(max((tree.max_depth for tree in trees), default=0)),
+        'nbytes': int(sum(tree_nbytes(tree) for tree in trees)),
+    }
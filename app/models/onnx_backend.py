@@ -0,0 +1,327 @@
+"""
+HSEG ONNX Backend - ONNX export and onnxruntime scoring for the Individual Risk Model
+Compiles the feature scaler and all ensemble members (with their weights) into one
+graph that maps the (n x 50) feature matrix to (n x 6) category scores
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.ensemble import FoldAveragedRegressor, StackedEnsemble
+
+# Optional dependencies: only needed to export or to serve through onnxruntime
+try:
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+ONNX_OPSET = 17
+ONNX_ML_OPSET = 3
+# Pinned so graphs written by a newer onnx still load in older onnxruntime releases
+ONNX_IR_VERSION = 8
+INPUT_NAME = 'features'
+OUTPUT_NAME = 'category_scores'
+MEMBER_NAMES = ('xgb', 'nn', 'rf')
+NUM_CATEGORIES = 6
+
+
+def _ensemble_members(predictor) -> Tuple[Dict[str, List[Tuple[List[int], Any, float]]], np.ndarray, np.ndarray]:
+    """
+    Group fitted members by type with the categories each one predicts
+    Fold-averaged members expand into their fold models, each scaled by 1/folds
+    Members dropped by member selection keep an empty list and zero weight
+    Returns: ({member: [(target ids, estimator, scale)]}, (3 x 6) member weights, (6,) intercept)
+    """
+    members = {name: [] for name in MEMBER_NAMES}
+    weights = np.zeros((len(MEMBER_NAMES), NUM_CATEGORIES), dtype=np.float64)
+    intercept = np.zeros(NUM_CATEGORIES, dtype=np.float64)
+
+    if 'multi_output' in predictor.models:
+        containers = [(list(range(NUM_CATEGORIES)), predictor.models['multi_output'])]
+    else:
+        containers = [([cat_id - 1], predictor.models[f'category_{cat_id}'])
+                      for cat_id in range(1, NUM_CATEGORIES + 1)]
+
+    for target_ids, ensemble in containers:
+        rows = [MEMBER_NAMES.index(name) for name in ensemble.named_estimators_]
+        for name, estimator in ensemble.named_estimators_.items():
+            fold_models = estimator.estimators_ if isinstance(estimator, FoldAveragedRegressor) else [estimator]
+            for fold_model in fold_models:
+                members[name].append((target_ids, fold_model, 1.0 / len(fold_models)))
+
+        if isinstance(ensemble, StackedEnsemble):
+            # Stacker coefficients are used as fitted, plus the intercept
+            weights[np.ix_(rows, target_ids)] = ensemble.coef
+            intercept[target_ids] = ensemble.intercept
+        else:
+            # VotingRegressor and MultiOutputEnsemble both divide by the weight sum
+            weights[np.ix_(rows, target_ids)] = 1.0 if ensemble.weights is None else np.reshape(
+                np.asarray(ensemble.weights, dtype=np.float64), (len(rows), -1))
+            weights[:, target_ids] /= weights[:, target_ids].sum(axis=0, keepdims=True)
+
+    return members, weights, intercept
+
+
+class _TreeNodes:
+    """Attribute lists for one ai.onnx.ml TreeEnsembleRegressor node"""
+
+    def __init__(self):
+        self.nodes = {key: [] for key in (
+            'treeids', 'nodeids', 'featureids', 'modes', 'values',
+            'truenodeids', 'falsenodeids', 'missing_value_tracks_true')}
+        self.targets = {key: [] for key in ('treeids', 'nodeids', 'ids', 'weights')}
+        self.tree_count = 0
+
+    def add_tree(self, left: np.ndarray, right: np.ndarray, feature: np.ndarray,
+                 threshold: np.ndarray, default_left: np.ndarray, mode: str,
+                 leaf_values: np.ndarray, target_ids: List[int], scale: float = 1.0):
+        """Append one binary tree; leaf_values is (nodes x len(target_ids))"""
+        tree_id = self.tree_count
+        self.tree_count += 1
+        for node in range(len(left)):
+            is_leaf = left[node] < 0
+            self.nodes['treeids'].append(tree_id)
+            self.nodes['nodeids'].append(node)
+            self.nodes['featureids'].append(0 if is_leaf else int(feature[node]))
+            self.nodes['modes'].append('LEAF' if is_leaf else mode)
+            self.nodes['values'].append(0.0 if is_leaf else float(threshold[node]))
+            self.nodes['truenodeids'].append(0 if is_leaf else int(left[node]))
+            self.nodes['falsenodeids'].append(0 if is_leaf else int(right[node]))
+            self.nodes['missing_value_tracks_true'].append(0 if is_leaf else int(default_left[node]))
+            if is_leaf:
+                for k, target in enumerate(target_ids):
+                    self.targets['treeids'].append(tree_id)
+                    self.targets['nodeids'].append(node)
+                    self.targets['ids'].append(target)
+                    self.targets['weights'].append(float(leaf_values[node, k]) * scale)
+
+    def make_node(self, input_name: str, output_name: str, base_values: np.ndarray,
+                  threshold_type: int) -> 'onnx.NodeProto':
+        attrs = {f'nodes_{key}': values for key, values in self.nodes.items() if key != 'values'}
+        attrs.update({f'target_{key}': values for key, values in self.targets.items()})
+        # Thresholds keep the estimator's own precision (float32 for XGBoost, float64 for sklearn)
+        values = np.array(self.nodes['values'],
+                          dtype=np.float64 if threshold_type == TensorProto.DOUBLE else np.float32)
+        attrs['nodes_values_as_tensor'] = numpy_helper.from_array(values)
+        attrs['base_values_as_tensor'] = numpy_helper.from_array(base_values.astype(values.dtype))
+        return helper.make_node(
+            'TreeEnsembleRegressor', [input_name], [output_name], domain='ai.onnx.ml',
+            n_targets=NUM_CATEGORIES, aggregate_function='SUM', post_transform='NONE', **attrs
+        )
+
+
+def _xgboost_trees(estimator) -> Tuple[List[Dict[str, np.ndarray]], np.ndarray]:
+    """Read trees and base score from an XGBRegressor's JSON dump"""
+    import json
+    booster_json = json.loads(estimator.get_booster().save_raw('json'))
+    learner = booster_json['learner']
+    base_score = np.array(
+        [float(v) for v in learner['learner_model_param']['base_score'].strip('[]').split(',')],
+        dtype=np.float64
+    )
+
+    trees = []
+    for tree in learner['gradient_booster']['model']['trees']:
+        n_leaf_values = int(tree['tree_param'].get('size_leaf_vector', '1') or 1)
+        left = np.array(tree['left_children'], dtype=np.int64)
+        if n_leaf_values > 1:
+            # Multi-target trees keep one weight vector per node
+            leaf_values = np.array(tree['base_weights'], dtype=np.float32).reshape(len(left), n_leaf_values)
+        else:
+            leaf_values = np.array(tree['split_conditions'], dtype=np.float32).reshape(-1, 1)
+        trees.append({
+            'left': left,
+            'right': np.array(tree['right_children'], dtype=np.int64),
+            'feature': np.array(tree['split_indices'], dtype=np.int64),
+            'threshold': np.array(tree['split_conditions'], dtype=np.float32),
+            'default_left': np.array(tree['default_left'], dtype=np.int64),
+            'leaf_values': leaf_values,
+        })
+    return trees, base_score
+
+
+def _xgboost_node(members: List[Tuple[List[int], Any, float]], input_name: str, output_name: str):
+    """All XGBoost boosters of the ensemble as one summed tree ensemble (x < threshold goes left)"""
+    nodes = _TreeNodes()
+    base_values = np.zeros(NUM_CATEGORIES, dtype=np.float64)
+    for target_ids, estimator, scale in members:
+        trees, base_score = _xgboost_trees(estimator)
+        base_values[target_ids] += base_score * scale
+        for tree in trees:
+            nodes.add_tree(tree['left'], tree['right'], tree['feature'], tree['threshold'],
+                           tree['default_left'], 'BRANCH_LT', tree['leaf_values'], target_ids, scale)
+    return nodes.make_node(input_name, output_name, base_values, TensorProto.FLOAT)
+
+
+def _random_forest_node(members: List[Tuple[List[int], Any, float]], input_name: str, output_name: str):
+    """All random forests as one tree ensemble; leaf values are pre-divided to average per forest"""
+    nodes = _TreeNodes()
+    for target_ids, estimator, member_scale in members:
+        scale = member_scale / len(estimator.estimators_)
+        for tree_model in estimator.estimators_:
+            tree = tree_model.tree_
+            leaf_values = tree.value[:, :, 0].reshape(tree.node_count, -1)
+            nodes.add_tree(tree.children_left, tree.children_right, tree.feature, tree.threshold,
+                           np.ones(tree.node_count, dtype=np.int64), 'BRANCH_LEQ',
+                           leaf_values, target_ids, scale)
+    return nodes.make_node(input_name, output_name,
+                           np.zeros(NUM_CATEGORIES, dtype=np.float64), TensorProto.DOUBLE)
+
+
+def _mlp_nodes(members: List[Tuple[List[int], Any, float]], input_name: str, output_name: str,
+               initializers: List['onnx.TensorProto']) -> List['onnx.NodeProto']:
+    """MLP forward passes in float64, scattered into one (n x 6) output"""
+    nodes, outputs = [], []
+    for m, (target_ids, estimator, scale) in enumerate(members):
+        if estimator.activation != 'relu':
+            raise ValueError(f"Unsupported MLP activation for ONNX export: {estimator.activation}")
+
+        # Pad each member's outputs to all 6 categories so members can be summed
+        layer_input = input_name
+        n_layers = len(estimator.coefs_)
+        for layer, (coef, intercept) in enumerate(zip(estimator.coefs_, estimator.intercepts_)):
+            if layer == n_layers - 1:
+                padded_coef = np.zeros((coef.shape[0], NUM_CATEGORIES), dtype=np.float64)
+                padded_intercept = np.zeros(NUM_CATEGORIES, dtype=np.float64)
+                padded_coef[:, target_ids] = coef * scale
+                padded_intercept[target_ids] = intercept * scale
+                coef, intercept = padded_coef, padded_intercept
+            prefix = f'nn{m}_layer{layer}'
+            initializers.append(numpy_helper.from_array(coef.astype(np.float64), f'{prefix}_coef'))
+            initializers.append(numpy_helper.from_array(intercept.astype(np.float64), f'{prefix}_intercept'))
+            nodes.append(helper.make_node('Gemm', [layer_input, f'{prefix}_coef', f'{prefix}_intercept'],
+                                          [f'{prefix}_out']))
+            layer_input = f'{prefix}_out'
+            if layer < n_layers - 1:
+                nodes.append(helper.make_node('Relu', [layer_input], [f'{prefix}_relu']))
+                layer_input = f'{prefix}_relu'
+        outputs.append(layer_input)
+
+    nodes.append(helper.make_node('Sum', outputs, [output_name]))
+    return nodes
+
+
+def export_individual_model(predictor, filepath: str, source_digest: Optional[str] = None) -> 'onnx.ModelProto':
+    """
+    Export a trained IndividualRiskPredictor to an ONNX graph
+    Input 'features' (n x 50 float32) -> output 'category_scores' (n x 6 float64, unclipped)
+    """
+    if not ONNX_AVAILABLE:
+        raise ImportError("onnx is required for ONNX export (pip install onnx)")
+    if not predictor.is_trained:
+        raise ValueError("Model must be trained before exporting to ONNX")
+
+    members, weights, intercept = _ensemble_members(predictor)
+    scaler = predictor.scalers['features']
+    n_features = len(predictor.feature_names)
+
+    initializers = [
+        numpy_helper.from_array(np.asarray(scaler.mean_, dtype=np.float64), 'scaler_mean'),
+        numpy_helper.from_array(np.asarray(scaler.scale_, dtype=np.float64), 'scaler_scale'),
+    ]
+    nodes = [
+        # Scale in float64 exactly like StandardScaler.transform, then match each member's input precision
+        helper.make_node('Cast', [INPUT_NAME], ['features_64'], to=TensorProto.DOUBLE),
+        helper.make_node('Sub', ['features_64', 'scaler_mean'], ['centered']),
+        helper.make_node('Div', ['centered', 'scaler_scale'], ['scaled_64']),
+        helper.make_node('Cast', ['scaled_64'], ['scaled_32'], to=TensorProto.FLOAT),
+        helper.make_node('Cast', ['scaled_32'], ['scaled_32_64'], to=TensorProto.DOUBLE),
+    ]
+    # Members removed by member selection get no subgraph
+    if members['xgb']:
+        nodes.append(_xgboost_node(members['xgb'], 'scaled_32', 'xgb_raw'))
+        nodes.append(helper.make_node('Cast', ['xgb_raw'], ['xgb_scores'], to=TensorProto.DOUBLE))
+    if members['rf']:
+        nodes.append(_random_forest_node(members['rf'], 'scaled_32_64', 'rf_raw'))
+        nodes.append(helper.make_node('Cast', ['rf_raw'], ['rf_scores'], to=TensorProto.DOUBLE))
+    if members['nn']:
+        nodes.extend(_mlp_nodes(members['nn'], 'scaled_64', 'nn_scores', initializers))
+
+    # Weighted member average (or linear stack) per category
+    weighted = []
+    for row, name in enumerate(MEMBER_NAMES):
+        if not members[name]:
+            continue
+        initializers.append(numpy_helper.from_array(weights[row], f'{name}_weight'))
+        nodes.append(helper.make_node('Mul', [f'{name}_scores', f'{name}_weight'], [f'{name}_weighted']))
+        weighted.append(f'{name}_weighted')
+    initializers.append(numpy_helper.from_array(intercept, 'stacker_intercept'))
+    nodes.append(helper.make_node('Sum', weighted + ['stacker_intercept'], [OUTPUT_NAME]))
+
+    graph = helper.make_graph(
+        nodes, 'hseg_individual_risk',
+        [helper.make_tensor_value_info(INPUT_NAME, TensorProto.FLOAT, [None, n_features])],
+        [helper.make_tensor_value_info(OUTPUT_NAME, TensorProto.DOUBLE, [None, NUM_CATEGORIES])],
+        initializers
+    )
+    model = helper.make_model(graph, opset_imports=[
+        helper.make_opsetid('', ONNX_OPSET), helper.make_opsetid('ai.onnx.ml', ONNX_ML_OPSET)
+    ], producer_name='hseg-core-ai', ir_version=ONNX_IR_VERSION)
+    metadata = {
+        'model_version': predictor.model_version,
+        'model_layout': getattr(predictor, 'model_layout', 'per_category'),
+        'feature_names': ','.join(predictor.feature_names),
+    }
+    if source_digest:
+        metadata['source_sha256'] = source_digest
+    helper.set_model_props(model, metadata)
+    onnx.checker.check_model(model)
+
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+    onnx.save_model(model, filepath)
+    print(f"ONNX model saved to {filepath}")
+    return model
+
+
+class OnnxIndividualScorer:
+    """
+    onnxruntime session for an exported Individual Risk Model graph
+    Drop-in replacement for the per-member sklearn calls in predict_category_scores
+    """
+
+    def __init__(self, filepath: str, num_threads: Optional[int] = None):
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("onnxruntime is required for the ONNX backend (pip install onnxruntime)")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.filepath = filepath
+        self.session = ort.InferenceSession(filepath, sess_options=options, providers=['CPUExecutionProvider'])
+        self.metadata = dict(self.session.get_modelmeta().custom_metadata_map)
+
+    def check_compatible(self, predictor, source_digest: Optional[str] = None):
+        """Refuse a graph exported from a different model artifact"""
+        exported_features = self.metadata.get('feature_names', '').split(',')
+        if exported_features != list(predictor.feature_names):
+            raise ValueError("ONNX model feature layout does not match the loaded model")
+        if self.metadata.get('model_version') != predictor.model_version:
+            raise ValueError(
+                f"ONNX model version {self.metadata.get('model_version')} does not match {predictor.model_version}"
+            )
+        exported_digest = self.metadata.get('source_sha256')
+        if source_digest and exported_digest and exported_digest != source_digest:
+            raise ValueError("ONNX model was exported from a different model artifact")
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """(n x 50) features -> (n x 6) raw category scores"""
+        return self.session.run([OUTPUT_NAME], {INPUT_NAME: np.ascontiguousarray(features, dtype=np.float32)})[0]
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            'backend': 'onnxruntime',
+            'model_path': self.filepath,
+            'exported_model_version': self.metadata.get('model_version'),
+            'exported_model_layout': self.metadata.get('model_layout'),
+        }
@@ -24,6 +24,9 @@ class OrganizationalRiskAggregator:
         self.risk_model = None
         self.turnover_model = None
         self.domain_encoder = None
+        # Boosting rounds chosen by early stopping; prediction stops there
+        self.risk_best_iteration = None
+        self.turnover_best_iteration = None
 
         # Industry baselines for psychological safety
         self.industry_baselines = {
@@ -51,6 +54,8 @@ class OrganizationalRiskAggregator:
                 self.risk_model = self.model_data.get('risk_model')
                 self.turnover_model = self.model_data.get('turnover_model')
                 self.domain_encoder = self.model_data.get('domain_encoder')
+                self.risk_best_iteration = self.model_data.get('risk_best_iteration')
+                self.turnover_best_iteration = self.model_data.get('turnover_best_iteration')
             self.is_loaded = True
             print(f"Organizational risk model loaded successfully from {self.model_path}")
             return True
@@ -282,10 +287,11 @@ class OrganizationalRiskAggregator:
             features = self.create_organizational_features(aggregated_stats, organization_info or {})
             X = features.reshape(1, -1)
             if self.risk_model is not None:
-                pred = self.risk_model.predict(X)
+                pred = self.risk_model.predict(X, **self._iteration_kwargs(self.risk_best_iteration))
                 overall_risk_tier = str(pred[0])
             if self.turnover_model is not None:
-                ml_turnover = float(self.turnover_model.predict(X)[0])
+                ml_turnover = float(self.turnover_model.predict(
+                    X, **self._iteration_kwargs(self.turnover_best_iteration))[0])
         except Exception:
             pass
 
@@ -373,11 +379,18 @@ class OrganizationalRiskAggregator:
     def predict(self, individual_predictions: List[Dict], organization_info: Dict = None) -> Dict[str, Any]:
         return self.predict_organizational_risk(individual_predictions, organization_info)
 
+    @staticmethod
+    def _iteration_kwargs(best_iteration: Optional[int]) -> Dict[str, Any]:
+        """LightGBM predict arguments that stop at the saved best iteration (older bundles have none)"""
+        return {'num_iteration': best_iteration} if best_iteration else {}
+
     def get_model_info(self) -> Dict[str, Any]:
         """Basic model info for status endpoints"""
         return {
             'is_loaded': self.is_loaded,
-            'model_path': self.model_path
+            'model_path': self.model_path,
+            'risk_best_iteration': self.risk_best_iteration,
+            'turnover_best_iteration': self.turnover_best_iteration
         }
 
     def generate_dashboard_data(self, organizational_assessment: Dict) -> Dict[str, Any]:
@@ -0,0 +1,113 @@
+"""
+HSEG Parallel Training - Process-pool fitting for the Individual Risk Model
+Every category x fold x estimator fit is an independent task whose result depends
+only on the task (fixed estimator seeds, fixed KFold splits), so the trained
+artifact is the same for any worker count
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import KFold
+
+# Training data and folds, set once per worker process by _init_worker
+_WORKER_STATE: Dict[str, Any] = {}
+
+# (target column or None for all targets, member name, fold index or None for the full fit)
+TaskKey = Tuple[Optional[int], str, Optional[int]]
+
+
+def cv_folds(n_samples: int, n_splits: int = 3) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """The fixed (train, validation) index splits shared by every training path"""
+    return list(KFold(n_splits=n_splits, shuffle=True, random_state=42).split(np.zeros((n_samples, 1))))
+
+
+def _init_worker(X: np.ndarray, y: np.ndarray, n_splits: int, threads_per_worker: int):
+    """Receive the training matrix once per process and cap native thread pools"""
+    from threadpoolctl import threadpool_limits
+    _WORKER_STATE.update(
+        X=X,
+        y=y,
+        threads=threads_per_worker,
+        folds=cv_folds(len(X), n_splits),
+        # Kept referenced so the BLAS/OpenMP limit stays applied for the worker's lifetime
+        limiter=threadpool_limits(limits=threads_per_worker)
+    )
+
+
+def _run_task(task: Tuple[TaskKey, Any, bool]) -> Tuple[TaskKey, Any]:
+    """
+    Fit one member; full-fit tasks return the fitted estimator, fold tasks return validation MSE
+    or, when keeping fold models, (fitted estimator, validation predictions)
+    """
+    (target, name, fold), prototype, keep_fold_model = task
+    X, y = _WORKER_STATE['X'], _WORKER_STATE['y']
+    y_target = y if target is None else y[:, target]
+
+    estimator = clone(prototype)
+    has_n_jobs = 'n_jobs' in estimator.get_params()
+    if has_n_jobs:
+        estimator.set_params(n_jobs=_WORKER_STATE['threads'])
+
+    if fold is None:
+        estimator.fit(X, y_target)
+        if has_n_jobs:
+            # Serve with the estimator's own default, not the training budget
+            estimator.set_params(n_jobs=prototype.get_params()['n_jobs'])
+        return (target, name, fold), estimator
+
+    train_idx, val_idx = _WORKER_STATE['folds'][fold]
+    estimator.fit(X[train_idx], y_target[train_idx])
+    y_pred = estimator.predict(X[val_idx])
+    if keep_fold_model:
+        if has_n_jobs:
+            estimator.set_params(n_jobs=prototype.get_params()['n_jobs'])
+        return (target, name, fold), (estimator, y_pred)
+    if target is None:
+        mse = mean_squared_error(y_target[val_idx], y_pred, multioutput='raw_values')
+    else:
+        mse = mean_squared_error(y_target[val_idx], y_pred)
+    return (target, name, fold), mse
+
+
+def default_threads_per_worker(n_workers: int) -> int:
+    return max(1, (os.cpu_count() or 1) // max(n_workers, 1))
+
+
+def fit_members(prototypes: List[Tuple[str, Any]], X: np.ndarray, y: np.ndarray,
+                targets: List[Optional[int]], n_splits: int = 3, n_workers: int = 1,
+                threads_per_worker: Optional[int] = None,
+                keep_fold_models: bool = False) -> Tuple[Dict[TaskKey, Any], Dict[TaskKey, Any]]:
+    """
+    Fit every (target, member, fold) CV task and every (target, member) full fit
+    keep_fold_models=True skips the full fits and returns each fold's model and predictions
+    Returns: (validation MSE or (model, predictions) per fold task, fitted estimator per full-fit task)
+    """
+    threads_per_worker = threads_per_worker or default_threads_per_worker(n_workers)
+    tasks = []
+    for target in targets:
+        for name, prototype in prototypes:
+            # Full fits first: they are the longest tasks, so scheduling them early shortens the tail
+            if not keep_fold_models:
+                tasks.append(((target, name, None), prototype, False))
+            tasks.extend(((target, name, fold), prototype, keep_fold_models) for fold in range(n_splits))
+
+    if n_workers <= 1:
+        _init_worker(X, y, n_splits, threads_per_worker)
+        try:
+            results = [_run_task(task) for task in tasks]
+        finally:
+            _WORKER_STATE['limiter'].restore_original_limits()
+            _WORKER_STATE.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(X, y, n_splits, threads_per_worker)) as executor:
+            results = list(executor.map(_run_task, tasks))
+
+    fold_scores = {key: value for key, value in results if key[2] is not None}
+    fitted = {key: value for key, value in results if key[2] is None}
+    return fold_scores, fitted
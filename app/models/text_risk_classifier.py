@@ -6,23 +6,86 @@ Uses BERT-based transformers to detect psychological risk signals in text
 import torch
 import torch.nn as nn
 from transformers import (
-    AutoTokenizer, AutoModel, AutoModelForSequenceClassification,
+    AutoConfig, AutoTokenizer, AutoModel, AutoModelForSequenceClassification,
     TrainingArguments, Trainer, pipeline
 )
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional, Any
-import re
 import json
+import os
+import time
 from datetime import datetime
 import pickle
 from sklearn.metrics import accuracy_score, f1_score, classification_report
 from datasets import Dataset
 import warnings
 
+from app.models.keyword_matcher import KeywordMatcher, normalize_text
+from app.utils.file_digest import file_digest
+
 # Suppress warnings
 warnings.filterwarnings('ignore')
 
+# Overall severity classes of the sklearn pipeline, most severe first
+SEVERITY_ORDER = ['Crisis', 'High_Risk', 'Moderate_Risk', 'Low_Risk']
+SEVERITY_MAP = {'Low_Risk': 0, 'Low': 0, 'Moderate_Risk': 1, 'Medium': 1, 'High_Risk': 2, 'High': 2, 'Crisis': 3, 'Critical': 3}
+# Categories that crisis language raises
+CRISIS_BOOSTED_CATEGORIES = ['power_abuse', 'mental_health']
+# Components loaded on first use (or by warmup()) and reported by get_model_info
+TEXT_COMPONENTS = ['tokenizer', 'transformer', 'sklearn', 'sentiment']
+MB = 1024 * 1024
+# int8 vs fp32 agreement record written next to a .pt checkpoint by scripts/benchmark_text_inference.py
+INT8_AGREEMENT_SUFFIX = '.int8_agreement.json'
+
+
+def int8_agreement_path(checkpoint_path: str) -> str:
+    return checkpoint_path + INT8_AGREEMENT_SUFFIX
+
+
+class RowwiseInt8Linear(nn.Module):
+    """
+    int8 replacement for nn.Linear on CPU: weights quantized per output channel once, activations
+    quantized per row (per token) at each call, so a text's output does not depend on its batch
+    mates or padding, unlike dynamic quantization's per-tensor activation scale
+    """
+
+    def __init__(self, linear: nn.Linear):
+        super().__init__()
+        weight = linear.weight.detach().float()
+        weight_scale = weight.abs().amax(dim=1).clamp(min=1e-8) / 127
+        self.register_buffer('weight_t', torch.round(weight / weight_scale[:, None]).to(torch.int8).t().contiguous())
+        self.register_buffer('weight_scale', weight_scale)
+        self.register_buffer('bias', None if linear.bias is None else linear.bias.detach().float().clone())
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        rows = x.reshape(-1, x.shape[-1]).float()
+        scale = rows.abs().amax(dim=1, keepdim=True).clamp(min=1e-8) / 127
+        quantized = torch.round(rows / scale).to(torch.int8)
+        out = torch._int_mm(quantized, self.weight_t).float() * scale * self.weight_scale
+        if self.bias is not None:
+            out = out + self.bias
+        return out.reshape(*x.shape[:-1], out.shape[-1])
+
+
+def quantize_linear_rowwise(module: nn.Module) -> nn.Module:
+    """Replace module's nn.Linear layers (recursively, in place) with RowwiseInt8Linear"""
+    for name, child in module.named_children():
+        if isinstance(child, nn.Linear):
+            setattr(module, name, RowwiseInt8Linear(child))
+        else:
+            quantize_linear_rowwise(child)
+    return module
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of this process (from /proc on Linux, None elsewhere)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
 class TextRiskClassifier:
     """
     BERT-based classifier for detecting psychological risk in employee text responses
@@ -35,13 +98,30 @@ class TextRiskClassifier:
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"Using device: {self.device}")
         
-        # Initialize tokenizer and model
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        # Base model (tokenizer + backbone config) and sentiment model; local directories load offline,
+        # TEXT_MODEL_LOCAL_FILES_ONLY=true never touches the network
+        self.base_model_path = os.getenv('TEXT_BASE_MODEL_PATH') or model_name
+        self.sentiment_model = os.getenv('TEXT_SENTIMENT_MODEL', 'cardiffnlp/twitter-roberta-base-sentiment-latest')
+        self.local_files_only = os.getenv('TEXT_MODEL_LOCAL_FILES_ONLY', 'false').lower() == 'true'
+        
+        # Components load when their backend first needs them, or all at once in warmup()
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self._tokenizer = None
         self.model = None
         self.sklearn_pipeline = None  # Optional TF-IDF + LogisticRegression pipeline (.pkl)
         self.class_thresholds = None  # Optional per-class thresholds for sklearn pipeline
         self.is_trained = False
         
+        # Transformer inference runs in fp32; int8 (RowwiseInt8Linear in place of the Linear layers on CPU) is opt-in
+        # and only applied to a checkpoint whose recorded int8 vs fp32 label flip rate is within the limit
+        self.configured_precision = os.getenv('TEXT_MODEL_PRECISION', 'fp32').lower()
+        self.int8_max_flip_rate = float(os.getenv('TEXT_MODEL_INT8_MAX_FLIP_RATE', '0.01'))
+        self.inference_precision = 'fp32'
+        self.inference_threads = int(os.getenv('TEXT_MODEL_NUM_THREADS', '0'))  # 0 keeps torch's default
+        self.inference_batch_size = int(os.getenv('TEXT_MODEL_BATCH_SIZE', '16'))
+        self.max_tokens = int(os.getenv('TEXT_MODEL_MAX_TOKENS', '256'))
+        self.quantized = False
+        
         # Risk keywords for each category
         self.risk_keywords = {
             'power_abuse': [
@@ -84,8 +164,27 @@ class TextRiskClassifier:
             'screamed at me', 'humiliated publicly', 'afraid for safety'
         ]
         
+        # Emotional intensity indicators
+        self.emotional_words = [
+            'extremely', 'severely', 'terrible', 'awful', 'horrible',
+            'devastating', 'overwhelming', 'unbearable', 'impossible',
+            'constantly', 'always', 'never', 'every day', 'all the time'
+        ]
+        
+        # Markers of a specific, first-hand incident
+        self.incident_markers = ['happened to me', 'my manager', 'my supervisor', 'I was']
+        
+        # All keyword lists compiled once, so each text is normalized and scanned a single time
+        self.keyword_matcher = KeywordMatcher({
+            **self.risk_keywords,
+            'crisis': self.crisis_keywords,
+            'emotional': self.emotional_words,
+            'incident': self.incident_markers
+        })
+        
         # Sentiment pipeline for additional analysis
         self.sentiment_pipeline = None
+        self.sentiment_batch_size = int(os.getenv('TEXT_SENTIMENT_BATCH_SIZE', '32'))
         
         # Category mapping
         self.category_names = {
@@ -107,106 +206,161 @@ class TextRiskClassifier:
     
     def preprocess_text(self, text: str) -> str:
         """Preprocess text for analysis"""
-        if not text or not isinstance(text, str):
-            return ""
-        
-        # Basic cleaning
-        text = text.lower().strip()
-        
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove special characters but keep punctuation for context
-        text = re.sub(r'[^\w\s.,!?;:-]', '', text)
-        
-        return text
+        # Lowercase, strip special characters (keeping punctuation for context), collapse whitespace
+        return normalize_text(text)
+    
+    def scan_text(self, processed_text: str) -> Dict[str, Any]:
+        """
+        Category keywords, crisis language, emotional word count and incident markers
+        from one scan of preprocessed text
+        """
+        hits = self.keyword_matcher.scan(processed_text)
+        crisis_signals = hits['crisis']
+        return {
+            'keywords': {category: hits[category] for category in self.risk_keywords if hits[category]},
+            'crisis_detection': {
+                'has_crisis_language': len(crisis_signals) > 0,
+                'crisis_keywords': crisis_signals,
+                'crisis_count': len(crisis_signals)
+            },
+            'emotional_count': len(hits['emotional']),
+            'has_specific_incidents': len(hits['incident']) > 0
+        }
     
     def extract_keywords(self, text: str) -> Dict[str, List[str]]:
         """Extract risk keywords from text"""
-        text = self.preprocess_text(text)
-        found_keywords = {}
-        
-        for category, keywords in self.risk_keywords.items():
-            found = []
-            for keyword in keywords:
-                if keyword.lower() in text:
-                    found.append(keyword)
-            if found:
-                found_keywords[category] = found
-        
-        return found_keywords
+        return self.scan_text(self.preprocess_text(text))['keywords']
     
     def detect_crisis_language(self, text: str) -> Dict[str, Any]:
         """Detect crisis-level language requiring immediate attention"""
-        text = self.preprocess_text(text)
-        crisis_signals = []
-        
-        for keyword in self.crisis_keywords:
-            if keyword.lower() in text:
-                crisis_signals.append(keyword)
-        
-        return {
-            'has_crisis_language': len(crisis_signals) > 0,
-            'crisis_keywords': crisis_signals,
-            'crisis_count': len(crisis_signals)
-        }
+        return self.scan_text(self.preprocess_text(text))['crisis_detection']
     
     def calculate_emotional_intensity(self, text: str) -> float:
         """Calculate emotional intensity of text (0.0 to 1.0)"""
         if not text:
             return 0.0
-        
-        # Count emotional indicators
-        emotional_words = [
-            'extremely', 'severely', 'terrible', 'awful', 'horrible',
-            'devastating', 'overwhelming', 'unbearable', 'impossible',
-            'constantly', 'always', 'never', 'every day', 'all the time'
-        ]
-        
-        text_lower = text.lower()
-        emotional_count = sum(1 for word in emotional_words if word in text_lower)
-        
-        # Count exclamation marks and caps
+        emotional_count = len(self.keyword_matcher.scan(text.lower())['emotional'])
+        return self._emotional_intensity(emotional_count, text)
+    
+    @staticmethod
+    def _emotional_intensity(emotional_count: int, text: str) -> float:
+        """Intensity from the emotional word count plus exclamation marks and caps in text"""
+        if not text:
+            return 0.0
         exclamations = text.count('!')
-        caps_ratio = sum(1 for c in text if c.isupper()) / max(len(text), 1)
-        
-        # Calculate intensity score
-        intensity = min(1.0, (emotional_count * 0.2 + exclamations * 0.1 + caps_ratio * 0.3))
+        caps_ratio = sum(map(str.isupper, text)) / max(len(text), 1)
+        return min(1.0, (emotional_count * 0.2 + exclamations * 0.1 + caps_ratio * 0.3))
+    
+    def _local_only(self, path: str) -> bool:
+        return self.local_files_only or os.path.isdir(path)
+    
+    def _load_component(self, name: str, loader):
+        """
+        Run a component's loader, recording load time and the process RSS it added
+        A failed load is recorded and not retried, so requests never repeat a slow or networked attempt
+        """
+        status = self.components.get(name, {})
+        if 'error' in status:
+            raise RuntimeError(f"{name} unavailable: {status['error']}")
+        rss_before, start = _rss_bytes(), time.perf_counter()
+        try:
+            component = loader()
+        except Exception as e:
+            self.components[name] = {'error': str(e)}
+            raise
+        rss_after = _rss_bytes()
+        self.components[name] = {
+            'load_seconds': time.perf_counter() - start,
+            'rss_added_mb': (rss_after - rss_before) / MB if rss_before is not None and rss_after is not None else None
+        }
+        return component
+    
+    @property
+    def tokenizer(self):
+        """Tokenizer, loaded on first use (only training and the transformer backend need it)"""
+        if self._tokenizer is None:
+            self._tokenizer = self._load_component('tokenizer', lambda: AutoTokenizer.from_pretrained(
+                self.base_model_path, local_files_only=self._local_only(self.base_model_path)
+            ))
+        return self._tokenizer
+    
+    @tokenizer.setter
+    def tokenizer(self, tokenizer):
+        self._tokenizer = tokenizer
+    
+    def _create_sentiment_pipeline(self):
+        local_only = self._local_only(self.sentiment_model)
+        return pipeline(
+            "sentiment-analysis",
+            model=AutoModelForSequenceClassification.from_pretrained(self.sentiment_model, local_files_only=local_only),
+            tokenizer=AutoTokenizer.from_pretrained(self.sentiment_model, local_files_only=local_only),
+            device=0 if torch.cuda.is_available() else -1
+        )
+    
+    def _load_sentiment_pipeline(self) -> bool:
+        """Create the sentiment pipeline on first use; False when it is disabled or unavailable"""
+        if not self.sentiment_pipeline:
+            if self.sentiment_model.lower() in ('', 'none'):
+                return False
+            try:
+                self.sentiment_pipeline = self._load_component('sentiment', self._create_sentiment_pipeline)
+            except Exception:
+                return False
+        return True
+    
+    def warmup(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load every component the selected backend uses now rather than on the first request,
+        then score one text so the first request pays no initialization either
+        """
+        if self.model is not None:
+            self.tokenizer
+        self._load_sentiment_pipeline()
+        self.batch_predict(['Warmup text for the text risk classifier.'])
+        return self.get_model_info()['components']
+    
+    @staticmethod
+    def _sentiment_from_result(result: Dict) -> Dict[str, float]:
+        """Convert a pipeline result to a -1 to 1 scale (negative to positive)"""
+        if result['label'] == 'LABEL_2':  # Positive
+            sentiment_score = result['score']
+        elif result['label'] == 'LABEL_0':  # Negative
+            sentiment_score = -result['score']
+        else:  # Neutral
+            sentiment_score = 0.0
         
-        return intensity
+        return {
+            'sentiment_score': sentiment_score,
+            'confidence': result['score']
+        }
     
     def analyze_sentiment(self, text: str) -> Dict[str, float]:
         """Analyze sentiment using transformer pipeline"""
-        if not self.sentiment_pipeline:
-            try:
-                self.sentiment_pipeline = pipeline(
-                    "sentiment-analysis",
-                    model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                    device=0 if torch.cuda.is_available() else -1
-                )
-            except:
-                # Fallback to basic sentiment
-                return {'sentiment_score': 0.0, 'confidence': 0.5}
+        if not self._load_sentiment_pipeline():
+            # Fallback to basic sentiment
+            return {'sentiment_score': 0.0, 'confidence': 0.5}
         
         try:
             result = self.sentiment_pipeline(text[:512])  # Limit length
-            
-            # Convert to -1 to 1 scale (negative to positive)
-            if result[0]['label'] == 'LABEL_2':  # Positive
-                sentiment_score = result[0]['score']
-            elif result[0]['label'] == 'LABEL_0':  # Negative
-                sentiment_score = -result[0]['score']
-            else:  # Neutral
-                sentiment_score = 0.0
-            
-            return {
-                'sentiment_score': sentiment_score,
-                'confidence': result[0]['score']
-            }
+            return self._sentiment_from_result(result[0])
         
         except Exception as e:
             return {'sentiment_score': 0.0, 'confidence': 0.5}
     
+    def analyze_sentiment_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Sentiment for many texts, run through the pipeline in padded batches"""
+        if not texts:
+            return []
+        if not self._load_sentiment_pipeline():
+            return [{'sentiment_score': 0.0, 'confidence': 0.5} for _ in texts]
+        
+        try:
+            results = self.sentiment_pipeline([text[:512] for text in texts], batch_size=self.sentiment_batch_size)
+            return [self._sentiment_from_result(result) for result in results]
+        except Exception:
+            # Per-text calls, so one failing input only falls back for itself
+            return [self.analyze_sentiment(text) for text in texts]
+    
     def prepare_training_data(self, text_data: List[Dict]) -> Dataset:
         """Prepare training data for BERT model"""
         texts = []
@@ -238,13 +392,20 @@ class TextRiskClassifier:
         
         return dataset
     
-    def create_model(self, num_labels: int = 6) -> AutoModelForSequenceClassification:
-        """Create multi-label BERT model for risk classification"""
+    def create_model(self, num_labels: int = 6, pretrained: bool = True) -> AutoModelForSequenceClassification:
+        """
+        Create multi-label BERT model for risk classification
+        pretrained=False builds the architecture from its config only, for weights that come from a checkpoint
+        """
+        local_only = self._local_only(self.base_model_path)
         
         class MultiLabelBERTClassifier(nn.Module):
             def __init__(self, model_name: str, num_labels: int):
                 super().__init__()
-                self.bert = AutoModel.from_pretrained(model_name)
+                if pretrained:
+                    self.bert = AutoModel.from_pretrained(model_name, local_files_only=local_only)
+                else:
+                    self.bert = AutoModel.from_config(AutoConfig.from_pretrained(model_name, local_files_only=local_only))
                 self.dropout = nn.Dropout(0.3)
                 self.classifier = nn.Linear(self.bert.config.hidden_size, num_labels)
                 self.sigmoid = nn.Sigmoid()
@@ -268,7 +429,7 @@ class TextRiskClassifier:
                     'probabilities': probabilities
                 }
         
-        return MultiLabelBERTClassifier(self.model_name, num_labels)
+        return MultiLabelBERTClassifier(self.base_model_path, num_labels)
     
     def train(self, training_data: List[Dict], validation_split: float = 0.2, 
               epochs: int = 3, batch_size: int = 16) -> Dict[str, float]:
@@ -286,8 +447,7 @@ class TextRiskClassifier:
         )
         
         # Create model
-        self.model = self.create_model(num_labels=6)
-        self.model.to(self.device)
+        self._set_model(self.create_model(num_labels=6).to(self.device))
         
         # Training arguments
         training_args = TrainingArguments(
@@ -345,147 +505,210 @@ class TextRiskClassifier:
             return self._empty_prediction()
         
         try:
-            # Preprocess text
-            processed_text = self.preprocess_text(text)
-            
-            # Basic analysis (works without trained model)
-            keywords = self.extract_keywords(processed_text)
-            crisis_detection = self.detect_crisis_language(processed_text)
-            emotional_intensity = self.calculate_emotional_intensity(processed_text)
-            sentiment = self.analyze_sentiment(text)
-            
-            # Per-category (rule-based as baseline)
-            category_risks = self._rule_based_classification(
-                keywords, crisis_detection, emotional_intensity, sentiment
-            )
-            
-            # Optional sklearn overall severity using calibrated thresholds
-            overall_from_model = None
-            if self.sklearn_pipeline is not None:
-                try:
-                    if hasattr(self.sklearn_pipeline, 'predict_proba'):
-                        proba = self.sklearn_pipeline.predict_proba([processed_text])[0]
-                        classes = list(getattr(self.sklearn_pipeline, 'classes_', []))
-                        thresholds = self.class_thresholds or {}
-                        severity_order = ['Crisis', 'High_Risk', 'Moderate_Risk', 'Low_Risk']
-                        chosen = None
-                        for cls in severity_order:
-                            if cls in classes:
-                                idx = classes.index(cls)
-                                thr = thresholds.get(cls, 0.5)
-                                if proba[idx] >= thr:
-                                    chosen = cls
-                                    break
-                        if chosen is None and classes:
-                            chosen = classes[int(proba.argmax())]
-                    else:
-                        chosen = self.sklearn_pipeline.predict([processed_text])[0]
-                    severity_map = {'Low_Risk': 0, 'Low': 0, 'Moderate_Risk': 1, 'Medium': 1, 'High_Risk': 2, 'High': 2, 'Crisis': 3, 'Critical': 3}
-                    overall_from_model = severity_map.get(str(chosen), None)
-                except Exception:
-                    overall_from_model = None
+            return self._predict_batch([text])[0]
             
-            # Determine overall risk level
-            max_risk = max(category_risks.values())
+        except Exception as e:
+            return {
+                'error': str(e),
+                'text_length': len(text) if text else 0,
+                'processing_timestamp': datetime.now().isoformat()
+            }
+    
+    def _predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Risk predictions for non-empty texts: one keyword scan per text, then one sklearn
+        predict_proba call, batched sentiment and rule scoring as array operations
+        """
+        # Basic analysis (works without trained model)
+        processed_texts = [self.preprocess_text(text) for text in texts]
+        scans = [self.scan_text(processed_text) for processed_text in processed_texts]
+        intensity = np.array([self._emotional_intensity(scan['emotional_count'], processed_text)
+                              for scan, processed_text in zip(scans, processed_texts)])
+        sentiments = self.analyze_sentiment_batch(texts)
+        sentiment_scores = np.array([sentiment['sentiment_score'] for sentiment in sentiments], dtype=float)
+        has_crisis = np.array([scan['crisis_detection']['has_crisis_language'] for scan in scans], dtype=bool)
+        categories = list(self.category_names.values())
+        keyword_counts = np.array([[len(scan['keywords'].get(category, [])) for category in categories]
+                                   for scan in scans], dtype=float).reshape(len(texts), len(categories))
+        
+        # Per-category (rule-based as baseline, transformer probabilities when a checkpoint is loaded)
+        category_risks = self._rule_based_scores(keyword_counts, has_crisis, intensity, sentiment_scores)
+        if self.model is not None:
+            try:
+                category_risks = self._model_probabilities(processed_texts).astype(float)
+            except Exception as e:
+                print(f"Model prediction error: {e}")
+        confidence = self._confidence_scores((keyword_counts > 0).sum(axis=1), has_crisis, intensity,
+                                             sentiment_scores)
+        
+        # Optional sklearn overall severity using calibrated thresholds
+        model_severity = self._model_severity(processed_texts)
+        
+        # Determine overall risk level
+        max_risk = category_risks.max(axis=1)
+        rule_risk = np.select([max_risk >= 0.7, max_risk >= 0.4], [2, 1], default=0)
+        processing_timestamp = datetime.now().isoformat()
+        
+        predictions = []
+        for i, (text, processed_text, scan, sentiment) in enumerate(zip(texts, processed_texts, scans, sentiments)):
+            crisis_detection = scan['crisis_detection']
             if crisis_detection['has_crisis_language']:
                 overall_risk = 3  # Critical
-            elif overall_from_model is not None:
-                overall_risk = int(overall_from_model)
-            elif max_risk >= 0.7:
-                overall_risk = 2  # High
-            elif max_risk >= 0.4:
-                overall_risk = 1  # Medium
+            elif model_severity[i] is not None:
+                overall_risk = int(model_severity[i])
             else:
-                overall_risk = 0  # Low
+                overall_risk = int(rule_risk[i])
             
-            return {
+            predictions.append({
                 'text_length': len(text),
                 'processed_text_length': len(processed_text),
-                'category_risks': category_risks,
+                'category_risks': dict(zip(categories, category_risks[i].tolist())),
                 'overall_risk_level': self.risk_levels[overall_risk],
                 'overall_risk_score': overall_risk,
                 'sentiment_analysis': sentiment,
-                'emotional_intensity': emotional_intensity,
+                'emotional_intensity': float(intensity[i]),
                 'crisis_detection': crisis_detection,
-                'risk_keywords': keywords,
+                'risk_keywords': scan['keywords'],
                 'risk_indicators': {
-                    'has_specific_incidents': any(
-                        keyword in processed_text for keyword in 
-                        ['happened to me', 'my manager', 'my supervisor', 'I was']
-                    ),
-                    'has_emotional_language': emotional_intensity > 0.3,
-                    'has_negative_sentiment': sentiment['sentiment_score'] < -0.3,
-                    'has_multiple_categories': len(keywords) > 2
+                    'has_specific_incidents': scan['has_specific_incidents'],
+                    'has_emotional_language': bool(intensity[i] > 0.3),
+                    'has_negative_sentiment': bool(sentiment['sentiment_score'] < -0.3),
+                    'has_multiple_categories': len(scan['keywords']) > 2
                 },
-                'confidence_score': self._calculate_prediction_confidence(
-                    keywords, crisis_detection, emotional_intensity, sentiment
-                ),
+                'confidence_score': float(confidence[i]),
                 'intervention_recommended': crisis_detection['has_crisis_language'] or 
                                          overall_risk >= 2,
-                'processing_timestamp': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            return {
-                'error': str(e),
-                'text_length': len(text) if text else 0,
-                'processing_timestamp': datetime.now().isoformat()
-            }
+                'processing_timestamp': processing_timestamp
+            })
+        
+        return predictions
+    
+    def _model_severity(self, processed_texts: List[str]) -> List[Optional[int]]:
+        """Overall severity (0-3) from the sklearn pipeline in one call; None where it is unavailable"""
+        if self.sklearn_pipeline is None:
+            return [None] * len(processed_texts)
+        try:
+            if hasattr(self.sklearn_pipeline, 'predict_proba'):
+                proba = np.asarray(self.sklearn_pipeline.predict_proba(processed_texts))
+                classes = list(getattr(self.sklearn_pipeline, 'classes_', []))
+                thresholds = self.class_thresholds or {}
+                chosen = np.full(len(processed_texts), None, dtype=object)
+                if classes:
+                    chosen[:] = np.asarray(classes, dtype=object)[proba.argmax(axis=1)]
+                    # The most severe class over its threshold wins: assign least severe first
+                    for cls in reversed([c for c in SEVERITY_ORDER if c in classes]):
+                        chosen[proba[:, classes.index(cls)] >= thresholds.get(cls, 0.5)] = cls
+            else:
+                chosen = self.sklearn_pipeline.predict(processed_texts)
+            return [SEVERITY_MAP.get(str(cls), None) for cls in chosen]
+        except Exception:
+            return [None] * len(processed_texts)
     
     def _rule_based_classification(self, keywords: Dict, crisis: Dict, 
                                  intensity: float, sentiment: Dict) -> Dict[str, float]:
         """Rule-based risk classification when model is not available"""
-        category_risks = {}
-        
-        for category_name in self.category_names.values():
-            risk_score = 0.0
-            
-            # Base risk from keywords
-            if category_name in keywords:
-                keyword_count = len(keywords[category_name])
-                risk_score += min(0.6, keyword_count * 0.2)
-            
-            # Crisis language boost
-            if crisis['has_crisis_language'] and category_name in ['power_abuse', 'mental_health']:
-                risk_score += 0.4
-            
-            # Emotional intensity boost
-            if intensity > 0.5:
-                risk_score += intensity * 0.3
-            
-            # Negative sentiment boost
-            if sentiment['sentiment_score'] < -0.3:
-                risk_score += abs(sentiment['sentiment_score']) * 0.2
-            
-            category_risks[category_name] = min(1.0, risk_score)
+        categories = list(self.category_names.values())
+        scores = self._rule_based_scores(
+            np.array([[len(keywords.get(category, [])) for category in categories]], dtype=float),
+            np.array([crisis['has_crisis_language']]), np.array([intensity], dtype=float),
+            np.array([sentiment['sentiment_score']], dtype=float)
+        )
+        return dict(zip(categories, scores[0].tolist()))
+    
+    def _rule_based_scores(self, keyword_counts: np.ndarray, has_crisis: np.ndarray,
+                           intensity: np.ndarray, sentiment_scores: np.ndarray) -> np.ndarray:
+        """(n x 6) rule-based category risks from per-category keyword counts and per-text signals"""
+        boosted = np.array([category in CRISIS_BOOSTED_CATEGORIES for category in self.category_names.values()])
+        
+        # Base risk from keywords
+        risk = np.minimum(0.6, keyword_counts * 0.2)
+        # Crisis language boost
+        risk = risk + np.where(has_crisis[:, None] & boosted[None, :], 0.4, 0.0)
+        # Emotional intensity boost
+        risk = risk + np.where(intensity > 0.5, intensity * 0.3, 0.0)[:, None]
+        # Negative sentiment boost
+        risk = risk + np.where(sentiment_scores < -0.3, np.abs(sentiment_scores) * 0.2, 0.0)[:, None]
+        
+        return np.minimum(1.0, risk)
+    
+    def _set_model(self, model):
+        """Install a new fp32 transformer; quantization state belongs to the model it replaces"""
+        self.model = model
+        self.quantized = False
+        self.inference_precision = 'fp32'
+    
+    def _checkpoint_precision(self, filepath: str) -> str:
+        """
+        Precision to serve a .pt checkpoint at: int8 only when configured and the checkpoint's
+        agreement record (same file digest) shows a label flip rate within int8_max_flip_rate
+        """
+        if self.configured_precision != 'int8':
+            return 'fp32'
+        record_path = int8_agreement_path(filepath)
+        try:
+            with open(record_path) as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            print(f"No int8 agreement record at {record_path}; serving fp32")
+            return 'fp32'
+        if record.get('checkpoint_sha256') != file_digest(filepath):
+            print(f"int8 agreement record {record_path} is for a different checkpoint; serving fp32")
+            return 'fp32'
+        flip_rate = record.get('label_flip_rate')
+        if flip_rate is None or flip_rate > self.int8_max_flip_rate:
+            print(f"int8 label flip rate {flip_rate} exceeds {self.int8_max_flip_rate}; serving fp32")
+            return 'fp32'
+        return 'int8'
+    
+    def prepare_for_inference(self, precision: Optional[str] = None):
+        """
+        Put the loaded transformer in inference mode: eval(), the configured intra-op thread count
+        and, for int8 on CPU, int8 Linear layers with per-row activation scales
+        """
+        if self.model is None:
+            return
+        precision = (precision or self.inference_precision).lower()
+        if self.inference_threads > 0:
+            torch.set_num_threads(self.inference_threads)  # process-wide setting
+        self.model.eval()
+        if precision == 'int8' and self.device.type == 'cpu' and not self.quantized:
+            self.model = quantize_linear_rowwise(self.model)
+            self.quantized = True
+        self.inference_precision = precision
+    
+    def _model_probabilities(self, processed_texts: List[str]) -> np.ndarray:
+        """
+        Category probabilities (texts x categories) from the transformer
+        Texts are tokenized once without padding (capped at max_tokens), sorted by token count
+        and run in batches padded only to the longest text of each batch
+        """
+        encodings = self.tokenizer(processed_texts, truncation=True, max_length=self.max_tokens)
+        input_ids, attention_mask = encodings['input_ids'], encodings['attention_mask']
+        order = sorted(range(len(processed_texts)), key=lambda i: len(input_ids[i]))
+        probabilities = np.zeros((len(processed_texts), len(self.category_names)), dtype=np.float32)
+        if self.model.training:
+            self.model.eval()
+        
+        with torch.inference_mode():
+            for start in range(0, len(order), self.inference_batch_size):
+                bucket = order[start:start + self.inference_batch_size]
+                batch = self.tokenizer.pad(
+                    {'input_ids': [input_ids[i] for i in bucket], 'attention_mask': [attention_mask[i] for i in bucket]},
+                    padding=True,
+                    return_tensors='pt'
+                )
+                outputs = self.model(input_ids=batch['input_ids'].to(self.device),
+                                     attention_mask=batch['attention_mask'].to(self.device))
+                probabilities[bucket] = outputs['probabilities'].float().cpu().numpy()
         
-        return category_risks
+        return probabilities
     
     def _model_based_classification(self, text: str) -> Dict[str, float]:
         """Model-based risk classification using trained BERT model"""
         try:
-            # Tokenize input
-            inputs = self.tokenizer(
-                text,
-                return_tensors='pt',
-                truncation=True,
-                padding=True,
-                max_length=512
-            )
-            
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            # Get predictions
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                probabilities = outputs['probabilities'].cpu().numpy()[0]
-            
-            # Map to category names
-            category_risks = {}
-            for i, category_name in self.category_names.items():
-                category_risks[category_name] = float(probabilities[i])
-            
-            return category_risks
+            # The model is trained on preprocessed text
+            probabilities = self._model_probabilities([self.preprocess_text(text)])[0]
+            return dict(zip(self.category_names.values(), probabilities.tolist()))
             
         except Exception as e:
             print(f"Model prediction error: {e}")
@@ -495,21 +718,27 @@ class TextRiskClassifier:
     def _calculate_prediction_confidence(self, keywords: Dict, crisis: Dict,
                                        intensity: float, sentiment: Dict) -> float:
         """Calculate confidence in the prediction"""
-        confidence = 0.5  # Base confidence
+        return float(self._confidence_scores(
+            np.array([len(keywords)]), np.array([crisis['has_crisis_language']]),
+            np.array([intensity], dtype=float), np.array([sentiment['sentiment_score']], dtype=float)
+        )[0])
+    
+    @staticmethod
+    def _confidence_scores(categories_hit: np.ndarray, has_crisis: np.ndarray,
+                           intensity: np.ndarray, sentiment_scores: np.ndarray) -> np.ndarray:
+        """Prediction confidence per text"""
+        confidence = np.full(len(categories_hit), 0.5)  # Base confidence
         
         # More keywords = higher confidence
-        if keywords:
-            confidence += min(0.3, len(keywords) * 0.1)
+        confidence = confidence + np.where(categories_hit > 0, np.minimum(0.3, categories_hit * 0.1), 0.0)
         
         # Crisis detection = higher confidence
-        if crisis['has_crisis_language']:
-            confidence += 0.2
+        confidence = confidence + np.where(has_crisis, 0.2, 0.0)
         
         # Strong emotional indicators = higher confidence
-        if intensity > 0.5 or abs(sentiment['sentiment_score']) > 0.5:
-            confidence += 0.15
+        confidence = confidence + np.where((intensity > 0.5) | (np.abs(sentiment_scores) > 0.5), 0.15, 0.0)
         
-        return min(0.95, confidence)
+        return np.minimum(0.95, confidence)
     
     def _empty_prediction(self) -> Dict[str, Any]:
         """Return empty prediction for invalid input"""
@@ -530,18 +759,31 @@ class TextRiskClassifier:
         }
     
     def batch_predict(self, texts: List[str]) -> List[Dict[str, Any]]:
-        """Predict risk for multiple texts efficiently"""
-        predictions = []
+        """Predict risk for multiple texts efficiently (same results as predict_text_risk per text)"""
+        predictions: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        valid = []
+        for i, text in enumerate(texts):
+            if not text or len(text.strip()) < 3:
+                predictions[i] = self._empty_prediction()
+            else:
+                valid.append(i)
         
-        for text in texts:
-            prediction = self.predict_text_risk(text)
-            predictions.append(prediction)
+        try:
+            for i, prediction in zip(valid, self._predict_batch([texts[i] for i in valid]) if valid else []):
+                predictions[i] = prediction
+        except Exception:
+            # Per-text path, so one bad input only produces its own error entry
+            for i in valid:
+                predictions[i] = self.predict_text_risk(texts[i])
         
         return predictions
     
     def save_model(self, filepath: str):
         """Save trained model"""
-        if self.model and self.is_trained:
+        if self.quantized:
+            # Quantized weights cannot be loaded back into the fp32 architecture
+            print("Quantized inference model cannot be saved; save before prepare_for_inference")
+        elif self.model and self.is_trained:
             torch.save({
                 'model_state_dict': self.model.state_dict(),
                 'model_version': self.model_version,
@@ -557,8 +799,12 @@ class TextRiskClassifier:
         try:
             if filepath.endswith('.pkl'):
                 # Load sklearn pipeline payload
-                with open(filepath, 'rb') as f:
-                    payload = pickle.load(f)
+                def load_payload():
+                    with open(filepath, 'rb') as f:
+                        return pickle.load(f)
+                
+                self.components.pop('sklearn', None)
+                payload = self._load_component('sklearn', load_payload)
                 if isinstance(payload, dict):
                     self.sklearn_pipeline = payload.get('model', None)
                     self.class_thresholds = payload.get('thresholds', None)
@@ -569,9 +815,16 @@ class TextRiskClassifier:
                 print(f"Sklearn text model loaded from {filepath}")
             else:
                 checkpoint = torch.load(filepath, map_location=self.device)
-                self.model = self.create_model(num_labels=6)
-                self.model.load_state_dict(checkpoint['model_state_dict'])
-                self.model.to(self.device)
+                
+                def load_transformer():
+                    # Weights come from the checkpoint, so the backbone is built from its config alone
+                    model = self.create_model(num_labels=6, pretrained=False)
+                    model.load_state_dict(checkpoint['model_state_dict'])
+                    return model.to(self.device)
+                
+                self.components.pop('transformer', None)
+                self._set_model(self._load_component('transformer', load_transformer))
+                self.prepare_for_inference(self._checkpoint_precision(filepath))
                 self.model_version = checkpoint.get('model_version', 'unknown')
                 self.is_trained = checkpoint.get('is_trained', True)
                 print(f"Transformer text model loaded from {filepath}")
@@ -579,6 +832,19 @@ class TextRiskClassifier:
         except Exception as e:
             print(f"Error loading model: {e}")
     
+    def component_status(self) -> Dict[str, Dict[str, Any]]:
+        """Which components are resident, with their load time and the RSS they added when loaded"""
+        resident = {
+            'tokenizer': self._tokenizer is not None,
+            'transformer': self.model is not None,
+            'sklearn': self.sklearn_pipeline is not None,
+            'sentiment': self.sentiment_pipeline is not None
+        }
+        status = {name: {'resident': resident[name], **self.components.get(name, {})} for name in TEXT_COMPONENTS}
+        rss = _rss_bytes()
+        status['process'] = {'rss_mb': rss / MB if rss is not None else None}
+        return status
+    
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information"""
         return {
@@ -586,6 +852,11 @@ class TextRiskClassifier:
             'model_version': self.model_version,
             'is_trained': self.is_trained,
             'device': str(self.device),
+            'inference_precision': self.inference_precision,
+            'quantized': self.quantized,
+            'inference_threads': torch.get_num_threads(),
+            'max_tokens': self.max_tokens,
+            'components': self.component_status(),
             'num_categories': len(self.category_names),
             'num_risk_levels': len(self.risk_levels),
             'crisis_keywords_count': len(self.crisis_keywords),
@@ -0,0 +1,15 @@
+"""
+HSEG File Digest - Content digests of model artifacts
+Dependency-free, so any model or loader can tie one artifact to another without importing a backend
+"""
+
+import hashlib
+
+
+def file_digest(filepath: str) -> str:
+    """SHA-256 of an artifact, used to tie a derived artifact (ONNX graph, flat file) to its source"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
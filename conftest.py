@@ -0,0 +1,41 @@
+"""
+Root conftest: makes the repository root importable, so `pytest` resolves the app and scripts packages,
+and provides fixtures shared across test modules
+"""
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def tiny_predictor():
+    """
+    Factory for trained IndividualRiskPredictors small enough to fit in a few seconds
+    (few trees, one small hidden layer); one model per (layout, strategy) per session
+    """
+    from app.core.synthetic_workload import generate_workload, individual_training_records
+    from app.models.individual_risk_model import IndividualRiskPredictor
+
+    trained = {}
+
+    def build(model_layout: str = 'per_category', ensemble_strategy: str = 'refit'):
+        key = (model_layout, ensemble_strategy)
+        if key not in trained:
+            model = IndividualRiskPredictor(model_layout=model_layout)
+            create_base_estimators = model._create_base_estimators
+
+            def tiny_estimators(multi_output=False):
+                estimators = create_base_estimators(multi_output)
+                for name, estimator in estimators:
+                    if name == 'nn':
+                        estimator.set_params(hidden_layer_sizes=(8,), max_iter=50)
+                    else:
+                        estimator.set_params(n_estimators=10)
+                return estimators
+
+            model._create_base_estimators = tiny_estimators
+            model.train(individual_training_records(generate_workload(80, seed=1)['survey_responses'], seed=1),
+                        ensemble_strategy=ensemble_strategy)
+            trained[key] = model
+        return trained[key]
+
+    return build
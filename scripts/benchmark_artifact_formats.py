@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pickled and memory-mapped flat formats of the individual model.
+
+Writes the flat artifact next to the pickle (if missing or stale), checks that both
+score the same responses identically within the tolerance, then starts N fresh
+worker processes per format, the way uvicorn/gunicorn workers would load the
+model, and measures per-worker load time and memory after a warm batch. RSS
+counts shared pages in every worker; PSS/USS (Linux) show what the workers
+really cost together, which is where the memory-mapped format saves.
+
+Usage:
+  python -m scripts.benchmark_artifact_formats
+  python -m scripts.benchmark_artifact_formats --model app/models/trained/v1.1.0/individual_risk_model.pkl --workers 8
+
+Reports are written to:
+  app/models/trained/artifact_formats.json
+  app/models/trained/artifact_formats.md
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import psutil
+
+from app.models.flat_artifact import read_flat_metadata
+from app.models.individual_risk_model import IndividualRiskPredictor
+from app.utils.file_digest import file_digest
+from scripts.export_individual_onnx import synthetic_responses
+
+DEFAULT_MODEL = 'app/models/trained/individual_risk_model.pkl'
+OUT_DIR = Path('app/models/trained')
+MB = 1024 * 1024
+
+
+def _load_worker(fmt: str, path: str, warm_rows: int, results, release):
+    """Load one artifact in a fresh process, score a warm batch and wait to be measured"""
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    model = IndividualRiskPredictor()
+    start = time.perf_counter()
+    if fmt == 'pickle':
+        model.load_model(path)
+    else:
+        model.load_flat_model(path)
+    load_seconds = time.perf_counter() - start
+
+    features = model.extract_feature_matrix(synthetic_responses(warm_rows, seed=7))
+    start = time.perf_counter()
+    model.predict_category_scores(features)
+    first_batch_ms = (time.perf_counter() - start) * 1000
+
+    results.put({'pid': os.getpid(), 'load_seconds': load_seconds,
+                 'first_batch_ms': first_batch_ms, 'rss_before_mb': rss_before / MB})
+    release.wait()
+
+
+def measure_format(fmt: str, path: str, workers: int, warm_rows: int) -> Dict:
+    """Start `workers` processes loading the same artifact and measure them while all are alive"""
+    context = multiprocessing.get_context('spawn')
+    results, release = context.Queue(), context.Event()
+    processes = [context.Process(target=_load_worker, args=(fmt, path, warm_rows, results, release))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    runs = []
+    try:
+        for _ in range(workers):
+            run = results.get(timeout=600)
+            memory = psutil.Process(run['pid']).memory_full_info()
+            run.update(
+                rss_mb=memory.rss / MB,
+                uss_mb=getattr(memory, 'uss', 0) / MB,
+                pss_mb=getattr(memory, 'pss', 0) / MB,
+            )
+            runs.append(run)
+    finally:
+        release.set()
+        for process in processes:
+            process.join()
+
+    return {
+        'format': fmt,
+        'path': path,
+        'artifact_mb': Path(path).stat().st_size / MB,
+        'workers': workers,
+        'load_seconds_mean': float(np.mean([r['load_seconds'] for r in runs])),
+        'load_seconds_max': float(np.max([r['load_seconds'] for r in runs])),
+        'first_batch_ms_mean': float(np.mean([r['first_batch_ms'] for r in runs])),
+        'rss_mb_per_worker': float(np.mean([r['rss_mb'] for r in runs])),
+        'model_rss_mb_per_worker': float(np.mean([r['rss_mb'] - r['rss_before_mb'] for r in runs])),
+        'uss_mb_total': float(np.sum([r['uss_mb'] for r in runs])),
+        'pss_mb_total': float(np.sum([r['pss_mb'] for r in runs])),
+        'runs': runs,
+    }
+
+
+def stale_reason(model: IndividualRiskPredictor, pickle_path: str, flat_path: str) -> str:
+    """Why an existing flat artifact cannot stand in for the pickle ('' when it can)"""
+    if Path(flat_path).stat().st_mtime < Path(pickle_path).stat().st_mtime:
+        return 'older than the pickle'
+    metadata = read_flat_metadata(flat_path)
+    if metadata.get('model_version') != model.model_version:
+        return f"model version {metadata.get('model_version')} != {model.model_version}"
+    source_digest = metadata.get('source_sha256')
+    if source_digest and source_digest != file_digest(pickle_path):
+        return 'written from a different pickle'
+    return ''
+
+
+def check_parity(pickle_path: str, flat_path: str, samples: int) -> Dict[str, float]:
+    features = IndividualRiskPredictor().extract_feature_matrix(synthetic_responses(samples))
+    reference, candidate = IndividualRiskPredictor(), IndividualRiskPredictor()
+    reference.load_model(pickle_path)
+    candidate.load_flat_model(flat_path)
+    diff = np.abs(reference.predict_category_scores(features) - candidate.predict_category_scores(features))
+    return {'samples': samples, 'max_abs_score_diff': float(diff.max())}
+
+
+def render_markdown(report: Dict) -> str:
+    lines = [
+        f"# Individual model artifact formats ({report['workers']} workers)",
+        '',
+        f"Parity: max |score diff| = {report['parity']['max_abs_score_diff']:.2e} "
+        f"over {report['parity']['samples']} responses",
+        '',
+        '| Format | Artifact (MB) | Load (s, mean) | Load (s, max) | RSS/worker (MB) | Model RSS/worker (MB) '
+        '| USS total (MB) | PSS total (MB) |',
+        '|---|---|---|---|---|---|---|---|',
+    ]
+    for result in report['formats']:
+        lines.append(
+            f"| {result['format']} | {result['artifact_mb']:.1f} | {result['load_seconds_mean']:.3f} | "
+            f"{result['load_seconds_max']:.3f} | {result['rss_mb_per_worker']:.1f} | "
+            f"{result['model_rss_mb_per_worker']:.1f} | {result['uss_mb_total']:.1f} | {result['pss_mb_total']:.1f} |"
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pickled vs memory-mapped individual model artifacts')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='Trained IndividualRiskPredictor pickle')
+    parser.add_argument('--flat', default=None, help='Flat artifact path (default: next to the pickle)')
+    parser.add_argument('--rebuild', action='store_true', help='Rewrite the flat artifact even if it exists')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent worker processes per format')
+    parser.add_argument('--warm-rows', type=int, default=200, help='Rows scored by each worker after loading')
+    parser.add_argument('--samples', type=int, default=500, help='Responses used for the parity check')
+    parser.add_argument('--tolerance', type=float, default=1e-4, help='Max allowed absolute score difference')
+    parser.add_argument('--out-dir', default=str(OUT_DIR), help='Directory for the JSON/Markdown reports')
+    args = parser.parse_args()
+
+    flat_path = args.flat or str(Path(args.model).with_suffix('.npy'))
+    model = IndividualRiskPredictor()
+    model.load_model(args.model)
+    reason = 'requested' if args.rebuild else 'missing' if not Path(flat_path).exists() else \
+        stale_reason(model, args.model, flat_path)
+    if reason:
+        print(f'Rebuilding {flat_path} ({reason})')
+        model.save_flat_model(flat_path, source_digest=file_digest(args.model))
+
+    parity = check_parity(args.model, flat_path, args.samples)
+    print(f"Parity: max |diff| = {parity['max_abs_score_diff']:.2e}")
+    if parity['max_abs_score_diff'] > args.tolerance:
+        print(f"Flat artifact failed parity check (tolerance {args.tolerance})")
+        sys.exit(1)
+
+    formats: List[Dict] = []
+    for fmt, path in (('pickle', args.model), ('flat_mmap', flat_path)):
+        print(f'Measuring {fmt} with {args.workers} workers...')
+        formats.append(measure_format(fmt, path, args.workers, args.warm_rows))
+
+    report = {'workers': args.workers, 'parity': parity, 'formats': formats}
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / 'artifact_formats.json').write_text(json.dumps(report, indent=2))
+    markdown = render_markdown(report)
+    (out_dir / 'artifact_formats.md').write_text(markdown)
+
+    print(markdown)
+    print(f'Reports written to {out_dir}')
+
+
+if __name__ == '__main__':
+    main()
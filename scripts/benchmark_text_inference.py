@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark CPU inference latency of the transformer text model, fp32 against int8,
+and record how well int8 agrees with fp32 on a trained checkpoint.
+
+Each precision loads the .pt checkpoint into a fresh TextRiskClassifier (int8
+swaps the Linear layers for RowwiseInt8Linear) and scores the same synthetic
+open-text answers through the production path: texts capped at --max-tokens,
+sorted by length and padded per batch. Reported per batch size: mean latency
+per text, p50/p95 latency per batch and throughput, plus how far the int8
+probabilities drift from fp32, the share of labels that flip at 0.5, how far
+batched int8 scores drift from scoring each text alone and the size of each
+model's weights.
+
+The agreement figures are also written next to the checkpoint
+(<checkpoint>.int8_agreement.json, tied to the checkpoint's SHA-256).
+TEXT_MODEL_PRECISION=int8 only takes effect for a checkpoint with such a record
+whose flip rate is within TEXT_MODEL_INT8_MAX_FLIP_RATE. A trained checkpoint
+is required: drift measured on an untrained head says nothing about a real model.
+
+Usage:
+  python -m scripts.benchmark_text_inference
+  python -m scripts.benchmark_text_inference --texts 512 --batch-sizes 1 16 64 --threads 4
+
+Reports are written to:
+  app/models/trained/text_inference_benchmark.json
+  app/models/trained/text_inference_benchmark.md
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import torch
+
+from app.core.synthetic_workload import TEXT_COLUMNS, generate_workload
+from app.utils.file_digest import file_digest
+from app.models.text_risk_classifier import TextRiskClassifier, int8_agreement_path
+
+DEFAULT_CHECKPOINT = 'app/models/trained/text_risk_classifier.pt'
+OUT_DIR = Path('app/models/trained')
+PRECISIONS = ('fp32', 'int8')
+MB = 1024 * 1024
+BATCH_CHECK_TEXTS = 64
+
+
+def synthetic_texts(n: int, seed: int = 42) -> List[str]:
+    """Non-empty synthetic q23-q25 answers"""
+    responses = generate_workload(n, seed=seed)['survey_responses']
+    texts = responses[TEXT_COLUMNS].to_numpy().ravel()
+    texts = [text for text in texts if isinstance(text, str) and text.strip()]
+    return texts[:n]
+
+
+def load_classifier(checkpoint: str, precision: str, threads: int, max_tokens: int) -> TextRiskClassifier:
+    classifier = TextRiskClassifier()
+    classifier.configured_precision = 'fp32'
+    classifier.inference_threads = threads
+    classifier.max_tokens = max_tokens
+    classifier.load_model(checkpoint)
+    # Quantize explicitly: the agreement record this run writes is what gates int8 in serving
+    classifier.prepare_for_inference(precision)
+    return classifier
+
+
+def weights_mb(model: torch.nn.Module) -> float:
+    """Serialized size of the state dict (quantized Linear weights are packed int8)"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / MB
+
+
+def time_batches(classifier: TextRiskClassifier, texts: List[str], batch_size: int, repeats: int) -> Dict:
+    """Score texts in request batches of batch_size; latency is per request batch"""
+    classifier.inference_batch_size = batch_size
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for offset in range(0, len(texts), batch_size):
+            batch_start = time.perf_counter()
+            classifier._model_probabilities(texts[offset:offset + batch_size])
+            latencies.append((time.perf_counter() - batch_start) * 1000)
+    total_seconds = time.perf_counter() - start
+    scored = len(texts) * repeats
+    return {
+        'batch_size': batch_size,
+        'ms_per_text': total_seconds * 1000 / scored,
+        'p50_batch_ms': float(np.percentile(latencies, 50)),
+        'p95_batch_ms': float(np.percentile(latencies, 95)),
+        'texts_per_second': scored / total_seconds,
+    }
+
+
+def render_markdown(report: Dict) -> str:
+    lines = [
+        f"# Text model inference ({report['environment']['torch_threads']} threads, "
+        f"max {report['max_tokens']} tokens, {report['texts']} texts)",
+        '',
+        f"Base model: {report['base_model']}; checkpoint: {report['checkpoint']}",
+        '',
+        '| Precision | Batch | ms/text | p50 batch (ms) | p95 batch (ms) | Texts/s |',
+        '|---|---|---|---|---|---|',
+    ]
+    for precision, result in report['results'].items():
+        for row in result['batches']:
+            lines.append(f"| {precision} | {row['batch_size']} | {row['ms_per_text']:.2f} | "
+                         f"{row['p50_batch_ms']:.1f} | {row['p95_batch_ms']:.1f} | {row['texts_per_second']:.1f} |")
+    lines += ['', '| Precision | Load (s) | Weights (MB) |', '|---|---|---|']
+    for precision, result in report['results'].items():
+        lines.append(f"| {precision} | {result['load_seconds']:.2f} | {result['weights_mb']:.1f} |")
+    if report.get('int8_drift'):
+        drift = report['int8_drift']
+        lines += ['', f"int8 vs fp32 probabilities: max abs diff {drift['max_abs_diff']:.4f}, "
+                      f"mean abs diff {drift['mean_abs_diff']:.4f}, "
+                      f"labels changed at 0.5: {drift['label_flip_rate']:.2%}; "
+                      f"batched vs alone: max abs diff {drift['batch_max_abs_diff']:.2e}"]
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fp32 vs int8 CPU inference of the text model')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='Text model .pt checkpoint')
+    parser.add_argument('--texts', type=int, default=256, help='Synthetic answers to score')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32], help='Request batch sizes')
+    parser.add_argument('--repeats', type=int, default=3, help='Passes over the texts per batch size')
+    parser.add_argument('--threads', type=int, default=int(os.getenv('TEXT_MODEL_NUM_THREADS', '0')),
+                        help='Intra-op threads (0 keeps torch default)')
+    parser.add_argument('--max-tokens', type=int, default=int(os.getenv('TEXT_MODEL_MAX_TOKENS', '256')),
+                        help='Token cap per text')
+    parser.add_argument('--seed', type=int, default=42, help='Synthetic text seed')
+    parser.add_argument('--out-dir', default=str(OUT_DIR), help='Directory for the JSON/Markdown reports')
+    args = parser.parse_args()
+
+    if not Path(args.checkpoint).exists():
+        parser.error(f'{args.checkpoint} not found; train the transformer text model first')
+    texts = synthetic_texts(args.texts, seed=args.seed)
+
+    results, probabilities = {}, {}
+    for precision in PRECISIONS:
+        print(f'Loading {precision} model...')
+        start = time.perf_counter()
+        classifier = load_classifier(args.checkpoint, precision, args.threads, args.max_tokens)
+        load_seconds = time.perf_counter() - start
+        processed = [classifier.preprocess_text(text) for text in texts]
+        classifier._model_probabilities(processed[:8])  # warm-up
+        probabilities[precision] = classifier._model_probabilities(processed)
+        if precision == 'int8':
+            # Batched scores must match scoring each text alone, or cached analyses depend on batch mates
+            alone = np.vstack([classifier._model_probabilities([text]) for text in processed[:BATCH_CHECK_TEXTS]])
+            batch_drift = float(np.abs(probabilities[precision][:len(alone)] - alone).max())
+
+        batches = []
+        for batch_size in args.batch_sizes:
+            row = time_batches(classifier, processed, batch_size, args.repeats)
+            print(f"  batch {batch_size}: {row['ms_per_text']:.2f} ms/text, p95 {row['p95_batch_ms']:.1f} ms")
+            batches.append(row)
+        results[precision] = {'load_seconds': load_seconds, 'weights_mb': weights_mb(classifier.model),
+                              'quantized': classifier.quantized, 'batches': batches}
+
+    diff = np.abs(probabilities['int8'] - probabilities['fp32'])
+    flips = (probabilities['int8'] >= 0.5) != (probabilities['fp32'] >= 0.5)
+    agreement = {
+        'checkpoint_sha256': file_digest(args.checkpoint),
+        'texts': len(texts),
+        'seed': args.seed,
+        'max_tokens': args.max_tokens,
+        'max_abs_diff': float(diff.max()),
+        'mean_abs_diff': float(diff.mean()),
+        'label_flip_rate': float(flips.mean()),
+        'batch_max_abs_diff': batch_drift,
+    }
+    report = {
+        'base_model': classifier.base_model_path,
+        'checkpoint': args.checkpoint,
+        'texts': len(texts),
+        'max_tokens': args.max_tokens,
+        'repeats': args.repeats,
+        'environment': {'cpu_count': os.cpu_count(), 'torch_threads': torch.get_num_threads(),
+                        'torch': torch.__version__, 'python': platform.python_version(),
+                        'platform': platform.platform()},
+        'results': results,
+        'int8_drift': {key: agreement[key] for key in ('max_abs_diff', 'mean_abs_diff', 'label_flip_rate',
+                                                       'batch_max_abs_diff')},
+    }
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / 'text_inference_benchmark.json').write_text(json.dumps(report, indent=2))
+    markdown = render_markdown(report)
+    (out_dir / 'text_inference_benchmark.md').write_text(markdown)
+    print(markdown)
+    Path(int8_agreement_path(args.checkpoint)).write_text(json.dumps(agreement, indent=2))
+    print(f'Reports written to {out_dir}; int8 agreement recorded in {int8_agreement_path(args.checkpoint)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Benchmark the training entry points on synthetic datasets of growing size.
+
+For every size, a synthetic dataset shaped like data/hseg_final_dataset.csv is
+written once to Parquet. Each entry point (train_individual, train_text,
+train_organizational) then runs in a fresh process that reads the dataset,
+trains into a scratch artifact directory and reports wall time, CPU time and
+peak RSS. RSS and CPU time are sampled while training runs across the worker
+process and every process below it: joblib/loky workers (grid searches,
+n_estimators selection) and the member-fitting process pool outlive or escape
+RUSAGE_CHILDREN, so they are tracked per process instead. Peak RSS is the
+summed RSS of the whole process tree, and the dataset already in memory is
+reported separately.
+
+Results are compared with a stored baseline. Any entry point whose wall time,
+CPU time or peak RSS grew by more than the tolerance is flagged, and the
+command exits non-zero.
+
+Usage:
+  python -m scripts.benchmark_training
+  python -m scripts.benchmark_training --sizes 10000 100000 --entry-points individual org
+  python -m scripts.benchmark_training --sizes 10000 --update-baseline
+
+Reports are written to:
+  app/models/trained/training_benchmark.json
+  app/models/trained/training_benchmark.md
+Baseline (read, or written with --update-baseline):
+  app/models/trained/training_benchmark_baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+import psutil
+
+from app.core.synthetic_workload import generate_workload
+
+OUT_DIR = Path('app/models/trained')
+DEFAULT_BASELINE = OUT_DIR / 'training_benchmark_baseline.json'
+ENTRY_POINTS = ('individual', 'text', 'org')
+METRICS = ('wall_seconds', 'cpu_seconds', 'peak_rss_mb')
+MB = 1024 * 1024
+
+
+def synthetic_dataset(n: int, seed: int = 42, rows_per_org: int = 50) -> pd.DataFrame:
+    """Final-dataset-shaped frame: q1-q22 answers, q23-q25 text, demographics and org columns"""
+    workload = generate_workload(n, n_orgs=max(n // rows_per_org, 1), seed=seed)
+    return workload['survey_responses']
+
+
+class _ProcessTreeSampler:
+    """
+    Samples the RSS of this process plus all its descendants, and each descendant's CPU time,
+    on a background thread. CPU a descendant spends after its last sample before exiting is lost,
+    so the figure undercounts by at most one interval per worker.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = 0
+        self.peak_workers = 0
+        self._process = psutil.Process()
+        self._cpu: Dict[tuple, List[float]] = {}  # (pid, create_time) -> [baseline, latest] CPU seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self, baseline: bool = False):
+        rss, workers = self._process.memory_info().rss, 0
+        for child in self._process.children(recursive=True):
+            try:
+                with child.oneshot():
+                    key = (child.pid, child.create_time())
+                    child_rss = child.memory_info().rss
+                    times = child.cpu_times()
+            except psutil.Error:
+                continue  # exited between listing and sampling
+            rss += child_rss
+            workers += 1
+            cpu = times.user + times.system
+            # Processes started during training count from zero, ones already running from now
+            self._cpu.setdefault(key, [cpu if baseline else 0.0, cpu])[1] = cpu
+        self.peak = max(self.peak, rss)
+        self.peak_workers = max(self.peak_workers, workers)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    @property
+    def children_cpu_seconds(self) -> float:
+        return sum(latest - baseline for baseline, latest in self._cpu.values())
+
+    def __enter__(self):
+        self._sample(baseline=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        # Persistent pool workers are still alive here, so their CPU up to now is counted
+        self._sample()
+
+
+def _train_worker(entry_point: str, dataset_path: str, artifact_dir: str, options: Dict, results):
+    """Load the dataset, run one training entry point and report its cost"""
+    try:
+        import scripts.train_all_from_final_dataset as pipeline
+        pipeline.OUT_DIR = artifact_dir
+
+        df = pd.read_parquet(dataset_path)
+        rss_loaded = psutil.Process().memory_info().rss
+        train = {
+            'individual': lambda: pipeline.train_individual(df, layout=options['layout']),
+            'text': lambda: pipeline.train_text(df, search_mode=options['text_search'],
+                                                time_budget_s=options['text_time_budget']),
+            'org': lambda: pipeline.train_organizational(df),
+        }[entry_point]
+
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        with _ProcessTreeSampler() as sampler:
+            train()
+        results.put({
+            'wall_seconds': time.perf_counter() - wall_start,
+            'cpu_seconds': time.process_time() - cpu_start + sampler.children_cpu_seconds,
+            'peak_rss_mb': sampler.peak / MB,
+            'dataset_rss_mb': rss_loaded / MB,
+            'peak_workers': sampler.peak_workers,
+        })
+    except Exception as e:
+        results.put({'error': f'{type(e).__name__}: {e}'})
+
+
+def run_entry_point(entry_point: str, dataset_path: str, options: Dict) -> Dict:
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    with tempfile.TemporaryDirectory(prefix='hseg_bench_') as artifact_dir:
+        process = context.Process(target=_train_worker,
+                                  args=(entry_point, dataset_path, artifact_dir, options, results))
+        process.start()
+        while True:
+            try:
+                result = results.get(timeout=5)
+                break
+            except queue.Empty:
+                # A worker killed by the OOM killer never reports back
+                if not process.is_alive():
+                    result = {'error': f'worker exited with code {process.exitcode}'}
+                    break
+        process.join()
+    return result
+
+
+def compare_with_baseline(results: List[Dict], baseline: Optional[Dict], tolerance: float) -> List[Dict]:
+    """Entries whose metrics grew beyond tolerance (relative) against the matching baseline entry"""
+    if not baseline:
+        return []
+    previous = {(r['entry_point'], r['rows']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        before = previous.get((result['entry_point'], result['rows']))
+        if before is None or 'error' in result or 'error' in before:
+            continue
+        for metric in METRICS:
+            if before[metric] > 0 and result[metric] > before[metric] * (1 + tolerance):
+                regressions.append({'entry_point': result['entry_point'], 'rows': result['rows'], 'metric': metric,
+                                    'baseline': before[metric], 'current': result[metric],
+                                    'change': result[metric] / before[metric] - 1})
+    return regressions
+
+
+def render_markdown(report: Dict) -> str:
+    lines = [
+        f"# Training benchmark ({report['environment']['cpu_count']} CPUs, seed {report['seed']})",
+        '',
+        '| Entry point | Rows | Wall (s) | CPU (s) | Peak RSS (MB) | Dataset RSS (MB) | Workers |',
+        '|---|---|---|---|---|---|---|',
+    ]
+    for r in report['results']:
+        if 'error' in r:
+            lines.append(f"| {r['entry_point']} | {r['rows']} | error: {r['error']} | | | | |")
+            continue
+        lines.append(f"| {r['entry_point']} | {r['rows']} | {r['wall_seconds']:.2f} | {r['cpu_seconds']:.2f} | "
+                     f"{r['peak_rss_mb']:.1f} | {r['dataset_rss_mb']:.1f} | {r.get('peak_workers', 0)} |")
+    lines.append('')
+    if report['baseline'] is None:
+        lines.append('No baseline to compare against.')
+    elif not report['regressions']:
+        lines.append(f"No regressions against {report['baseline']} (tolerance {report['tolerance']:.0%}).")
+    else:
+        lines += [f"**Regressions** against {report['baseline']} (tolerance {report['tolerance']:.0%}):", '',
+                  '| Entry point | Rows | Metric | Baseline | Current | Change |', '|---|---|---|---|---|---|']
+        for r in report['regressions']:
+            lines.append(f"| {r['entry_point']} | {r['rows']} | {r['metric']} | {r['baseline']:.2f} | "
+                         f"{r['current']:.2f} | {r['change']:+.0%} |")
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark training time and memory on synthetic datasets')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='Synthetic dataset sizes (rows)')
+    parser.add_argument('--entry-points', nargs='+', choices=ENTRY_POINTS, default=list(ENTRY_POINTS),
+                        help='Training entry points to run')
+    parser.add_argument('--seed', type=int, default=42, help='Synthetic data seed')
+    parser.add_argument('--layout', choices=['per_category', 'multi_output'], default='per_category',
+                        help='Individual model layout')
+    parser.add_argument('--text-search', choices=['grid', 'halving'], default='grid', help='Text search mode')
+    parser.add_argument('--text-time-budget', type=float, default=None, help='Halving text search budget (s)')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline report to compare against')
+    parser.add_argument('--update-baseline', action='store_true', help='Store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Relative growth of a metric that counts as a regression')
+    parser.add_argument('--out-dir', default=str(OUT_DIR), help='Directory for the JSON/Markdown reports')
+    args = parser.parse_args()
+
+    options = {'layout': args.layout, 'text_search': args.text_search, 'text_time_budget': args.text_time_budget}
+    results: List[Dict] = []
+    with tempfile.TemporaryDirectory(prefix='hseg_bench_data_') as data_dir:
+        for rows in args.sizes:
+            dataset_path = os.path.join(data_dir, f'synthetic_{rows}.parquet')
+            synthetic_dataset(rows, seed=args.seed).to_parquet(dataset_path, index=False)
+            for entry_point in args.entry_points:
+                print(f'Benchmarking {entry_point} on {rows} rows...')
+                result = {'entry_point': entry_point, 'rows': rows,
+                          **run_entry_point(entry_point, dataset_path, options)}
+                if 'error' in result:
+                    print(f"  failed: {result['error']}")
+                else:
+                    print(f"  wall {result['wall_seconds']:.2f}s, cpu {result['cpu_seconds']:.2f}s, "
+                          f"peak RSS {result['peak_rss_mb']:.1f} MB")
+                results.append(result)
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() and not args.update_baseline else None
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    report = {
+        'seed': args.seed,
+        'options': options,
+        'environment': {'cpu_count': os.cpu_count(), 'python': platform.python_version(),
+                        'platform': platform.platform()},
+        'results': results,
+        'baseline': str(baseline_path) if baseline else None,
+        'tolerance': args.tolerance,
+        'regressions': regressions,
+    }
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / 'training_benchmark.json').write_text(json.dumps(report, indent=2))
+    markdown = render_markdown(report)
+    (out_dir / 'training_benchmark.md').write_text(markdown)
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, indent=2))
+        print(f'Baseline written to {baseline_path}')
+
+    print(markdown)
+    print(f'Reports written to {out_dir}')
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
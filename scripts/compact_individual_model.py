@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Compact the random-forest members of a trained IndividualRiskPredictor.
+
+Prunes every forest (depth caps, merging near-identical sibling leaves, dropping
+the trees the validation error depends on least). The validation split held out
+by training is halved: trees are ranked on one half and each candidate is scored
+on the other, which the ranking never saw. Saves the chosen model as a new
+versioned artifact (pickle and flat) with a report of every candidate.
+
+Usage:
+  python -m scripts.compact_individual_model
+  python -m scripts.compact_individual_model --memory-budget-mb 20
+  python -m scripts.compact_individual_model --latency-budget-ms 15 --max-depths none 12 8
+
+The compacted model is written to:
+  app/models/trained/<version>/individual_risk_model.pkl
+  app/models/trained/<version>/individual_risk_model.npy
+  app/models/trained/<version>/compaction_report.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from app.models.individual_risk_model import IndividualRiskPredictor
+from app.utils.file_digest import file_digest
+from scripts.train_all_from_final_dataset import load_data, build_individual_frame
+
+DEFAULT_MODEL = 'app/models/trained/individual_risk_model.pkl'
+OUT_DIR = Path('app/models/trained')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prune the random forests of the individual risk model')
+    parser.add_argument('--data', default='data/hseg_final_dataset.csv', help='Dataset the model was trained on')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='Trained IndividualRiskPredictor pickle')
+    parser.add_argument('--version', default=None, help='Version for the compacted artifact (default: bump patch)')
+    parser.add_argument('--memory-budget-mb', type=float, default=None, help='Max whole-model size in MB')
+    parser.add_argument('--latency-budget-ms', type=float, default=None, help='Max single-row p95 latency in ms')
+    parser.add_argument('--max-mse-increase', type=float, default=0.01,
+                        help='Relative validation MSE increase allowed when no budget is given')
+    parser.add_argument('--max-depths', nargs='+', default=['none', '20', '14', '10', '8'],
+                        help="Depth caps to try ('none' keeps full depth)")
+    parser.add_argument('--tree-fractions', type=float, nargs='+', default=[1.0, 0.5, 0.25, 0.1],
+                        help='Fractions of each forest to keep')
+    parser.add_argument('--merge-tolerance', type=float, default=0.01,
+                        help='Merge sibling leaves whose values differ by at most this much')
+    parser.add_argument('--out-dir', default=str(OUT_DIR), help='Root directory for versioned artifacts')
+    args = parser.parse_args()
+
+    model = IndividualRiskPredictor()
+    model.load_model(args.model)
+
+    training = build_individual_frame(load_data(args.data))
+    report = model.compact_random_forests(
+        training,
+        memory_budget_mb=args.memory_budget_mb,
+        latency_budget_ms=args.latency_budget_ms,
+        max_mse_increase=args.max_mse_increase,
+        depth_candidates=tuple(None if d.lower() == 'none' else int(d) for d in args.max_depths),
+        tree_fractions=tuple(args.tree_fractions),
+        merge_tolerance=args.merge_tolerance,
+        new_version=args.version,
+    )
+    if report['chosen'] is None:
+        return
+
+    version_dir = Path(args.out_dir) / model.model_version
+    version_dir.mkdir(parents=True, exist_ok=True)
+    pickle_path = str(version_dir / 'individual_risk_model.pkl')
+    model.save_model(pickle_path)
+    model.save_flat_model(str(version_dir / 'individual_risk_model.npy'), source_digest=file_digest(pickle_path))
+    report['model_size_bytes'] = model.model_sizes
+    (version_dir / 'compaction_report.json').write_text(json.dumps(report, indent=2))
+
+    print(f"Compacted model saved to {version_dir}")
+
+
+if __name__ == '__main__':
+    main()
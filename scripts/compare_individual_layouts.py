@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Compare IndividualRiskPredictor layouts side by side.
+
+Trains the per-category layout (6 VotingRegressors) and the multi-output layout
+(one ensemble predicting all 6 categories) on the same data and split, then
+reports validation accuracy, training time and inference latency. With
+--strategies it also compares refitting against out-of-fold model reuse.
+
+Usage:
+  python -m scripts.compare_individual_layouts
+  python -m scripts.compare_individual_layouts --limit 2000 --latency-samples 200
+  python -m scripts.compare_individual_layouts --strategies refit oof_average oof_stacking
+
+Reports are written to:
+  app/models/trained/layout_comparison.json
+  app/models/trained/layout_comparison.md
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from app.models.individual_risk_model import IndividualRiskPredictor
+from scripts.train_all_from_final_dataset import load_data, build_individual_training
+
+OUT_DIR = Path('app/models/trained')
+
+
+def measure_latency(model: IndividualRiskPredictor, responses: List[Dict],
+                    samples: int, batch_size: int) -> Dict[str, float]:
+    """Single-row and batch latency for the model-only and full assessment paths"""
+    features = model.extract_feature_matrix(responses)
+
+    # Warm up once so lazy initialisation does not skew the first sample
+    model.predict_category_scores(features[:1])
+
+    single_scores, single_full = [], []
+    for i in range(samples):
+        idx = i % len(responses)
+        start = time.perf_counter()
+        model.predict_category_scores(features[idx:idx + 1])
+        single_scores.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        model.predict(responses[idx])
+        single_full.append((time.perf_counter() - start) * 1000)
+
+    batch = responses[:batch_size]
+    start = time.perf_counter()
+    model.predict_batch(batch)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'single_scores_p50_ms': float(np.percentile(single_scores, 50)),
+        'single_scores_p95_ms': float(np.percentile(single_scores, 95)),
+        'single_predict_p50_ms': float(np.percentile(single_full, 50)),
+        'single_predict_p95_ms': float(np.percentile(single_full, 95)),
+        'batch_size': len(batch),
+        'batch_total_ms': batch_ms,
+        'batch_per_row_ms': batch_ms / max(len(batch), 1),
+    }
+
+
+def compare_layouts(training: List[Dict], samples: int, batch_size: int,
+                    strategies: List[str] = ('refit',)) -> Dict[str, Dict]:
+    """Train every layout x ensemble strategy; single-strategy runs are keyed by layout alone"""
+    results = {}
+    for layout in IndividualRiskPredictor.MODEL_LAYOUTS:
+        for strategy in strategies:
+            key = layout if len(strategies) == 1 else f'{layout}/{strategy}'
+            print(f'Training {key}...')
+            model = IndividualRiskPredictor(model_layout=layout)
+            start = time.perf_counter()
+            metrics = model.train(training, ensemble_strategy=strategy)
+            train_seconds = time.perf_counter() - start
+
+            results[key] = {
+                'train_seconds': train_seconds,
+                'metrics': {name: {k: float(v) for k, v in values.items()} for name, values in metrics.items()},
+                'latency': measure_latency(model, training, samples, batch_size),
+            }
+    return results
+
+
+def render_markdown(results: Dict[str, Dict]) -> str:
+    layouts = list(results)
+    lines = ['# Individual model layout / ensemble strategy comparison', '']
+    lines.append('| Metric | ' + ' | '.join(layouts) + ' |')
+    lines.append('|---|' + '---|' * len(layouts))
+
+    rows = [('Train time (s)', lambda r: r['train_seconds'])]
+    for name in ['overall'] + [f'category_{i}' for i in range(1, 7)]:
+        for key in ('mse', 'r2', 'mae'):
+            rows.append((f'{name} {key.upper()}', lambda r, n=name, k=key: r['metrics'][n][k]))
+    for key in ('single_scores_p50_ms', 'single_scores_p95_ms', 'single_predict_p50_ms',
+                'single_predict_p95_ms', 'batch_per_row_ms'):
+        rows.append((key, lambda r, k=key: r['latency'][k]))
+
+    for label, getter in rows:
+        lines.append(f'| {label} | ' + ' | '.join(f'{getter(results[l]):.4f}' for l in layouts) + ' |')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-category and multi-output individual model layouts')
+    parser.add_argument('--data', default='data/hseg_final_dataset.csv', help='Training dataset CSV')
+    parser.add_argument('--limit', type=int, default=None, help='Use only the first N usable responses')
+    parser.add_argument('--latency-samples', type=int, default=100, help='Single-row predictions to time')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows in the batch latency run')
+    parser.add_argument('--strategies', nargs='+', choices=IndividualRiskPredictor.ENSEMBLE_STRATEGIES,
+                        default=['refit'], help='Ensemble strategies to train for each layout')
+    parser.add_argument('--out-dir', default=str(OUT_DIR), help='Directory for the JSON/Markdown reports')
+    args = parser.parse_args()
+
+    training = build_individual_training(load_data(args.data))
+    if args.limit:
+        training = training[:args.limit]
+
+    results = compare_layouts(training, args.latency_samples, args.batch_size, args.strategies)
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / 'layout_comparison.json').write_text(json.dumps(results, indent=2))
+    markdown = render_markdown(results)
+    (out_dir / 'layout_comparison.md').write_text(markdown)
+
+    print(markdown)
+    print(f'Reports written to {out_dir}')
+
+
+if __name__ == '__main__':
+    main()
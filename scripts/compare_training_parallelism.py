@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Measure parallel IndividualRiskPredictor training against the sequential run.
+
+Trains the same data sequentially and with each requested worker count,
+checks that every parallel artifact predicts exactly what the sequential one
+does, and reports wall-clock time and speedup.
+
+Usage:
+  python -m scripts.compare_training_parallelism --workers 2 4 8
+  python -m scripts.compare_training_parallelism --limit 2000 --workers 4 --threads-per-worker 2
+
+Reports are written to:
+  app/models/trained/training_parallelism.json
+  app/models/trained/training_parallelism.md
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.models.individual_risk_model import IndividualRiskPredictor
+from scripts.train_all_from_final_dataset import load_data, build_individual_frame
+
+OUT_DIR = Path('app/models/trained')
+
+
+def timed_training(training: pd.DataFrame, layout: str, n_workers: Optional[int],
+                   threads_per_worker: Optional[int]):
+    model = IndividualRiskPredictor(model_layout=layout)
+    start = time.perf_counter()
+    metrics = model.train(training, n_workers=n_workers, threads_per_worker=threads_per_worker)
+    return model, metrics, time.perf_counter() - start
+
+
+def compare(training: pd.DataFrame, layout: str, worker_counts: List[int],
+            threads_per_worker: Optional[int]) -> Dict:
+    features = IndividualRiskPredictor().extract_feature_matrix(training)
+
+    print('Training sequentially...')
+    reference, metrics, sequential_seconds = timed_training(training, layout, None, None)
+    reference_scores = reference.predict_category_scores(features)
+
+    runs = [{
+        'workers': 'sequential',
+        'seconds': sequential_seconds,
+        'speedup': 1.0,
+        'overall_mse': float(metrics['overall']['mse']),
+        'identical_to_sequential': True,
+    }]
+    for workers in worker_counts:
+        print(f'Training with {workers} workers...')
+        model, metrics, seconds = timed_training(training, layout, workers, threads_per_worker)
+        scores = model.predict_category_scores(features)
+        runs.append({
+            'workers': workers,
+            'seconds': seconds,
+            'speedup': sequential_seconds / seconds,
+            'overall_mse': float(metrics['overall']['mse']),
+            'identical_to_sequential': bool(np.array_equal(scores, reference_scores)),
+        })
+
+    return {
+        'layout': layout,
+        'samples': len(training),
+        'cpu_count': os.cpu_count(),
+        'threads_per_worker': threads_per_worker,
+        'runs': runs,
+    }
+
+
+def render_markdown(report: Dict) -> str:
+    lines = [
+        f"# Individual model training parallelism ({report['layout']}, {report['samples']} samples, "
+        f"{report['cpu_count']} CPUs)",
+        '',
+        '| Workers | Wall clock (s) | Speedup | Overall MSE | Identical to sequential |',
+        '|---|---|---|---|---|',
+    ]
+    for run in report['runs']:
+        lines.append(f"| {run['workers']} | {run['seconds']:.1f} | {run['speedup']:.2f}x | "
+                     f"{run['overall_mse']:.4f} | {'yes' if run['identical_to_sequential'] else 'NO'} |")
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sequential and parallel individual model training')
+    parser.add_argument('--data', default='data/hseg_final_dataset.csv', help='Training dataset CSV')
+    parser.add_argument('--limit', type=int, default=None, help='Use only the first N usable responses')
+    parser.add_argument('--layout', choices=IndividualRiskPredictor.MODEL_LAYOUTS, default='per_category')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4], help='Worker counts to measure')
+    parser.add_argument('--threads-per-worker', type=int, default=None,
+                        help='CPU threads per worker (default: cores / workers)')
+    parser.add_argument('--out-dir', default=str(OUT_DIR), help='Directory for the JSON/Markdown reports')
+    args = parser.parse_args()
+
+    training = build_individual_frame(load_data(args.data))
+    if args.limit:
+        training = training.iloc[:args.limit]
+
+    report = compare(training, args.layout, args.workers, args.threads_per_worker)
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / 'training_parallelism.json').write_text(json.dumps(report, indent=2))
+    markdown = render_markdown(report)
+    (out_dir / 'training_parallelism.md').write_text(markdown)
+
+    print(markdown)
+    print(f'Reports written to {out_dir}')
+
+
+if __name__ == '__main__':
+    main()
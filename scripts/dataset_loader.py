@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Shared loader for the chunked HSEG dataset (data/hseg_data_part_*.json).
+
+Chunks are parsed incrementally, one top-level array element at a time, and
+each chunk is written once to a typed Arrow IPC file under the cache directory.
+Later loads memory-map those files and read only the requested columns. A chunk
+is re-parsed only when its checksum changes: checksums come from metadata.json
+('chunk_checksums', written by utils/split_json.py) or are computed from the
+chunk files when metadata.json does not record them.
+
+Usage:
+  python -m scripts.dataset_loader                 # build/refresh the cache
+  python -m scripts.dataset_loader --refresh       # rebuild every chunk
+
+Cache layout (default data/.cache, override with DATASET_CACHE_DIR):
+  manifest.json                  chunk file -> checksum, cache file, rows
+  hseg_data_part_01.arrow, ...
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+DATA_DIR = 'data'
+CHUNK_PATTERN = 'hseg_data_part_*.json'
+CACHE_FORMAT = 'hseg-arrow-v2'
+SURVEY_COLUMNS = [f'q{i}' for i in range(1, 23)]
+READ_BLOCK_BYTES = 1024 * 1024
+RECORD_BATCH_SIZE = 20000
+
+
+def file_checksum(path: str) -> str:
+    """sha256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_metadata(data_dir: str) -> Dict:
+    metadata_path = os.path.join(data_dir, 'metadata.json')
+    if not os.path.exists(metadata_path):
+        return {}
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def chunk_files(data_dir: str, metadata: Optional[Dict] = None) -> List[str]:
+    """Chunk files in metadata order, or sorted by name when metadata.json lists none"""
+    metadata = _read_metadata(data_dir) if metadata is None else metadata
+    if metadata.get('chunk_files'):
+        return [name for name in metadata['chunk_files'] if os.path.exists(os.path.join(data_dir, name))]
+    return [os.path.basename(p) for p in sorted(glob.glob(os.path.join(data_dir, CHUNK_PATTERN)))]
+
+
+def chunk_checksums(data_dir: str, files: List[str], metadata: Optional[Dict] = None) -> Dict[str, str]:
+    metadata = _read_metadata(data_dir) if metadata is None else metadata
+    recorded = metadata.get('chunk_checksums', {})
+    return {name: recorded.get(name) or file_checksum(os.path.join(data_dir, name)) for name in files}
+
+
+def iter_json_records(path: str, batch_size: int = RECORD_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """
+    Yield lists of records from a JSON chunk without loading the whole file
+    A top-level array is decoded element by element; a top-level object is one record
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer, pos, eof = '', 0, False
+
+        def fill() -> bool:
+            nonlocal buffer, pos, eof
+            block = f.read(READ_BLOCK_BYTES)
+            eof = not block
+            buffer, pos = buffer[pos:] + block, 0
+            return not eof
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer) or not fill():
+                    return
+
+        skip_whitespace()
+        if pos >= len(buffer):
+            return
+        if buffer[pos] != '[':
+            # Not an array: the chunk is a single record
+            while fill():
+                pass
+            yield [json.loads(buffer[pos:])]
+            return
+        pos += 1
+
+        batch: List[Dict] = []
+        while True:
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise ValueError(f"Unterminated JSON array in {path}")
+            if buffer[pos] == ']':
+                break
+            if buffer[pos] == ',':
+                pos += 1
+                continue
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The element continues in the next block
+                if not fill():
+                    raise
+                continue
+            if end == len(buffer) and not eof:
+                # A number at the buffer edge may have more digits in the next block
+                fill()
+                continue
+            batch.append(record)
+            pos = end
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def _string_array(values) -> pa.Array:
+    """Values as an Arrow string array: dicts/lists as JSON, missing values as null"""
+    return pa.array([None if v is None or (isinstance(v, float) and np.isnan(v))
+                     else json.dumps(v) if isinstance(v, (dict, list)) else str(v)
+                     for v in values], type=pa.string())
+
+
+def _typed_table(records: List[Dict]) -> pa.Table:
+    """Arrow table for a batch of records: survey answers as float64, mixed-type columns as strings"""
+    frame = pd.DataFrame(records)
+    arrays = {}
+    for col in frame.columns:
+        if col in SURVEY_COLUMNS:
+            # Explicit float64, so all-integer batches do not stay int64
+            arrays[str(col)] = pa.array(pd.to_numeric(frame[col], errors='coerce').astype('float64'),
+                                        type=pa.float64(), from_pandas=True)
+            continue
+        try:
+            arrays[str(col)] = pa.array(frame[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays[str(col)] = _string_array(frame[col].astype(object))
+    return pa.table(arrays)
+
+
+def _is_number(arrow_type: pa.DataType) -> bool:
+    return pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type)
+
+
+def _unify_tables(tables: List[pa.Table]) -> pa.Table:
+    """
+    Concatenate tables whose schemas may differ between batches or chunks
+    Columns missing from a table are filled with nulls and int/float mixes promote to float;
+    any other type conflict (e.g. int64 in one batch, string in another) becomes string,
+    as _typed_table does for mixed types within a batch
+    """
+    types: Dict[str, set] = {}
+    for table in tables:
+        for field in table.schema:
+            if not pa.types.is_null(field.type):
+                types.setdefault(field.name, set()).add(field.type)
+    as_string = {name for name, seen in types.items()
+                 if len(seen) > 1 and not all(_is_number(t) for t in seen)}
+    if as_string:
+        unified = []
+        for table in tables:
+            for name in as_string & set(table.schema.names):
+                index = table.schema.get_field_index(name)
+                column = table.column(index)
+                if not pa.types.is_string(column.type):
+                    table = table.set_column(index, name, _string_array(column.to_pylist()))
+            unified.append(table)
+        tables = unified
+    return pa.concat_tables(tables, promote_options='permissive')
+
+
+def build_chunk_cache(chunk_path: str, cache_path: str) -> int:
+    """Parse one JSON chunk batch by batch and write it as an Arrow IPC file; returns its row count"""
+    tables = [_typed_table(records) for records in iter_json_records(chunk_path)]
+    table = _unify_tables(tables) if tables else pa.table({})
+    tmp_path = cache_path + '.tmp'
+    # Uncompressed so the file can be memory-mapped without decoding
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, cache_path)
+    return table.num_rows
+
+
+def refresh_cache(data_dir: str = DATA_DIR, cache_dir: Optional[str] = None, force: bool = False) -> Dict:
+    """Bring the Arrow cache in line with the JSON chunks; only changed chunks are re-parsed"""
+    cache_dir = cache_dir or os.getenv('DATASET_CACHE_DIR') or os.path.join(data_dir, '.cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, 'manifest.json')
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    if manifest.get('format') != CACHE_FORMAT:
+        manifest = {'format': CACHE_FORMAT, 'chunks': {}}
+
+    metadata = _read_metadata(data_dir)
+    files = chunk_files(data_dir, metadata)
+    checksums = chunk_checksums(data_dir, files, metadata)
+
+    chunks, rebuilt = {}, []
+    for name in files:
+        entry = manifest['chunks'].get(name)
+        cache_file = os.path.splitext(name)[0] + '.arrow'
+        if (entry is None or entry['checksum'] != checksums[name]
+                or not os.path.exists(os.path.join(cache_dir, cache_file))):
+            print(f"Caching {name}...")
+            rows = build_chunk_cache(os.path.join(data_dir, name), os.path.join(cache_dir, cache_file))
+            entry = {'checksum': checksums[name], 'cache_file': cache_file, 'rows': rows}
+            rebuilt.append(name)
+        chunks[name] = entry
+
+    # Drop cache files of chunks that no longer exist
+    for name, entry in manifest['chunks'].items():
+        if name not in chunks:
+            stale = os.path.join(cache_dir, entry['cache_file'])
+            if os.path.exists(stale):
+                os.remove(stale)
+
+    manifest = {'format': CACHE_FORMAT, 'chunks': chunks, 'order': files}
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return {'cache_dir': cache_dir, 'manifest': manifest, 'rebuilt': rebuilt}
+
+
+def load_dataset(data_dir: str = DATA_DIR, columns: Optional[List[str]] = None,
+                 cache_dir: Optional[str] = None, refresh: bool = False) -> pd.DataFrame:
+    """
+    Dataset from the JSON chunks in data_dir via the Arrow cache
+    columns: project to these columns (ones missing from the data are skipped)
+    Returns an empty DataFrame when there are no chunks
+    """
+    state = refresh_cache(data_dir, cache_dir, force=refresh)
+    manifest = state['manifest']
+    tables = []
+    for name in manifest['order']:
+        path = os.path.join(state['cache_dir'], manifest['chunks'][name]['cache_file'])
+        # Memory-mapped and uncompressed, so unselected columns are never read from disk
+        table = feather.read_table(path, memory_map=True)
+        if columns is not None:
+            table = table.select([c for c in columns if c in table.schema.names])
+        tables.append(table)
+    if not tables:
+        return pd.DataFrame()
+    return _unify_tables(tables).to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or refresh the Arrow cache of the chunked JSON dataset')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='Directory holding hseg_data_part_*.json')
+    parser.add_argument('--cache-dir', default=None, help='Cache directory (default: <data-dir>/.cache)')
+    parser.add_argument('--refresh', action='store_true', help='Re-parse every chunk')
+    args = parser.parse_args()
+
+    state = refresh_cache(args.data_dir, args.cache_dir, force=args.refresh)
+    rows = sum(entry['rows'] for entry in state['manifest']['chunks'].values())
+    print(f"{len(state['manifest']['chunks'])} chunks, {rows} rows cached in {state['cache_dir']} "
+          f"({len(state['rebuilt'])} rebuilt)")
+
+
+if __name__ == '__main__':
+    main()
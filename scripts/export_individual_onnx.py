@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Export the trained IndividualRiskPredictor to ONNX and verify it against the pickle.
+
+The graph contains the StandardScaler and all three ensemble members with their
+weights. After export the command scores the same responses through both
+backends, fails (and removes the .onnx file) when scores disagree beyond the
+tolerance, counts rounded assessments that differ, and reports single-row and
+batch latency for each.
+
+Usage:
+  python -m scripts.export_individual_onnx
+  python -m scripts.export_individual_onnx --model app/models/trained/v1.1.0/individual_risk_model.pkl
+
+Serve it by setting INDIVIDUAL_MODEL_BACKEND=onnx for the API.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from app.models.feature_schema import INDIVIDUAL_FEATURE_SCHEMA
+from app.models.individual_risk_model import IndividualRiskPredictor, create_sample_response_data
+from app.models.onnx_backend import export_individual_model
+from app.utils.file_digest import file_digest
+
+DEFAULT_MODEL = 'app/models/trained/individual_risk_model.pkl'
+
+
+def synthetic_responses(n: int, seed: int = 42) -> List[Dict]:
+    """Responses covering the survey scale and every declared demographic category"""
+    rng = np.random.default_rng(seed)
+    template = create_sample_response_data()
+    categories = {spec.source[-1]: list(spec.categories) for spec in INDIVIDUAL_FEATURE_SCHEMA
+                  if spec.encoding == 'category' and spec.source[0] == 'demographics'}
+    answers = rng.integers(2, 9, size=(n, 22)) / 2.0  # 1.0-4.0 in half steps
+
+    responses = []
+    for i in range(n):
+        demographics = dict(template['demographics'])
+        for key, values in categories.items():
+            demographics[key] = values[rng.integers(len(values))]
+        demographics['supervises_others'] = bool(rng.integers(2))
+        responses.append({
+            **template,
+            'response_id': f'onnx_parity_{i}',
+            'domain': ['Healthcare', 'University', 'Business'][rng.integers(3)],
+            'survey_responses': {f'q{q}': float(answers[i, q - 1]) for q in range(1, 23)},
+            'demographics': demographics,
+        })
+    return responses
+
+
+def time_backend(model: IndividualRiskPredictor, features: np.ndarray, responses: List[Dict],
+                 samples: int) -> Dict[str, float]:
+    model.predict_category_scores(features[:1])  # warm up
+
+    score_ms, predict_ms = [], []
+    for i in range(samples):
+        idx = i % len(responses)
+        start = time.perf_counter()
+        model.predict_category_scores(features[idx:idx + 1])
+        score_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        model.predict(responses[idx])
+        predict_ms.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    model.predict_batch(responses)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'single_scores_p50_ms': float(np.percentile(score_ms, 50)),
+        'single_scores_p95_ms': float(np.percentile(score_ms, 95)),
+        'single_predict_p50_ms': float(np.percentile(predict_ms, 50)),
+        'single_predict_p95_ms': float(np.percentile(predict_ms, 95)),
+        'batch_size': len(responses),
+        'batch_per_row_ms': batch_ms / len(responses),
+    }
+
+
+def check_parity(model: IndividualRiskPredictor, onnx_path: str, responses: List[Dict],
+                 source_digest: str) -> Dict[str, float]:
+    """Compare raw scores and rounded assessments between the two backends"""
+    features = model.extract_feature_matrix(responses)
+
+    model.disable_onnx_backend()
+    reference_scores = model.predict_category_scores(features)
+    reference = model.predict_batch(responses)
+
+    model.enable_onnx_backend(onnx_path, source_digest=source_digest)
+    onnx_scores = model.predict_category_scores(features)
+    candidate = model.predict_batch(responses)
+
+    keys = ('category_scores', 'overall_hseg_score', 'overall_risk_tier', 'category_risk_levels')
+    assessment_mismatches = sum(
+        any(ref.get(k) != cand.get(k) for k in keys) for ref, cand in zip(reference, candidate)
+    )
+    return {
+        'samples': len(responses),
+        'max_abs_score_diff': float(np.abs(reference_scores - onnx_scores).max()),
+        'assessment_mismatches': int(assessment_mismatches),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the individual risk model to ONNX')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help='Trained IndividualRiskPredictor pickle')
+    parser.add_argument('--output', default=None, help='ONNX path (default: next to the pickle)')
+    parser.add_argument('--samples', type=int, default=500, help='Responses used for the parity check')
+    parser.add_argument('--latency-samples', type=int, default=200, help='Single-row predictions to time')
+    parser.add_argument('--tolerance', type=float, default=1e-4, help='Max allowed absolute score difference')
+    args = parser.parse_args()
+
+    output = args.output or str(Path(args.model).with_suffix('.onnx'))
+    source_digest = file_digest(args.model)
+
+    model = IndividualRiskPredictor()
+    model.load_model(args.model)
+    export_individual_model(model, output, source_digest=source_digest)
+
+    responses = synthetic_responses(args.samples)
+    parity = check_parity(model, output, responses, source_digest)
+    print(f"Parity: max |diff| = {parity['max_abs_score_diff']:.2e}, "
+          f"assessment mismatches = {parity['assessment_mismatches']}/{parity['samples']}")
+
+    # Rounded assessments can still differ when a score sits on a 0.005 rounding boundary
+    if parity['max_abs_score_diff'] > args.tolerance:
+        Path(output).unlink(missing_ok=True)
+        print(f"ONNX export failed parity check (tolerance {args.tolerance}); removed {output}")
+        sys.exit(1)
+
+    features = model.extract_feature_matrix(responses)
+    latency = {'onnxruntime': time_backend(model, features, responses, args.latency_samples)}
+    model.disable_onnx_backend()
+    latency['sklearn'] = time_backend(model, features, responses, args.latency_samples)
+
+    report = {'model': args.model, 'onnx_model': output, 'parity': parity, 'latency': latency}
+    report_path = Path(output).with_name('onnx_export_report.json')
+    report_path.write_text(json.dumps(report, indent=2))
+
+    for backend, stats in latency.items():
+        print(f"{backend:12s} scores p50 {stats['single_scores_p50_ms']:.3f} ms, "
+              f"p95 {stats['single_scores_p95_ms']:.3f} ms | predict p50 {stats['single_predict_p50_ms']:.3f} ms | "
+              f"batch {stats['batch_per_row_ms']:.3f} ms/row")
+    print(f"Report written to {report_path}")
+
+
+if __name__ == '__main__':
+    main()
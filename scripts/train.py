@@ -5,6 +5,16 @@ Train HSEG models with versioned artifact output.
 Usage examples:
   python train.py --version v1.1.0 --all
   python train.py --version 2025-09-24 --individual --text
+  python train.py --version v1.2.0 --individual --layout multi_output
+  python train.py --version v1.2.0 --individual --workers 4 --threads-per-worker 2
+  python train.py --version v1.2.0 --individual --ensemble-strategy oof_stacking
+  python train.py --version v1.2.0 --individual --select-members --accuracy-tolerance 0.02 --latency-target-ms 20
+  python train.py --version v1.2.0 --text --text-search halving --text-time-budget 600
+  python train.py --version v1.2.0 --all --no-stage-cache
+
+Each stage (load, prepare-*, fit-*) is cached under a digest of its inputs and
+code (see scripts/training_stages.py); reruns reuse unchanged stages and the
+report lists which stages were reused and the time saved.
 
 Artifacts will be saved under:
   app/models/trained/                (latest)
@@ -15,15 +25,42 @@ import argparse
 import json
 import shutil
 from pathlib import Path
-
-from scripts.train_all_from_final_dataset import (
-    load_data,
-    train_individual,
-    train_text,
-    train_organizational,
-)
-
-OUT_DIR = Path('app/models/trained')
+from typing import List
+
+import scripts.train_all_from_final_dataset as pipeline
+from scripts.training_stages import Stage, StageRunner
+
+OUT_DIR = Path(pipeline.OUT_DIR)
+DATA_PATH = 'data/hseg_final_dataset.csv'
+
+
+def fit_text_stage(text_data, **params):
+    """prepare-text yields (texts, labels)"""
+    return pipeline.fit_text(*text_data, **params)
+
+
+def build_stages(args) -> List[Stage]:
+    """
+    The training DAG: load -> prepare-individual/text/org -> fit-individual/text/org
+    Stage keys follow each function's in-repo references and imports (see training_stages.code_digest)
+    """
+    return [
+        Stage('load', pipeline.load_data, params={'path': DATA_PATH}, source_files=[DATA_PATH]),
+        Stage('prepare-individual', pipeline.build_individual_frame, inputs=['load']),
+        Stage('prepare-text', pipeline.prepare_text_data, inputs=['load']),
+        Stage('prepare-org', pipeline.create_org_features, inputs=['load']),
+        Stage('fit-individual', pipeline.fit_individual, inputs=['prepare-individual'],
+              params={'layout': args.layout, 'n_workers': args.workers,
+                      'threads_per_worker': args.threads_per_worker,
+                      'ensemble_strategy': args.ensemble_strategy, 'select_members': args.select_members,
+                      'accuracy_tolerance': args.accuracy_tolerance, 'latency_target_ms': args.latency_target_ms},
+              artifacts=['individual_risk_model.pkl', 'individual_risk_model.npy']),
+        Stage('fit-text', fit_text_stage, inputs=['prepare-text'],
+              params={'search_mode': args.text_search, 'time_budget_s': args.text_time_budget},
+              artifacts=['text_risk_classifier.pkl']),
+        Stage('fit-org', pipeline.fit_organizational, inputs=['prepare-org'],
+              artifacts=['organizational_risk_model.pkl']),
+    ]
 
 
 def main():
@@ -33,36 +70,63 @@ def main():
     parser.add_argument('--text', action='store_true', help='Train text model')
     parser.add_argument('--org', action='store_true', help='Train organizational models')
     parser.add_argument('--all', action='store_true', help='Train all models')
+    parser.add_argument('--layout', choices=['per_category', 'multi_output'], default='per_category',
+                        help='Individual model layout (see scripts/compare_individual_layouts.py)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Train individual model fits in a process pool with this many workers')
+    parser.add_argument('--threads-per-worker', type=int, default=None,
+                        help='CPU threads per training worker (default: cores / workers)')
+    parser.add_argument('--ensemble-strategy', choices=['refit', 'oof_average', 'oof_stacking'], default='refit',
+                        help='Refit members after CV, or reuse the fold models (out-of-fold weights/stacker)')
+    parser.add_argument('--select-members', action='store_true',
+                        help='Keep the smallest member subset within the accuracy tolerance and latency target')
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.02,
+                        help='Relative validation MSE increase allowed by member selection')
+    parser.add_argument('--latency-target-ms', type=float, default=None,
+                        help='p95 single-row latency target for member selection')
+    parser.add_argument('--text-search', choices=['grid', 'halving'], default='grid',
+                        help='Text hyper-parameter search: full grid or successive halving')
+    parser.add_argument('--text-time-budget', type=float, default=None,
+                        help='Seconds after which the halving search stops fitting new candidates')
+    parser.add_argument('--no-stage-cache', action='store_true', help='Run every stage even if its output is cached')
+    parser.add_argument('--stage-cache-dir', default=None,
+                        help='Stage cache directory (default: data/.cache/stages or TRAINING_STAGE_CACHE_DIR)')
     args = parser.parse_args()
 
     if not (args.individual or args.text or args.org or args.all):
         parser.error('Select at least one: --individual, --text, --org, or --all')
 
-    df = load_data('data/hseg_final_dataset.csv')
+    runner = StageRunner(build_stages(args), artifact_dir=str(OUT_DIR), cache_dir=args.stage_cache_dir,
+                         use_cache=not args.no_stage_cache)
     OUT_DIR.mkdir(parents=True, exist_ok=True)
 
     report = {}
 
     if args.individual or args.all:
         print('Training IndividualRiskPredictor...')
-        report['individual'] = train_individual(df)
+        report['individual'] = runner.run('fit-individual')
 
     if args.text or args.all:
         print('Training TextRiskClassifier...')
-        report['text'] = {'accuracy': train_text(df)}
+        report['text'] = {'accuracy': runner.run('fit-text')}
 
     if args.org or args.all:
         print('Training Organizational models...')
-        org_acc_rmse = train_organizational(df)
+        org_acc_rmse = runner.run('fit-org')
         report['organizational'] = {'accuracy': org_acc_rmse[0], 'turnover_rmse': org_acc_rmse[1]} if org_acc_rmse else {}
 
+    report['stages'] = runner.summary()
+    print(f"Stages reused: {', '.join(report['stages']['reused']) or 'none'}; "
+          f"ran: {', '.join(report['stages']['ran']) or 'none'}; "
+          f"saved {report['stages']['saved_seconds']:.1f}s")
+
     # Write aggregated report
     (OUT_DIR / 'training_report.json').write_text(json.dumps(report, indent=2))
 
     # Copy artifacts to versioned folder
     version_dir = OUT_DIR / args.version
     version_dir.mkdir(parents=True, exist_ok=True)
-    for fname in ['individual_risk_model.pkl', 'text_risk_classifier.pkl', 'organizational_risk_model.pkl', 'training_report.json']:
+    for fname in ['individual_risk_model.pkl', 'individual_risk_model.npy', 'text_risk_classifier.pkl', 'organizational_risk_model.pkl', 'training_report.json']:
         src = OUT_DIR / fname
         if src.exists():
             shutil.copy2(src, version_dir / fname)
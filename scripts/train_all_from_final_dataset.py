@@ -11,19 +11,28 @@ Outputs:
 import os
 import json
 import pickle
+import shutil
+import tempfile
+import time
+import warnings
+import joblib
 import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
-from sklearn.model_selection import train_test_split, StratifiedKFold, GridSearchCV
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import train_test_split, StratifiedKFold, GridSearchCV, HalvingGridSearchCV
+from sklearn.base import clone
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.pipeline import Pipeline
-from sklearn.metrics import accuracy_score, classification_report, mean_squared_error, f1_score
+from sklearn.metrics import accuracy_score, classification_report, mean_squared_error
 from sklearn.preprocessing import LabelEncoder
 import lightgbm as lgb
 
 from app.models.individual_risk_model import IndividualRiskPredictor
+from app.utils.file_digest import file_digest
+from scripts.dataset_loader import load_dataset
 import glob
 
 DATA_PATH = 'data/hseg_final_dataset.csv'
@@ -40,116 +49,271 @@ def load_data(path: str) -> pd.DataFrame:
     return df
 
 
-def build_individual_training(df: pd.DataFrame) -> List[Dict]:
-    # Map questions to categories
-    categories = {
-        1: ['q1', 'q2', 'q3', 'q4'],
-        2: ['q5', 'q6', 'q7'],
-        3: ['q8', 'q9', 'q10'],
-        4: ['q11', 'q12', 'q13', 'q14'],
-        5: ['q15', 'q16', 'q17', 'q18'],
-        6: ['q19', 'q20', 'q21', 'q22'],
+# Map questions to categories
+CATEGORY_QUESTIONS = {
+    1: ['q1', 'q2', 'q3', 'q4'],
+    2: ['q5', 'q6', 'q7'],
+    3: ['q8', 'q9', 'q10'],
+    4: ['q11', 'q12', 'q13', 'q14'],
+    5: ['q15', 'q16', 'q17', 'q18'],
+    6: ['q19', 'q20', 'q21', 'q22'],
+}
+SURVEY_COLUMNS = [f'q{i}' for i in range(1, 23)]
+DEMOGRAPHIC_DEFAULTS = {
+    'age_range': '25-34',
+    'gender_identity': 'Prefer_not_to_say',
+    'tenure_range': '1-3_years',
+    'position_level': 'Mid',
+    'department': 'Other',
+}
+
+
+def _text_column(df: pd.DataFrame, col: str, default: str) -> pd.Series:
+    """Column as strings (missing cells become 'nan', as str() gives); absent columns take the default"""
+    if col not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[col].astype(str).fillna('nan').astype(object)
+
+
+def build_individual_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Training frame for IndividualRiskPredictor with flattened columns
+    ('survey_responses.q1', 'demographics.age_range', 'risk_scores.1', ...), built column-wise
+    """
+    survey = df.reindex(columns=SURVEY_COLUMNS).apply(pd.to_numeric, errors='coerce')
+    # Skip rows with many missing answers
+    keep = (survey.isna().sum(axis=1) <= 4).to_numpy()
+    df, survey = df.loc[keep], survey.loc[keep]
+
+    columns: Dict[str, pd.Series] = {
+        'response_id': _text_column(df, 'response_id', 'unknown'),
+        'domain': _text_column(df, 'domain', 'Business'),
     }
-    training = []
-    for _, row in df.iterrows():
-        # Skip if many missing
-        if row[[f'q{i}' for i in range(1, 23)]].isna().sum() > 4:
-            continue
-        # Survey responses dict (fill missing with 2.5)
-        survey_responses = {f'q{i}': float(row.get(f'q{i}', 2.5)) if pd.notna(row.get(f'q{i}', np.nan)) else 2.5
-                            for i in range(1, 23)}
-        # Targets: category averages on 1-4 scale
-        risk_scores = {}
-        for cid, qs in categories.items():
-            vals = [float(row.get(q, 2.5)) for q in qs if pd.notna(row.get(q, np.nan))]
-            if not vals:
-                vals = [2.5]
-            risk_scores[str(cid)] = float(np.clip(np.mean(vals), 1.0, 4.0))
-        # Minimal demographics
-        demographics = {
-            'age_range': str(row.get('age_range', '25-34')),
-            'gender_identity': str(row.get('gender_identity', 'Prefer_not_to_say')),
-            'tenure_range': str(row.get('tenure_range', '1-3_years')),
-            'position_level': str(row.get('position_level', 'Mid')),
-            'department': str(row.get('department', 'Other')),
-            'supervises_others': bool(str(row.get('supervises_others', 'False')).strip().lower() in ['1','true','yes'])
-        }
-        # Text
-        text_responses = {
-            'q23': str(row.get('q23', '')),
-            'q24': str(row.get('q24', '')),
-            'q25': str(row.get('q25', '')),
-        }
-        training.append({
-            'response_id': str(row.get('response_id', 'unknown')),
-            'domain': str(row.get('domain', 'Business')),
-            'survey_responses': survey_responses,
-            'demographics': demographics,
-            'text_responses': text_responses,
-            'risk_scores': risk_scores
-        })
-    return training
-
-
-def train_individual(df: pd.DataFrame):
-    training = build_individual_training(df)
-    model = IndividualRiskPredictor()
-    metrics = model.train(training)
+    # Survey responses (fill missing with 2.5)
+    filled = survey.fillna(2.5)
+    for col in SURVEY_COLUMNS:
+        columns[f'survey_responses.{col}'] = filled[col]
+    # Minimal demographics
+    for col, default in DEMOGRAPHIC_DEFAULTS.items():
+        columns[f'demographics.{col}'] = _text_column(df, col, default)
+    columns['demographics.supervises_others'] = (
+        _text_column(df, 'supervises_others', 'False').str.strip().str.lower().isin(['1', 'true', 'yes'])
+    )
+    # Targets: category averages on 1-4 scale (answered questions only)
+    for cid, qs in CATEGORY_QUESTIONS.items():
+        columns[f'risk_scores.{cid}'] = survey[qs].mean(axis=1).fillna(2.5).clip(1.0, 4.0)
+
+    return pd.DataFrame(columns).reset_index(drop=True)
+
+
+def build_individual_training(df: pd.DataFrame) -> List[Dict]:
+    """Nested response dicts (the API's request shape) for the rows build_individual_frame keeps"""
+    frame = build_individual_frame(df)
+    sections = ('survey_responses', 'demographics', 'risk_scores')
+    nested = {section: frame[[c for c in frame.columns if c.startswith(f'{section}.')]]
+              .rename(columns=lambda c: c.split('.', 1)[1]).to_dict('records')
+              for section in sections}
+    return [
+        {'response_id': response_id, 'domain': domain,
+         **{section: nested[section][i] for section in sections}}
+        for i, (response_id, domain) in enumerate(zip(frame['response_id'], frame['domain']))
+    ]
+
+
+def train_individual(df: pd.DataFrame, layout: str = 'per_category', n_workers: int = None,
+                     threads_per_worker: int = None, ensemble_strategy: str = 'refit',
+                     select_members: bool = False, accuracy_tolerance: float = 0.02,
+                     latency_target_ms: float = None):
+    return fit_individual(build_individual_frame(df), layout=layout, n_workers=n_workers,
+                          threads_per_worker=threads_per_worker, ensemble_strategy=ensemble_strategy,
+                          select_members=select_members, accuracy_tolerance=accuracy_tolerance,
+                          latency_target_ms=latency_target_ms)
+
+
+def fit_individual(training: pd.DataFrame, layout: str = 'per_category', n_workers: int = None,
+                   threads_per_worker: int = None, ensemble_strategy: str = 'refit',
+                   select_members: bool = False, accuracy_tolerance: float = 0.02,
+                   latency_target_ms: float = None):
+    """Train IndividualRiskPredictor on a build_individual_frame frame and save its artifacts"""
+    model = IndividualRiskPredictor(model_layout=layout)
+    metrics = model.train(training, n_workers=n_workers, threads_per_worker=threads_per_worker,
+                          ensemble_strategy=ensemble_strategy, select_members=select_members,
+                          accuracy_tolerance=accuracy_tolerance, latency_target_ms=latency_target_ms)
     os.makedirs(OUT_DIR, exist_ok=True)
-    model.save_model(os.path.join(OUT_DIR, 'individual_risk_model.pkl'))
+    pickle_path = os.path.join(OUT_DIR, 'individual_risk_model.pkl')
+    model.save_model(pickle_path)
+    model.save_flat_model(os.path.join(OUT_DIR, 'individual_risk_model.npy'), source_digest=file_digest(pickle_path))
     return metrics
 
 
-def preprocess_text(text: str) -> str:
-    if pd.isna(text):
-        return ''
-    import re
-    text = str(text).lower()
-    text = re.sub(r'[^\w\s\.\!\?]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
-
-
-def create_crisis_label(row, survey_cols):
-    text = row['combined_text']
-    score = row['hseg_score']
-    crisis_keywords = ['suicide','suicidal','kill myself','end my life','want to die','panic attack','ptsd','trauma','can\'t sleep','anxiety attack','severe depression','breakdown','self-harm','self harm','abuse','harassment','discrimination','retaliation','gaslighting','toxic','bullying','threatened','violated','destroyed']
-    crisis_count = sum(1 for kw in crisis_keywords if kw in text)
-    if crisis_count >= 3 or score <= 40:
-        return 'Crisis'
-    elif crisis_count >= 2 or score <= 50:
-        return 'High_Risk'
-    elif crisis_count >= 1 or score <= 60:
-        return 'Moderate_Risk'
-    else:
-        return 'Low_Risk'
-
-
-def train_text(df: pd.DataFrame):
+CRISIS_KEYWORDS = ['suicide','suicidal','kill myself','end my life','want to die','panic attack','ptsd','trauma','can\'t sleep','anxiety attack','severe depression','breakdown','self-harm','self harm','abuse','harassment','discrimination','retaliation','gaslighting','toxic','bullying','threatened','violated','destroyed']
+
+
+def preprocess_text(text: pd.Series) -> pd.Series:
+    text = text.fillna('').astype(str).str.lower()
+    text = text.str.replace(r'[^\w\s\.\!\?]', ' ', regex=True)
+    return text.str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def create_crisis_labels(text: pd.Series, score: pd.Series) -> np.ndarray:
+    crisis_count = sum(text.str.contains(kw, regex=False).to_numpy(dtype=np.int64) for kw in CRISIS_KEYWORDS)
+    score = score.to_numpy()
+    return np.select(
+        [(crisis_count >= 3) | (score <= 40), (crisis_count >= 2) | (score <= 50), (crisis_count >= 1) | (score <= 60)],
+        ['Crisis', 'High_Risk', 'Moderate_Risk'],
+        default='Low_Risk'
+    ).astype(object)
+
+
+TEXT_PARAM_GRID = {
+    'tfidf__max_features': [20000, 40000],
+    'tfidf__ngram_range': [(1,2), (1,3)],
+    'tfidf__min_df': [2, 5],
+    'tfidf__max_df': [0.9, 0.95],
+    'clf__C': [0.5, 1.0, 2.0]
+}
+TEXT_SEARCH_MODES = ('grid', 'halving')
+THRESHOLD_GRID = np.arange(30, 81, 5) / 100
+
+
+class BudgetedPipeline(Pipeline):
+    """
+    Pipeline that stops fitting once a wall-clock deadline has passed
+    Expired candidates skip the fit and fail when scored, so a search records error_score for them
+    (a failed fit would abort the search when a whole halving round runs out of time)
+    """
+
+    def __init__(self, steps, *, memory=None, verbose=False, deadline=None):
+        super().__init__(steps, memory=memory, verbose=verbose)
+        self.deadline = deadline
+
+    def fit(self, X, y=None, **params):
+        self.expired_ = self.deadline is not None and time.time() > self.deadline
+        if self.expired_:
+            return self
+        return super().fit(X, y, **params)
+
+    def predict(self, X, **params):
+        if getattr(self, 'expired_', False):
+            raise TimeoutError('text search time budget exhausted before this candidate was fitted')
+        return super().predict(X, **params)
+
+
+def text_pipeline(memory=None) -> Pipeline:
+    return Pipeline([
+        ('tfidf', TfidfVectorizer(stop_words='english')),
+        ('clf', LogisticRegression(random_state=42, max_iter=2000, class_weight='balanced', n_jobs=1))
+    ], memory=memory)
+
+
+def log_search_candidates(cv_results: Dict, n_splits: int):
+    """One line per evaluated candidate (slowest first): total fit time across folds, CV score and params"""
+    for i in np.argsort(cv_results['mean_fit_time'])[::-1]:
+        stage = f"iter {cv_results['iter'][i]} n={cv_results['n_resources'][i]} " if 'iter' in cv_results else ''
+        print(f"  {stage}fit {cv_results['mean_fit_time'][i] * n_splits:.2f}s "
+              f"score {cv_results['mean_test_score'][i]:.4f} {cv_results['params'][i]}")
+
+
+def best_halving_params(cv_results: Dict) -> Optional[Dict]:
+    """Best finite-scoring candidate at the largest resource level any candidate completed"""
+    scores = np.asarray(cv_results['mean_test_score'], dtype=float)
+    finite = np.isfinite(scores)
+    if not finite.any():
+        return None
+    resources = np.asarray(cv_results['n_resources'])
+    top = finite & (resources == resources[finite].max())
+    return cv_results['params'][int(np.flatnonzero(top)[np.argmax(scores[top])])]
+
+
+def calibrate_thresholds(proba: np.ndarray, classes: List, y_true, grid: np.ndarray = THRESHOLD_GRID) -> Dict:
+    """
+    Per-class probability thresholds maximising the weighted F1 of class-vs-other
+    All thresholds are scored at once; the first best one wins, 0.5 when none scores above 0
+    """
+    y_true = np.asarray(y_true)
+    n = len(y_true)
+    thresholds = {}
+    for i, cls in enumerate(classes):
+        truth = y_true == cls
+        predicted = proba[:, i][None, :] >= grid[:, None]
+        tp = (predicted & truth).sum(axis=1)
+        fp = (predicted & ~truth).sum(axis=1)
+        fn = truth.sum() - tp
+        tn = n - tp - fp - fn
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f1_pos = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+            f1_neg = np.where(2 * tn + fp + fn > 0, 2 * tn / (2 * tn + fp + fn), 0.0)
+        weighted = (f1_pos * truth.sum() + f1_neg * (n - truth.sum())) / max(n, 1)
+        best = int(np.argmax(weighted))
+        thresholds[cls] = float(grid[best]) if weighted[best] > 0 else 0.5
+    return thresholds
+
+
+def prepare_text_data(df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+    """Cleaned combined free text and its crisis label"""
     # Combine text
     df = df.copy()
-    df['combined_text'] = (df.get('q23','').fillna('') + ' ' + df.get('q24','').fillna('') + ' ' + df.get('q25','').fillna('')).apply(preprocess_text)
+    text_cols = [df[col].fillna('') if col in df.columns else pd.Series('', index=df.index) for col in ('q23', 'q24', 'q25')]
+    df['combined_text'] = preprocess_text(text_cols[0] + ' ' + text_cols[1] + ' ' + text_cols[2])
     survey_cols = [f'q{i}' for i in range(1,23) if f'q{i}' in df.columns]
     df['hseg_score'] = df[survey_cols].sum(axis=1)
-    df['crisis_label'] = df.apply(lambda r: create_crisis_label(r, survey_cols), axis=1)
-    X = df['combined_text']
-    y = df['crisis_label']
+    df['crisis_label'] = create_crisis_labels(df['combined_text'], df['hseg_score'])
+    return df['combined_text'], df['crisis_label']
+
+
+def train_text(df: pd.DataFrame, search_mode: str = 'grid', time_budget_s: Optional[float] = None):
+    X, y = prepare_text_data(df)
+    return fit_text(X, y, search_mode=search_mode, time_budget_s=time_budget_s)
+
+
+def fit_text(X: pd.Series, y: pd.Series, search_mode: str = 'grid', time_budget_s: Optional[float] = None):
+    """
+    Fit the TF-IDF + LogisticRegression crisis classifier
+    Fitted vectorizers are cached per distinct vectorizer config and fold, so candidates
+    that only differ in C reuse them. search_mode 'halving' runs successive halving and
+    stops fitting new candidates after time_budget_s seconds.
+    """
+    if search_mode not in TEXT_SEARCH_MODES:
+        raise ValueError(f"Unknown text search mode: {search_mode}. Expected one of {TEXT_SEARCH_MODES}")
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-    base_pipeline = Pipeline([
-        ('tfidf', TfidfVectorizer(stop_words='english')),
-        ('clf', LogisticRegression(random_state=42, max_iter=2000, class_weight='balanced', n_jobs=1))
-    ])
-    param_grid = {
-        'tfidf__max_features': [20000, 40000],
-        'tfidf__ngram_range': [(1,2), (1,3)],
-        'tfidf__min_df': [2, 5],
-        'tfidf__max_df': [0.9, 0.95],
-        'clf__C': [0.5, 1.0, 2.0]
-    }
     cv = StratifiedKFold(n_splits=3, shuffle=True, random_state=42)
-    search = GridSearchCV(base_pipeline, param_grid, cv=cv, scoring='f1_weighted', n_jobs=-1, verbose=0)
-    search.fit(X_train, y_train)
-    pipeline = search.best_estimator_
+
+    cache_dir = tempfile.mkdtemp(prefix='hseg_tfidf_')
+    memory = joblib.Memory(cache_dir, verbose=0)
+    start = time.perf_counter()
+    try:
+        if search_mode == 'grid':
+            search = GridSearchCV(text_pipeline(memory), TEXT_PARAM_GRID, cv=cv, scoring='f1_weighted',
+                                  n_jobs=-1, verbose=0)
+            search.fit(X_train, y_train)
+            best_params = search.best_params_
+            pipeline = search.best_estimator_
+        else:
+            deadline = time.time() + time_budget_s if time_budget_s else None
+            budgeted = BudgetedPipeline(text_pipeline().steps, memory=memory, deadline=deadline)
+            search = HalvingGridSearchCV(budgeted, TEXT_PARAM_GRID, cv=cv, scoring='f1_weighted', factor=3,
+                                         refit=False, error_score=np.nan, random_state=42, n_jobs=-1, verbose=0)
+            with warnings.catch_warnings():
+                if deadline is not None:
+                    # Candidates cut off by the time budget are counted below instead
+                    warnings.filterwarnings('ignore', message='Scoring failed')
+                    warnings.filterwarnings('ignore', message='One or more of the test scores are non-finite')
+                search.fit(X_train, y_train)
+            best_params = best_halving_params(search.cv_results_) or {}
+            if not best_params:
+                print('Text search budget exhausted before any candidate finished; using default parameters')
+            pipeline = text_pipeline(memory).set_params(**best_params).fit(X_train, y_train)
+        search_seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    # The cache directory is gone; the saved pipeline must not point at it
+    pipeline.set_params(memory=None)
+
+    n_failed = int(np.sum(~np.isfinite(np.asarray(search.cv_results_['mean_test_score'], dtype=float))))
+    print(f"Text search ({search_mode}): {len(search.cv_results_['params'])} candidate fits in {search_seconds:.1f}s"
+          + (f", {n_failed} failed or cut off by the time budget" if n_failed else ''))
+    log_search_candidates(search.cv_results_, cv.get_n_splits())
+
     y_pred = pipeline.predict(X_test)
     acc = accuracy_score(y_test, y_pred)
     print('Text classifier accuracy:', acc)
@@ -160,62 +324,94 @@ def train_text(df: pd.DataFrame):
     if hasattr(pipeline, 'predict_proba'):
         proba = pipeline.predict_proba(X_test)
         classes = list(getattr(pipeline, 'classes_', []))
-        for i, cls in enumerate(classes):
-            best_thr, best_f1 = 0.5, 0.0
-            for thr in [x/100 for x in range(30, 81, 5)]:
-                y_pred_cls = np.where(proba[:, i] >= thr, cls, 'other')
-                y_true_cls = np.where(y_test == cls, cls, 'other')
-                f1 = f1_score(y_true_cls, y_pred_cls, average='weighted')
-                if f1 > best_f1:
-                    best_f1, best_thr = f1, thr
-            thresholds[cls] = best_thr
+        thresholds = calibrate_thresholds(proba, classes, y_test)
 
     os.makedirs(OUT_DIR, exist_ok=True)
     with open(os.path.join(OUT_DIR, 'text_risk_classifier.pkl'), 'wb') as f:
-        pickle.dump({'model': pipeline, 'labels': sorted(y.unique()), 'best_params': getattr(search, 'best_params_', {}), 'thresholds': thresholds}, f)
+        pickle.dump({'model': pipeline, 'labels': sorted(y.unique()), 'best_params': best_params, 'thresholds': thresholds,
+                     'search': {'mode': search_mode, 'seconds': search_seconds, 'time_budget_s': time_budget_s,
+                                'candidate_fits': len(search.cv_results_['params']), 'cut_off': n_failed}}, f)
     return acc
 
 
 def create_org_features(df: pd.DataFrame) -> pd.DataFrame:
-    org_rows = []
-    if 'organization_name' not in df.columns:
-        df['organization_name'] = 'Org'
-    for org, group in df.groupby('organization_name'):
-        if len(group) < 5:
-            continue
-        rec: Dict = {
-            'organization_name': org,
-            'domain': group['domain'].iloc[0] if 'domain' in group.columns else 'Business',
-            'employee_count': pd.to_numeric(group.get('employee_count', pd.Series([100])), errors='coerce').fillna(100).iloc[0],
-            'total_responses': len(group)
-        }
-        survey_cols = [f'q{i}' for i in range(1,23) if f'q{i}' in group.columns]
-        # Aggregations
-        for col in survey_cols:
-            rec[f'{col}_mean'] = group[col].mean()
-            rec[f'{col}_std'] = group[col].std()
-        # Simple org indicators
-        scores = group[survey_cols].sum(axis=1)
-        rec['hseg_score_mean'] = scores.mean()
-        rec['hseg_score_std'] = scores.std()
-        # Tier proxies
-        def tier(score):
-            if score <= 44: return 'Crisis'
-            if score <= 55: return 'At_Risk'
-            if score <= 66: return 'Mixed'
-            if score <= 77: return 'Safe'
-            return 'Thriving'
-        tiers = scores.apply(tier)
-        rec['pct_crisis'] = (tiers=='Crisis').mean()
-        rec['pct_at_risk'] = (tiers=='At_Risk').mean()
-        rec['pct_safe'] = (tiers=='Safe').mean()
-        rec['pct_thriving'] = (tiers=='Thriving').mean()
-        org_rows.append(rec)
-    return pd.DataFrame(org_rows)
+    survey_cols = [f'q{i}' for i in range(1,23) if f'q{i}' in df.columns]
+    orgs = df['organization_name'] if 'organization_name' in df.columns else pd.Series('Org', index=df.index)
+    scores = df[survey_cols].sum(axis=1)
+    # Tier proxies: Crisis <=44, At_Risk <=55, Mixed <=66, Safe <=77, Thriving above
+    frame = df[survey_cols].assign(
+        organization_name=orgs,
+        hseg_score=scores,
+        crisis=scores <= 44,
+        at_risk=(scores > 44) & (scores <= 55),
+        safe=(scores > 66) & (scores <= 77),
+        thriving=scores > 77,
+    )
+    aggregations = {'total_responses': ('hseg_score', 'size')}
+    for col in survey_cols:
+        aggregations[f'{col}_mean'] = (col, 'mean')
+        aggregations[f'{col}_std'] = (col, 'std')
+    aggregations.update({
+        'hseg_score_mean': ('hseg_score', 'mean'),
+        'hseg_score_std': ('hseg_score', 'std'),
+        'pct_crisis': ('crisis', 'mean'),
+        'pct_at_risk': ('at_risk', 'mean'),
+        'pct_safe': ('safe', 'mean'),
+        'pct_thriving': ('thriving', 'mean'),
+    })
+    stats = frame.groupby('organization_name').agg(**aggregations)
+    stats = stats[stats['total_responses'] >= 5]
+
+    # Org-level attributes come from each org's first response
+    first = df.assign(organization_name=orgs).drop_duplicates('organization_name').set_index('organization_name')
+    domain = first['domain'] if 'domain' in first.columns else pd.Series('Business', index=first.index)
+    employees = first['employee_count'] if 'employee_count' in first.columns else pd.Series(100, index=first.index)
+    info = pd.DataFrame({
+        'domain': domain,
+        'employee_count': pd.to_numeric(employees, errors='coerce').fillna(100),
+    })
+    return info.join(stats, how='inner').loc[stats.index].rename_axis('organization_name').reset_index()
+
+
+ORG_EARLY_STOPPING_ROUNDS = 50
+
+
+def _fold_best_iteration(model, X: pd.DataFrame, y: np.ndarray, train_idx: np.ndarray, val_idx: np.ndarray,
+                         eval_metric: str) -> int:
+    fold_model = clone(model)
+    fold_model.fit(X.iloc[train_idx], y[train_idx], eval_set=[(X.iloc[val_idx], y[val_idx])], eval_metric=eval_metric,
+                   callbacks=[lgb.early_stopping(ORG_EARLY_STOPPING_ROUNDS, first_metric_only=True, verbose=False)])
+    return int(fold_model.best_iteration_ or fold_model.n_estimators)
+
+
+def select_n_estimators(model, X: pd.DataFrame, y, strata, eval_metric: str, n_splits: int = 5,
+                        n_jobs: int = -1) -> Tuple[int, List[int]]:
+    """
+    Boosting rounds for `model`: the mean best iteration of early-stopped stratified CV folds
+    Folds train in parallel, splitting the cores between them
+    Returns (rounds, per-fold best iterations); the configured n_estimators when there is too little data
+    """
+    y, strata = np.asarray(y), np.asarray(strata)
+    n_splits = int(min(n_splits, pd.Series(strata).value_counts().min()))
+    if n_splits < 2:
+        return int(model.n_estimators), []
+    folds = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42).split(X, strata)
+    n_workers = min(joblib.effective_n_jobs(n_jobs), n_splits)
+    fold_model = clone(model).set_params(n_jobs=max(1, (os.cpu_count() or 1) // n_workers))
+    rounds = joblib.Parallel(n_jobs=n_workers)(
+        joblib.delayed(_fold_best_iteration)(fold_model, X, y, train_idx, val_idx, eval_metric)
+        for train_idx, val_idx in folds
+    )
+    return int(round(np.mean(rounds))), [int(r) for r in rounds]
 
 
 def train_organizational(df: pd.DataFrame):
-    org_df = create_org_features(df)
+    return fit_organizational(create_org_features(df))
+
+
+def fit_organizational(org_df: pd.DataFrame):
+    """Train the org risk/turnover models on create_org_features output and save the bundle"""
+    org_df = org_df.copy()
     if org_df.empty:
         print('Warning: No organizations with >=5 responses found. Skipping org model.')
         return None, None
@@ -244,13 +440,9 @@ def train_organizational(df: pd.DataFrame):
         colsample_bytree=0.9,
         reg_alpha=0.0,
         reg_lambda=0.0,
-        random_state=42
+        random_state=42,
+        verbose=-1
     )
-    # Early stopping if possible
-    try:
-        risk_model.fit(X_train, y_risk_train, eval_set=[(X_test, y_risk_test)], eval_metric='logloss', early_stopping_rounds=50, verbose=False)
-    except Exception:
-        risk_model.fit(X_train, y_risk_train)
     turn_model = lgb.LGBMRegressor(
         n_estimators=600,
         learning_rate=0.05,
@@ -260,12 +452,16 @@ def train_organizational(df: pd.DataFrame):
         colsample_bytree=0.9,
         reg_alpha=0.0,
         reg_lambda=0.0,
-        random_state=42
+        random_state=42,
+        verbose=-1
     )
-    try:
-        turn_model.fit(X_train, y_turn_train, eval_set=[(X_test, y_turn_test)], eval_metric='rmse', early_stopping_rounds=50, verbose=False)
-    except Exception:
-        turn_model.fit(X_train, y_turn_train)
+    # Round counts come from early-stopped CV folds (stratified on the risk label for both models)
+    risk_rounds, risk_fold_rounds = select_n_estimators(risk_model, X_train, y_risk_train, y_risk_train, 'binary_logloss')
+    turn_rounds, turn_fold_rounds = select_n_estimators(turn_model, X_train, y_turn_train, y_risk_train, 'l2')
+    print(f'Org model rounds from CV early stopping: risk {risk_rounds} {risk_fold_rounds}, '
+          f'turnover {turn_rounds} {turn_fold_rounds}')
+    risk_model.set_params(n_estimators=risk_rounds).fit(X_train, y_risk_train)
+    turn_model.set_params(n_estimators=turn_rounds).fit(X_train, y_turn_train)
     y_risk_pred = risk_model.predict(X_test)
     acc = accuracy_score(y_risk_test, y_risk_pred)
     y_turn_pred = turn_model.predict(X_test)
@@ -277,7 +473,10 @@ def train_organizational(df: pd.DataFrame):
             'risk_model': risk_model,
             'turnover_model': turn_model,
             'domain_encoder': le_domain,
-            'feature_columns': feature_cols
+            'feature_columns': feature_cols,
+            'risk_best_iteration': risk_rounds,
+            'turnover_best_iteration': turn_rounds,
+            'cv_fold_best_iterations': {'risk': risk_fold_rounds, 'turnover': turn_fold_rounds}
         }, f)
     return acc, rmse
 
@@ -318,19 +517,8 @@ def load_data_json_first(data_dir: str) -> pd.DataFrame:
     parts = sorted(glob.glob(os.path.join(data_dir, 'hseg_data_part_*.json')))
     metadata_path = os.path.join(data_dir, 'metadata.json')
     if parts and os.path.exists(metadata_path):
-        frames = []
-        for p in parts:
-            with open(p, 'r', encoding='utf-8') as f:
-                chunk = json.load(f)
-            if isinstance(chunk, list):
-                frames.append(pd.DataFrame(chunk))
-            elif isinstance(chunk, dict):
-                frames.append(pd.DataFrame([chunk]))
-        if frames:
-            df = pd.concat(frames, ignore_index=True)
-            for i in range(1, 23):
-                col = f'q{i}'
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+        # Streams the chunks into a typed Arrow cache once; later runs memory-map it
+        df = load_dataset(data_dir)
+        if not df.empty:
             return df
     return load_data(os.path.join(data_dir, 'hseg_final_dataset.csv'))
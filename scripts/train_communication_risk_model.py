@@ -9,6 +9,8 @@ from transformers import BertTokenizer, BertForSequenceClassification, DataColla
 from sklearn.model_selection import train_test_split
 from tqdm import tqdm
 
+from scripts.dataset_loader import load_dataset
+
 # Define constants
 DATA_DIR = "data"
 MODEL_OUTPUT_DIR = "app/models/trained/communication_risk_model"
@@ -17,6 +19,7 @@ MAX_LEN = 256
 BATCH_SIZE = 16
 EPOCHS = 3
 LEARNING_RATE = 2e-5
+TEXT_COLUMNS = ['q23', 'q24', 'q25']
 
 # Define HSEG categories and keywords
 CATEGORY_KEYWORDS = {
@@ -28,24 +31,17 @@ CATEGORY_KEYWORDS = {
     6: ['voice', 'autonomy', 'feedback', 'empowerment', 'involvement', 'decision-making', 'control']
 }
 
-# Load and merge data
+# Load and merge data (only the free-text answers are needed)
 def load_data():
-    json_files = [f for f in os.listdir(DATA_DIR) if f.startswith('hseg_data_part_') and f.endswith('.json')]
-    df_list = []
-    for file in json_files:
-        with open(os.path.join(DATA_DIR, file), 'r') as f:
-            data = json.load(f)
-            df_list.append(pd.DataFrame(data))
-    df = pd.concat(df_list, ignore_index=True)
-    return df
+    return load_dataset(DATA_DIR, columns=TEXT_COLUMNS)
 
 # Create labels
 def create_labels(df):
     df['text'] = df['q23'].fillna('') + ' ' + df['q24'].fillna('') + ' ' + df['q25'].fillna('')
+    text = df['text'].str.lower()
     for category_id, keywords in CATEGORY_KEYWORDS.items():
-        df[f'category_{category_id}'] = df['text'].str.lower().apply(
-            lambda x: 1 if any(kw in x for kw in keywords) else 0
-        )
+        matches = [text.str.contains(kw, regex=False) for kw in keywords]
+        df[f'category_{category_id}'] = pd.concat(matches, axis=1).any(axis=1).astype(int)
     return df
 
 # Create dataset class
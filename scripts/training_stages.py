@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Content-addressed stage cache for scripts/train.py.
+
+Training is a small DAG (load -> prepare-* -> fit-*). Each stage's key is a
+digest of its parameters, its code and the keys of the stages it reads, or the
+bytes of its source files for the load stage. Code is collected automatically:
+the stage function's source and every in-repo function, class (with its
+methods) and constant it references, followed recursively through `module.attr`
+lookups. Modules used as a whole, including function-local imports, contribute
+their file and every in-repo module they import, transitively. Outputs are stored under <cache>/<stage>/<digest>/. A rerun
+whose key already exists reuses the stored output instead of running the stage.
+Upstream outputs are only read when a downstream stage actually has to run.
+
+Fit stages also store the artifacts they wrote to app/models/trained, and
+reusing them copies those files back.
+
+Cache location: data/.cache/stages (override with TRAINING_STAGE_CACHE_DIR).
+"""
+
+import ast
+import dis
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+import types
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import joblib
+
+from scripts.dataset_loader import file_checksum
+
+DEFAULT_CACHE_DIR = 'data/.cache/stages'
+REPO_ROOT = Path(__file__).resolve().parent.parent
+# Constants of these types are hashed by repr; other objects have no stable repr
+CONSTANT_TYPES = (str, bytes, int, float, bool, type(None), tuple, list, dict, set, frozenset, Path)
+
+
+@dataclass
+class Stage:
+    """One node of the training DAG; `run` receives the outputs of `inputs` in order, then **params"""
+    name: str
+    run: Callable[..., Any]
+    inputs: List[str] = field(default_factory=list)
+    params: Dict[str, Any] = field(default_factory=dict)
+    code: List[Any] = field(default_factory=list)  # extra code/constants the stage's references do not reach
+    source_files: List[str] = field(default_factory=list)  # data files hashed into the key
+    artifacts: List[str] = field(default_factory=list)  # files written under the artifact directory
+
+
+def _repo_path(filename: Optional[str]) -> Optional[Path]:
+    if not filename:
+        return None
+    path = Path(filename).resolve()
+    # Frozen/builtin code has pseudo filenames like '<frozen os>'
+    in_repo = REPO_ROOT in path.parents and 'site-packages' not in path.parts and path.is_file()
+    return path if in_repo else None
+
+
+def _module_file(name: str) -> Optional[Path]:
+    """In-repo file of a dotted module name, found without importing it"""
+    base = REPO_ROOT.joinpath(*name.split('.'))
+    for path in (base.with_suffix('.py'), base / '__init__.py'):
+        if path.is_file():
+            return path
+    return None
+
+
+def _imported_modules(path: Path) -> Set[Path]:
+    """In-repo module files imported anywhere in a file (function-local imports included)"""
+    package = '.'.join(path.relative_to(REPO_ROOT).with_suffix('').parts[:-1])
+    names = []
+    for node in ast.walk(ast.parse(path.read_text(encoding='utf-8'))):
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ''
+            if node.level:
+                parent = package.split('.')[:len(package.split('.')) - node.level + 1] if package else []
+                base = '.'.join(parent + ([base] if base else []))
+            # `from package import name` may name a submodule
+            names += [base] + [f"{base}.{alias.name}" for alias in node.names]
+    return {file for file in map(_module_file, filter(None, names)) if file is not None}
+
+
+def module_closure(paths: Set[Path]) -> Set[Path]:
+    """Module files plus every in-repo module they import, transitively"""
+    closure, pending = set(), list(paths)
+    while pending:
+        path = pending.pop()
+        if path not in closure:
+            closure.add(path)
+            pending += _imported_modules(path) - closure
+    return closure
+
+
+def _code_references(code: types.CodeType) -> Tuple[List[Tuple[str, Optional[str]]], List[str]]:
+    """
+    Globals a code object (and the code nested in it) reads, as (name, attribute read from it or None),
+    and the modules it imports at run time (function-local imports)
+    """
+    references, imports = [], []
+    instructions = list(dis.get_instructions(code))
+    for instruction, following in zip(instructions, instructions[1:] + [None]):
+        if instruction.opname in ('LOAD_GLOBAL', 'LOAD_NAME'):
+            attribute = following.argval if following is not None and following.opname in (
+                'LOAD_ATTR', 'LOAD_METHOD') else None
+            references.append((instruction.argval, attribute))
+        elif instruction.opname == 'IMPORT_NAME':
+            imports.append(instruction.argval)
+        elif instruction.opname == 'IMPORT_FROM' and imports:
+            # `from package import name` may name a submodule
+            imports.append(f"{imports[-1]}.{instruction.argval}")
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            nested_references, nested_imports = _code_references(const)
+            references += nested_references
+            imports += nested_imports
+    return references, imports
+
+
+def code_digest(objects: List[Any]) -> str:
+    """
+    Digest of the code objects depend on: sources of the in-repo functions and classes they reach,
+    reprs of the constants they read, and the transitive import closure of the in-repo modules
+    they use as a whole (module objects and function-local imports)
+    """
+    sources: Dict[str, str] = {}
+    modules: Set[Path] = set()
+    seen: Set[int] = set()
+
+    def visit_function(function: types.FunctionType):
+        sources[f"{function.__module__}.{function.__qualname__}"] = inspect.getsource(function)
+        references, imports = _code_references(function.__code__)
+        for global_name, attribute in references:
+            if global_name not in function.__globals__:
+                continue
+            value = function.__globals__[global_name]
+            if inspect.ismodule(value) and attribute is not None and hasattr(value, attribute):
+                visit(getattr(value, attribute), f"{value.__name__}.{attribute}")
+            else:
+                visit(value, f"{function.__module__}.{global_name}")
+        modules.update(filter(None, map(_module_file, imports)))
+
+    def visit(obj: Any, name: str = ''):
+        if isinstance(obj, CONSTANT_TYPES):
+            sources[name or repr(obj)] = repr(obj)
+            return
+        if id(obj) in seen:
+            return
+        seen.add(id(obj))
+        if inspect.ismodule(obj):
+            path = _repo_path(getattr(obj, '__file__', None))
+            if path is not None:
+                modules.add(path)
+        elif inspect.isclass(obj):
+            if _repo_path(getattr(inspect.getmodule(obj), '__file__', None)) is None:
+                return
+            sources[f"{obj.__module__}.{obj.__qualname__}"] = inspect.getsource(obj)
+            for base in obj.__bases__:
+                visit(base)
+            for member in vars(obj).values():
+                function = getattr(member, '__func__', None) or getattr(member, 'fget', None) or member
+                if inspect.isfunction(function):
+                    visit(function)
+        elif inspect.isfunction(obj):
+            if _repo_path(obj.__code__.co_filename) is not None:
+                visit_function(obj)
+        elif _repo_path(getattr(inspect.getmodule(type(obj)), '__file__', None)) is not None:
+            # An instance of an in-repo class depends on that class
+            visit(type(obj))
+
+    for obj in objects:
+        visit(obj)
+
+    digest = hashlib.sha256()
+    for key in sorted(sources):
+        digest.update(f"{key}\0{sources[key]}\0".encode('utf-8'))
+    for path in sorted(module_closure(modules)):
+        digest.update(str(path.relative_to(REPO_ROOT)).encode('utf-8'))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class StageRunner:
+    """Runs the stages needed for some targets, reusing cached outputs whose key is unchanged"""
+
+    def __init__(self, stages: List[Stage], artifact_dir: str, cache_dir: Optional[str] = None,
+                 use_cache: bool = True):
+        self.stages = {stage.name: stage for stage in stages}
+        self.artifact_dir = Path(artifact_dir)
+        self.cache_dir = Path(cache_dir or os.getenv('TRAINING_STAGE_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        self.use_cache = use_cache
+        self._keys: Dict[str, str] = {}
+        self._outputs: Dict[str, Any] = {}
+        self.report: List[Dict[str, Any]] = []
+
+    def key(self, name: str) -> str:
+        if name not in self._keys:
+            stage = self.stages[name]
+            payload = {
+                'stage': name,
+                'code': code_digest([stage.run] + stage.code),
+                'params': stage.params,
+                'inputs': [self.key(upstream) for upstream in stage.inputs],
+                'sources': {path: file_checksum(path) for path in stage.source_files},
+            }
+            encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+            self._keys[name] = hashlib.sha256(encoded).hexdigest()[:32]
+        return self._keys[name]
+
+    def _stage_dir(self, name: str) -> Path:
+        return self.cache_dir / name / self.key(name)
+
+    def run(self, name: str) -> Any:
+        """Output of a stage: from memory, from the cache, or by running it (and its missing inputs)"""
+        if name in self._outputs:
+            return self._outputs[name]
+
+        stage, stage_dir = self.stages[name], self._stage_dir(name)
+        start = time.perf_counter()
+        if self.use_cache and (stage_dir / 'meta.json').exists():
+            meta = json.loads((stage_dir / 'meta.json').read_text())
+            output = joblib.load(stage_dir / 'output.joblib')
+            for artifact in meta['artifacts']:
+                self.artifact_dir.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(stage_dir / artifact, self.artifact_dir / artifact)
+            seconds = time.perf_counter() - start
+            print(f"[{name}] reused {self.key(name)} ({meta['seconds']:.1f}s saved)")
+            self.report.append({'stage': name, 'key': self.key(name), 'status': 'reused', 'seconds': seconds,
+                                'original_seconds': meta['seconds'],
+                                'saved_seconds': max(meta['seconds'] - seconds, 0.0)})
+        else:
+            inputs = [self.run(upstream) for upstream in stage.inputs]
+            before = self._artifact_mtimes(stage)
+            start = time.perf_counter()
+            output = stage.run(*inputs, **stage.params)
+            seconds = time.perf_counter() - start
+            # Only files this run (re)wrote belong to it, not leftovers from earlier runs
+            written = [a for a, mtime in self._artifact_mtimes(stage).items() if mtime != before.get(a)]
+            self._store(stage, stage_dir, output, seconds, written)
+            print(f"[{name}] ran in {seconds:.1f}s")
+            self.report.append({'stage': name, 'key': self.key(name), 'status': 'ran', 'seconds': seconds,
+                                'original_seconds': seconds, 'saved_seconds': 0.0})
+
+        self._outputs[name] = output
+        return output
+
+    def _artifact_mtimes(self, stage: Stage) -> Dict[str, int]:
+        paths = {a: self.artifact_dir / a for a in stage.artifacts}
+        return {a: path.stat().st_mtime_ns for a, path in paths.items() if path.exists()}
+
+    def _store(self, stage: Stage, stage_dir: Path, output: Any, seconds: float, artifacts: List[str]):
+        tmp_dir = stage_dir.with_name(stage_dir.name + '.tmp')
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        joblib.dump(output, tmp_dir / 'output.joblib')
+        for artifact in artifacts:
+            shutil.copy2(self.artifact_dir / artifact, tmp_dir / artifact)
+        (tmp_dir / 'meta.json').write_text(json.dumps({
+            'stage': stage.name, 'key': self.key(stage.name), 'seconds': seconds, 'artifacts': artifacts,
+            'params': stage.params, 'created': datetime.now().isoformat(),
+        }, indent=2, default=str))
+        shutil.rmtree(stage_dir, ignore_errors=True)
+        tmp_dir.rename(stage_dir)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'cache_dir': str(self.cache_dir),
+            'stages': self.report,
+            'reused': [entry['stage'] for entry in self.report if entry['status'] == 'reused'],
+            'ran': [entry['stage'] for entry in self.report if entry['status'] == 'ran'],
+            'saved_seconds': sum(entry['saved_seconds'] for entry in self.report),
+        }
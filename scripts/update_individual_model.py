@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Incrementally update the trained IndividualRiskPredictor with new responses.
+
+Instead of retraining from scratch, XGBoost continues boosting from its current
+booster, each random forest grows extra trees and each MLP runs a few more
+partial_fit epochs. The result is saved as a new versioned artifact next to the
+previous one, with a report comparing holdout metrics before and after.
+
+Usage:
+  python -m scripts.update_individual_model --data data/new_responses.csv
+  python -m scripts.update_individual_model --data data/new_responses.csv --version v1.1.0 --xgb-rounds 100
+
+The updated model is written to:
+  app/models/trained/<version>/individual_risk_model.pkl
+  app/models/trained/<version>/individual_risk_model.npy
+  app/models/trained/<version>/update_report.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from app.models.individual_risk_model import IndividualRiskPredictor
+from app.utils.file_digest import file_digest
+from scripts.train_all_from_final_dataset import load_data, build_individual_frame
+
+DEFAULT_MODEL = 'app/models/trained/individual_risk_model.pkl'
+OUT_DIR = Path('app/models/trained')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Warm-start update of the individual risk model')
+    parser.add_argument('--data', required=True, help='CSV with the new responses')
+    parser.add_argument('--base-model', default=DEFAULT_MODEL, help='Artifact to update')
+    parser.add_argument('--version', default=None, help='Version for the updated artifact (default: bump patch)')
+    parser.add_argument('--xgb-rounds', type=int, default=50, help='Boosting rounds added to each XGBoost member')
+    parser.add_argument('--rf-trees', type=int, default=50, help='Trees added to each random forest')
+    parser.add_argument('--mlp-epochs', type=int, default=5, help='partial_fit passes for each MLP')
+    parser.add_argument('--out-dir', default=str(OUT_DIR), help='Root directory for versioned artifacts')
+    args = parser.parse_args()
+
+    model = IndividualRiskPredictor()
+    model.load_model(args.base_model)
+
+    new_responses = build_individual_frame(load_data(args.data))
+    report = model.update(new_responses, new_version=args.version, xgb_rounds=args.xgb_rounds,
+                          rf_trees=args.rf_trees, mlp_epochs=args.mlp_epochs)
+
+    version_dir = Path(args.out_dir) / model.model_version
+    version_dir.mkdir(parents=True, exist_ok=True)
+    pickle_path = str(version_dir / 'individual_risk_model.pkl')
+    model.save_model(pickle_path)
+    model.save_flat_model(str(version_dir / 'individual_risk_model.npy'), source_digest=file_digest(pickle_path))
+    (version_dir / 'update_report.json').write_text(json.dumps(report, indent=2, default=float))
+
+    print(f"Updated model saved to {version_dir}")
+
+
+if __name__ == '__main__':
+    main()
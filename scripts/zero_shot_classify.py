@@ -5,6 +5,8 @@ import pandas as pd
 from transformers import pipeline
 import torch
 
+from scripts.dataset_loader import load_dataset
+
 # --- Configuration ---
 # Directory where your JSON data files are located
 DATA_DIR = "data"
@@ -24,19 +26,11 @@ NUM_SAMPLES = 5
 # --- Data Loading ---
 def load_data():
     """
-    Loads and merges all 'hseg_data_part_*.json' files from the DATA_DIR.
+    Loads the free-text answers of all 'hseg_data_part_*.json' files in DATA_DIR (via the Arrow cache).
     """
-    json_files = [f for f in os.listdir(DATA_DIR) if f.startswith('hseg_data_part_') and f.endswith('.json')]
-    if not json_files:
+    df = load_dataset(DATA_DIR, columns=['q23', 'q24', 'q25'])
+    if df.empty:
         print(f"Error: No data files found in '{DATA_DIR}'. Please ensure your data is there.")
-        return pd.DataFrame()
-        
-    df_list = []
-    for file in json_files:
-        with open(os.path.join(DATA_DIR, file), 'r') as f:
-            data = json.load(f)
-            df_list.append(pd.DataFrame(data))
-    df = pd.concat(df_list, ignore_index=True)
     return df
 
 # --- Main Classification Logic ---
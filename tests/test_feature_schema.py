@@ -0,0 +1,125 @@
+"""
+Feature schema: the columnar extractor must encode records exactly as the per-record
+extract_features the shipped models were trained on
+"""
+
+import copy
+import zlib
+
+import numpy as np
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from app.models.feature_schema import INDIVIDUAL_FEATURE_EXTRACTOR
+from app.models.individual_risk_model import create_sample_response_data
+
+QUALITY_FLAGS = ('attention_check_passed', 'straight_line_response')
+TEXT_FLAGS = ('crisis_language_present', 'specific_incident_described')
+
+
+def baseline_features(response_data):
+    """The original per-record encoding (department bucketed with CRC32 instead of the salted hash())"""
+    features = []
+    survey_responses = response_data.get('survey_responses', {})
+    features += [float(survey_responses.get(f'q{q}', 2.5)) for q in range(1, 23)]
+
+    demographics = response_data.get('demographics', {})
+    features.append({'18-24': 0, '25-34': 1, '35-44': 2, '45-54': 3, '55-64': 4, '65+': 5}
+                    .get(demographics.get('age_range', '25-34'), 1))
+    features.append({'Man': 0, 'Woman': 1, 'Non-binary': 2, 'Prefer_not_to_say': 3}
+                    .get(demographics.get('gender_identity', 'Prefer_not_to_say'), 3))
+    features.append({'<1_year': 0, '1-3_years': 1, '4-7_years': 2, '8+_years': 3}
+                    .get(demographics.get('tenure_range', '1-3_years'), 1))
+    features.append({'Entry': 0, 'Mid': 1, 'Senior': 2, 'Executive': 3}
+                    .get(demographics.get('position_level', 'Mid'), 1))
+    features.append(zlib.crc32(str(demographics.get('department', 'Other')).encode('utf-8')) % 10)
+    features.append(1 if demographics.get('supervises_others', False) else 0)
+    features.append({'On_Site': 0, 'Remote': 1, 'Hybrid': 2}.get(demographics.get('work_location', 'On_Site'), 0))
+    features.append({'Full_Time': 0, 'Part_Time': 1, 'Contract': 2, 'Intern': 3}
+                    .get(demographics.get('employment_status', 'Full_Time'), 0))
+    features.append({'High_School': 0, 'Some_College': 1, 'Bachelors': 2, 'Graduate': 3}
+                    .get(demographics.get('education_level', 'Bachelors'), 2))
+    ethnicity = demographics.get('ethnicity_group', '')
+    features.append(1 if ',' in ethnicity or 'Multiracial' in ethnicity else 0)
+    features.append({'Healthcare': 0, 'University': 1, 'Business': 2}.get(response_data.get('domain', 'Business'), 2))
+
+    quality_data = response_data.get('response_quality', {})
+    features.append(min(max((quality_data.get('completion_time_seconds', 300) - 120) / 600, 0.0), 1.0))
+    features.append(quality_data.get('response_quality_score', 0.8))
+    features.append(1 if quality_data.get('attention_check_passed', True) else 0)
+    features.append(1 if quality_data.get('straight_line_response', False) else 0)
+    features.append(quality_data.get('text_response_quality', 0.5))
+
+    text_analysis = response_data.get('text_analysis', {})
+    features.append(text_analysis.get('sentiment_mean', 0.0))
+    features.append(text_analysis.get('sentiment_variance', 0.1))
+    features.append(text_analysis.get('risk_keyword_count', 0))
+    features.append(1 if text_analysis.get('crisis_language_present', False) else 0)
+    features.append(1 if text_analysis.get('specific_incident_described', False) else 0)
+    features.append(text_analysis.get('emotional_intensity_score', 0.0))
+    text_categories = text_analysis.get('category_signals', {})
+    features += [text_categories.get(str(cat_id), 0.0) for cat_id in range(1, 7)]
+    return np.array(features, dtype=np.float32)
+
+
+def with_flags(value):
+    record = copy.deepcopy(create_sample_response_data())
+    record['demographics']['supervises_others'] = value
+    for key in QUALITY_FLAGS:
+        record['response_quality'][key] = value
+    for key in TEXT_FLAGS:
+        record['text_analysis'][key] = value
+    return record
+
+
+def without_flags():
+    record = copy.deepcopy(create_sample_response_data())
+    del record['demographics']['supervises_others']
+    for key in QUALITY_FLAGS:
+        del record['response_quality'][key]
+    for key in TEXT_FLAGS:
+        del record['text_analysis'][key]
+    return record
+
+
+RECORDS = {
+    'sample': create_sample_response_data(),
+    'none': with_flags(None),
+    'false_string': with_flags('false'),
+    'true_string': with_flags('true'),
+    'nan': with_flags(float('nan')),
+    'zero': with_flags(0),
+    'absent': without_flags(),
+    'empty': {},
+}
+
+
+@pytest.mark.parametrize('name', list(RECORDS))
+def test_extractor_matches_baseline_encoding(name):
+    record = RECORDS[name]
+    np.testing.assert_array_equal(INDIVIDUAL_FEATURE_EXTRACTOR.transform([record])[0], baseline_features(record))
+
+
+def test_batch_matches_baseline_encoding():
+    records = list(RECORDS.values())
+    expected = np.vstack([baseline_features(record) for record in records])
+    np.testing.assert_array_equal(INDIVIDUAL_FEATURE_EXTRACTOR.transform(records), expected)
+
+
+def test_nullable_attention_check_encodes_as_failed():
+    # _prepare_response_data passes the nullable DB column straight through
+    column = INDIVIDUAL_FEATURE_EXTRACTOR.feature_names.index('Attention_Check_Passed')
+    assert INDIVIDUAL_FEATURE_EXTRACTOR.transform([with_flags(None)])[0, column] == 0.0
+    assert INDIVIDUAL_FEATURE_EXTRACTOR.transform([without_flags()])[0, column] == 1.0
+
+
+@pytest.mark.parametrize('value', [None, float('nan'), 'false', True])
+def test_frame_matches_records_for_null_flags(value):
+    # A DataFrame cell is always a stored value; only a missing column counts as an absent key
+    records = [with_flags(value), create_sample_response_data()]
+    frame = pd.json_normalize(records)
+    for key in QUALITY_FLAGS:
+        assert f'response_quality.{key}' in frame.columns
+    np.testing.assert_array_equal(INDIVIDUAL_FEATURE_EXTRACTOR.transform(frame),
+                                  INDIVIDUAL_FEATURE_EXTRACTOR.transform(records))
@@ -0,0 +1,67 @@
+"""
+Flat artifact: scores must match the pickled ensemble for every layout and ensemble strategy,
+and the flat backend must only serve a .npy written from the pickle next to it
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.ml_pipeline import HSEGMLPipeline
+from app.models.flat_artifact import read_flat_metadata
+from app.models.individual_risk_model import IndividualRiskPredictor
+from app.utils.file_digest import file_digest
+from scripts.export_individual_onnx import synthetic_responses
+
+TOLERANCE = 1e-4
+
+
+@pytest.fixture
+def predictor(tiny_predictor):
+    return tiny_predictor()
+
+
+def flat_current(pickle_path, flat_path):
+    pipeline = SimpleNamespace(model_paths={'individual': str(pickle_path), 'individual_flat': str(flat_path)})
+    return HSEGMLPipeline._flat_artifact_current(pipeline)
+
+
+def test_flat_artifact_must_come_from_the_pickle(predictor, tmp_path):
+    pickle_path, flat_path = tmp_path / 'individual_risk_model.pkl', tmp_path / 'individual_risk_model.npy'
+    predictor.save_model(str(pickle_path))
+    predictor.save_flat_model(str(flat_path), source_digest=file_digest(str(pickle_path)))
+    assert read_flat_metadata(str(flat_path))['model_version'] == predictor.model_version
+    assert flat_current(pickle_path, flat_path)
+
+    # A newer pickle promoted next to the old flat file
+    original_version = predictor.model_version
+    predictor.model_version = 'v9.9.9'
+    try:
+        predictor.save_model(str(pickle_path))
+    finally:
+        predictor.model_version = original_version
+    assert not flat_current(pickle_path, flat_path)
+
+    # Flat files without a recorded source are only served when there is no pickle to prefer
+    predictor.save_flat_model(str(flat_path))
+    assert not flat_current(pickle_path, flat_path)
+    pickle_path.unlink()
+    assert flat_current(pickle_path, flat_path)
+
+
+@pytest.mark.parametrize('ensemble_strategy', IndividualRiskPredictor.ENSEMBLE_STRATEGIES)
+@pytest.mark.parametrize('model_layout', ['per_category', 'multi_output'])
+def test_flat_scores_match_pickle(tiny_predictor, tmp_path, model_layout, ensemble_strategy):
+    reference = tiny_predictor(model_layout, ensemble_strategy)
+    flat_path = str(tmp_path / 'individual_risk_model.npy')
+    reference.save_flat_model(flat_path)
+    candidate = IndividualRiskPredictor()
+    candidate.load_flat_model(flat_path)
+    assert candidate.model_layout == model_layout
+    assert candidate.ensemble_strategy == ensemble_strategy
+
+    features = reference.extract_feature_matrix(synthetic_responses(50))
+    expected = reference.predict_category_scores(features)
+    np.testing.assert_allclose(candidate.flat_scorer.predict(features), expected, rtol=0, atol=TOLERANCE)
+    np.testing.assert_allclose(candidate.predict_category_scores(features), expected, rtol=0, atol=TOLERANCE)
@@ -0,0 +1,36 @@
+"""
+Pipeline model updates: a warm-start update is written as a new version and never
+overwrites the artifacts of the version it was loaded from
+"""
+
+import copy
+
+from app.core.ml_pipeline import HSEGMLPipeline
+from app.core.synthetic_workload import generate_workload, individual_training_records
+from app.utils.file_digest import file_digest
+
+
+def test_update_leaves_previous_version_untouched(tiny_predictor, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    old_dir = tmp_path / 'app/models/trained/v1.0.0'
+    old_dir.mkdir(parents=True)
+    predictor = copy.deepcopy(tiny_predictor())
+    predictor.model_version = 'v1.0.0'
+    predictor.save_model(str(old_dir / 'individual_risk_model.pkl'))
+    predictor.save_flat_model(str(old_dir / 'individual_risk_model.npy'),
+                              source_digest=file_digest(str(old_dir / 'individual_risk_model.pkl')))
+    old_digests = {path.name: file_digest(str(path)) for path in old_dir.iterdir()}
+
+    pipeline = HSEGMLPipeline('v1.0.0')
+    assert pipeline.model_paths['individual'] == 'app/models/trained/v1.0.0/individual_risk_model.pkl'
+    pipeline.individual_model = predictor
+    new_responses = individual_training_records(generate_workload(30, seed=3)['survey_responses'], seed=3)
+    report = pipeline.update_individual_model(new_responses, new_version='v1.0.1', xgb_rounds=2, rf_trees=2,
+                                              mlp_epochs=1)
+
+    assert {path.name: file_digest(str(path)) for path in old_dir.iterdir()} == old_digests
+    assert report['artifact_path'] == 'app/models/trained/v1.0.1/individual_risk_model.pkl'
+    assert pipeline.model_version == 'v1.0.1'
+    assert pipeline.model_paths['individual'] == report['artifact_path']
+    assert pipeline.model_paths['individual_flat'] == 'app/models/trained/v1.0.1/individual_risk_model.npy'
+    assert pipeline._flat_artifact_current()
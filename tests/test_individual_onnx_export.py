@@ -0,0 +1,42 @@
+"""
+ONNX export parity: a predictor exported with export_individual_model must score like the pickle,
+in both the per-category and the multi-output (multi-target XGBoost) layouts
+A tiny ensemble (few trees, one small hidden layer) keeps training to a few seconds
+"""
+
+import pytest
+
+pytest.importorskip('onnx')
+pytest.importorskip('onnxruntime')
+
+from app.models.onnx_backend import export_individual_model
+from scripts.export_individual_onnx import check_parity, synthetic_responses
+
+TOLERANCE = 1e-4
+
+
+@pytest.fixture(params=['per_category', 'multi_output'])
+def predictor(request, tiny_predictor):
+    model = tiny_predictor(request.param)
+    assert model.model_layout == request.param
+    return model
+
+
+def _without_timestamp(assessment):
+    return {key: value for key, value in assessment.items() if key != 'prediction_timestamp'}
+
+
+def test_onnx_export_matches_pickle(predictor, tmp_path):
+    onnx_path = str(tmp_path / 'individual_risk_model.onnx')
+    export_individual_model(predictor, onnx_path, source_digest='test')
+    responses = synthetic_responses(50)
+
+    parity = check_parity(predictor, onnx_path, responses, 'test')
+    assert parity['max_abs_score_diff'] <= TOLERANCE
+    assert parity['assessment_mismatches'] == 0
+
+    onnx_assessments = predictor.predict_batch(responses)
+    predictor.disable_onnx_backend()
+    pickle_assessments = predictor.predict_batch(responses)
+    assert [_without_timestamp(a) for a in onnx_assessments] == \
+        [_without_timestamp(a) for a in pickle_assessments]
@@ -0,0 +1,47 @@
+"""
+Member selection: the subset is chosen on one part of the validation split and its
+accuracy cost is reported and checked on the other
+"""
+
+import copy
+
+import numpy as np
+
+from app.core.synthetic_workload import generate_workload, individual_training_records
+
+
+def validation_data(predictor, n=60):
+    X, y = predictor.prepare_training_data(
+        individual_training_records(generate_workload(n, seed=5)['survey_responses'], seed=5))
+    return predictor.scalers['features'].transform(X.astype(np.float64)), y
+
+
+def members(predictor):
+    return list(predictor.models['category_1'].named_estimators_)
+
+
+def test_selection_reports_held_out_cost(tiny_predictor):
+    predictor = copy.deepcopy(tiny_predictor())
+    X_val, y_val = validation_data(predictor)
+
+    summary = predictor._select_members(X_val, y_val, accuracy_tolerance=10.0, latency_target_ms=None,
+                                        latency_rows=3)
+    assert summary['selection_rows'] + summary['held_out_rows'] == len(X_val)
+    chosen = next(row for row in summary['tradeoff_table'] if row['members'] == summary['selected_members'])
+    # Chosen on the selection rows, reported on the held-out rows
+    assert chosen['within_tolerance']
+    assert summary['held_out_mse_increase'] == chosen['mse_increase']
+    assert chosen['selection_mse'] != chosen['overall_mse']
+    assert len(summary['selected_members']) == 1
+    assert members(predictor) == summary['selected_members']
+
+
+def test_subset_failing_held_out_check_is_not_applied(tiny_predictor):
+    predictor = copy.deepcopy(tiny_predictor())
+    X_val, y_val = validation_data(predictor)
+    full_members = members(predictor)
+
+    summary = predictor._select_members(X_val, y_val, accuracy_tolerance=-1.0, latency_target_ms=None,
+                                        latency_rows=3)
+    assert summary['selected_members'] == full_members
+    assert not summary['targets_met']
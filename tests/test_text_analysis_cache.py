@@ -0,0 +1,113 @@
+"""
+TextAnalysisCache: shared analyses must carry each caller's own text fields, and each
+OpenTextResponse row (and SurveyResponse) stores the analysis of its own answer (combined
+answers), reused only while that text is unchanged
+"""
+
+from types import SimpleNamespace
+
+from app.core.text_analysis_cache import TextAnalysisCache
+
+
+class StubClassifier:
+    model = None
+    sklearn_pipeline = None
+    quantized = False
+    model_version = 'stub'
+    keyword_matcher = SimpleNamespace(groups={})
+
+    def __init__(self):
+        self.calls = []
+
+    def preprocess_text(self, text):
+        return ' '.join(text.lower().split())
+
+    def batch_predict(self, texts):
+        self.calls.append(list(texts))
+        return [self._analysis(text) for text in texts]
+
+    def _analysis(self, text):
+        words = self.preprocess_text(text).split()
+        return {
+            'text_length': len(text),
+            'processed_text_length': len(' '.join(words)),
+            'overall_risk_score': len(words) % 4,
+            'overall_risk_level': 'High' if 'unsafe' in words else 'Low',
+            'sentiment_analysis': {'sentiment_score': -0.5 if 'unsafe' in words else 0.0, 'confidence': 0.9},
+            'risk_keywords': {'power_abuse': ['yells'] if 'yells' in words else []},
+            'crisis_detection': {'crisis_keywords': ['unsafe'] if 'unsafe' in words else []},
+        }
+
+
+def row(text):
+    return SimpleNamespace(response_text=text, text_length=None, sentiment_score=None, risk_keywords=None,
+                           ai_risk_classification=None, ai_category_tags=None, ai_analysis=None,
+                           ai_model_version=None, text_digest=None, processed_at=None)
+
+
+def response(*rows):
+    return SimpleNamespace(text_responses=list(rows), text_analysis=None, text_analysis_digest=None)
+
+
+def test_cache_hit_recomputes_text_fields():
+    classifier = StubClassifier()
+    cache = TextAnalysisCache(classifier)
+    first, duplicate = cache.analyze(['Not applicable', '  NOT   applicable '])
+    hit = cache.analyze(['not applicable  '])[0]
+
+    assert classifier.calls == [['Not applicable']]
+    assert first['text_length'] == 14
+    assert duplicate['text_length'] == 19
+    assert duplicate['processed_text_length'] == 14
+    assert hit['text_length'] == 16
+    assert hit['overall_risk_score'] == first['overall_risk_score']
+
+
+def test_rows_store_their_own_answer_analysis():
+    classifier = StubClassifier()
+    cache = TextAnalysisCache(classifier)
+    rows = [row('My manager yells'), row('I feel unsafe')]
+    combined = 'My manager yells I feel unsafe'
+
+    stored = response(*rows)
+
+    analysis = cache.analyze_responses([combined], [stored])[0]
+    assert stored.text_analysis == analysis
+    assert analysis == classifier.batch_predict([combined])[0]
+    assert [r.text_length for r in rows] == [16, 13]
+    assert rows[0].text_digest != rows[1].text_digest
+    for r in rows:
+        assert r.ai_analysis == classifier.batch_predict([r.response_text])[0]
+
+    yells, unsafe = rows
+    assert (yells.sentiment_score, unsafe.sentiment_score) == (0.0, -0.5)
+    assert (yells.risk_keywords, unsafe.risk_keywords) == (['yells'], ['unsafe'])
+    assert (yells.ai_risk_classification, unsafe.ai_risk_classification) == ('Low', 'High')
+    assert yells.ai_category_tags == ['power_abuse']
+
+
+def test_stored_answers_are_reused_and_boilerplate_analyzed_once():
+    classifier = StubClassifier()
+    cache = TextAnalysisCache(classifier)
+    first = response(row('My manager yells'), row('N/A'))
+    second = response(row('I feel unsafe'), row('n/a '))
+    single = response(row('Too much overtime'))
+    texts = ['My manager yells N/A', 'I feel unsafe n/a ', 'Too much overtime']
+
+    analyses = cache.analyze_responses(texts, [first, second, single])
+    assert classifier.calls == [['My manager yells', 'N/A', 'I feel unsafe', 'Too much overtime',
+                                 'My manager yells N/A', 'I feel unsafe n/a ']]
+    assert second.text_responses[1].ai_analysis['text_length'] == 4
+
+    cache.memory.clear()
+    classifier.calls.clear()
+    assert cache.analyze_responses(texts, [first, second, single]) == analyses
+    assert classifier.calls == []
+    assert cache.get_stats()['stored_hits'] == 8
+
+    cache.memory.clear()
+    classifier.calls.clear()
+    second.text_responses[0].response_text = 'I feel safe'
+    cache.analyze_responses(['My manager yells N/A', 'I feel safe n/a ', 'Too much overtime'], [first, second, single])
+    assert classifier.calls == [['I feel safe', 'I feel safe n/a ']]
+    assert second.text_responses[0].ai_risk_classification == 'Low'
@@ -0,0 +1,214 @@
+"""
+TextRiskClassifier transformer lifecycle: int8 is opt-in per checkpoint and its state must not leak into retraining
+BERT is replaced by a tiny module and the HF Trainer by a stub, so no weights are downloaded
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('transformers')
+pytest.importorskip('datasets')
+
+from torch import nn
+from torch.utils.data import TensorDataset
+
+import app.models.text_risk_classifier as text_risk_classifier
+
+
+class TinyClassifier(nn.Module):
+    def __init__(self, num_labels: int = 6):
+        super().__init__()
+        self.embedding = nn.Embedding(100, 8)
+        self.classifier = nn.Linear(8, num_labels)
+
+    def forward(self, input_ids, attention_mask, labels=None):
+        # Mean over real tokens only, so padding does not change a text's output
+        mask = attention_mask.unsqueeze(-1).float()
+        pooled = (self.embedding(input_ids % 100) * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        logits = self.classifier(pooled)
+        return {'loss': None, 'logits': logits, 'probabilities': torch.sigmoid(logits)}
+
+
+class StubTokenizer:
+    def __call__(self, texts, truncation=True, max_length=None):
+        input_ids = [[len(word) for word in text.split()][:max_length] for text in texts]
+        return {'input_ids': input_ids, 'attention_mask': [[1] * len(ids) for ids in input_ids]}
+
+    def pad(self, encodings, padding=True, return_tensors='pt'):
+        width = max(len(ids) for ids in encodings['input_ids'])
+        return {key: torch.tensor([row + [0] * (width - len(row)) for row in rows])
+                for key, rows in encodings.items()}
+
+
+class StubTrainer:
+    def __init__(self, model, **kwargs):
+        self.model = model
+
+    def train(self):
+        pass
+
+    def evaluate(self):
+        return {'eval_accuracy': 1.0}
+
+
+@pytest.fixture
+def classifier(monkeypatch):
+    monkeypatch.setenv('TEXT_MODEL_PRECISION', 'int8')
+    monkeypatch.setattr(text_risk_classifier, 'Trainer', StubTrainer)
+    monkeypatch.setattr(text_risk_classifier, 'TrainingArguments', lambda **kwargs: kwargs)
+    classifier = text_risk_classifier.TextRiskClassifier()
+    if classifier.device.type != 'cpu':
+        pytest.skip('dynamic quantization only applies on CPU')
+    monkeypatch.setattr(classifier, 'create_model',
+                        lambda num_labels=6, pretrained=True: TinyClassifier(num_labels))
+    monkeypatch.setattr(classifier, 'prepare_training_data',
+                        lambda text_data: TensorDataset(torch.zeros(10, 4, dtype=torch.long)))
+    return classifier
+
+
+def record_agreement(checkpoint, label_flip_rate=0.0, digest=None):
+    record = {'checkpoint_sha256': digest or text_risk_classifier.file_digest(str(checkpoint)),
+              'label_flip_rate': label_flip_rate}
+    with open(text_risk_classifier.int8_agreement_path(str(checkpoint)), 'w') as f:
+        json.dump(record, f)
+
+
+def test_default_precision_is_fp32(monkeypatch):
+    monkeypatch.delenv('TEXT_MODEL_PRECISION', raising=False)
+    assert text_risk_classifier.TextRiskClassifier().configured_precision == 'fp32'
+
+
+def test_retrain_after_quantized_load_saves_new_model(classifier, tmp_path):
+    checkpoint = tmp_path / 'text_risk_classifier.pt'
+    classifier.train([], epochs=1)
+    classifier.save_model(str(checkpoint))
+    record_agreement(checkpoint)
+    classifier.load_model(str(checkpoint))
+    assert classifier.quantized
+
+    checkpoint.unlink()
+    classifier.train([], epochs=1)
+    assert not classifier.quantized
+    # The retrained model has no agreement record of its own
+    assert classifier.inference_precision == 'fp32'
+    classifier.save_model(str(checkpoint))
+    assert checkpoint.exists()
+
+    classifier.prepare_for_inference()
+    assert not classifier.quantized
+
+
+@pytest.mark.parametrize('record', [None, 'other_checkpoint', 'too_many_flips'])
+def test_int8_needs_a_matching_agreement_record(classifier, tmp_path, record):
+    checkpoint = tmp_path / 'text_risk_classifier.pt'
+    classifier.train([], epochs=1)
+    classifier.save_model(str(checkpoint))
+    if record == 'other_checkpoint':
+        record_agreement(checkpoint, digest='0' * 64)
+    elif record == 'too_many_flips':
+        record_agreement(checkpoint, label_flip_rate=0.5)
+
+    classifier.load_model(str(checkpoint))
+    assert not classifier.quantized
+    assert classifier.inference_precision == 'fp32'
+
+
+def test_quantized_scores_do_not_depend_on_batch_mates(classifier):
+    classifier.train([], epochs=1)
+    classifier.tokenizer = StubTokenizer()
+    classifier.model.eval()
+    texts = ['my manager yells at me', 'fine', 'meetings run long and nobody listens to the team']
+    fp32 = classifier._model_probabilities(texts)
+
+    classifier.prepare_for_inference('int8')
+    assert isinstance(classifier.model.classifier, text_risk_classifier.RowwiseInt8Linear)
+    classifier.inference_batch_size = len(texts)
+    batched = classifier._model_probabilities(texts)
+    alone = np.vstack([classifier._model_probabilities([text]) for text in texts])
+    np.testing.assert_array_equal(batched, alone)
+    assert np.abs(batched - fp32).max() < 5e-2
+
+
+def test_rowwise_int8_linear_scales_each_row_alone():
+    torch.manual_seed(0)
+    linear = nn.Linear(16, 4)
+    quantized = text_risk_classifier.RowwiseInt8Linear(linear)
+    x = torch.randn(2, 5, 16)
+    x[1] *= 100  # a batch mate with much larger activations
+    with torch.no_grad():
+        out = quantized(x)
+        assert out.shape == (2, 5, 4)
+        torch.testing.assert_close(out[0], quantized(x[:1])[0], rtol=0, atol=0)
+        torch.testing.assert_close(out, linear(x), rtol=0.05, atol=0.05 * x.abs().amax().item())
+
+
+class StubSentiment:
+    """Deterministic sentiment per text, accepting one text or a list like the HF pipeline"""
+
+    def __call__(self, texts, batch_size=None):
+        texts = [texts] if isinstance(texts, str) else texts
+        return [{'label': 'LABEL_0', 'score': 0.9} if 'not' in text or 'afraid' in text
+                else {'label': 'LABEL_2', 'score': 0.6} for text in texts]
+
+
+MIXED_TEXTS = [
+    '',
+    '  ',
+    'ok',
+    'I want to die, I can\'t go on like this',
+    'My manager screamed at me and I was humiliated publicly last week!!',
+    'My supervisor threatened retaliation when I reported it. Nothing happened, it was covered up.',
+    'Great team, supportive management and good work-life balance.',
+    'I am NOT listened to, no input, no autonomy, ALWAYS micromanaged and constantly stressed',
+    'Sometimes I feel excluded because of my background',
+]
+
+
+def without_timestamp(prediction):
+    return {key: value for key, value in prediction.items() if key != 'processing_timestamp'}
+
+
+@pytest.fixture
+def rule_classifier(monkeypatch):
+    monkeypatch.setenv('TEXT_SENTIMENT_MODEL', 'none')
+    classifier = text_risk_classifier.TextRiskClassifier()
+    classifier.sentiment_pipeline = StubSentiment()
+    return classifier
+
+
+def sklearn_pipeline():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    texts = ['manager screamed threatened', 'excluded bias unfair', 'great team supportive',
+             'happy good balance', 'anxiety panic stressed', 'ignored no input micromanaged']
+    labels = ['High_Risk', 'Moderate_Risk', 'Low_Risk', 'Low_Risk', 'Crisis', 'Moderate_Risk']
+    return Pipeline([('tfidf', TfidfVectorizer()), ('clf', LogisticRegression())]).fit(texts, labels)
+
+
+@pytest.mark.parametrize('backend', ['rules', 'sklearn', 'sklearn_thresholds'])
+def test_batch_predict_matches_per_text_predictions(rule_classifier, backend):
+    if backend != 'rules':
+        rule_classifier.sklearn_pipeline = sklearn_pipeline()
+    if backend == 'sklearn_thresholds':
+        rule_classifier.class_thresholds = {'Crisis': 0.2, 'High_Risk': 0.25}
+
+    batched = rule_classifier.batch_predict(MIXED_TEXTS)
+    single = [rule_classifier.predict_text_risk(text) for text in MIXED_TEXTS]
+
+    assert len(batched) == len(MIXED_TEXTS)
+    for text, batch_prediction, single_prediction in zip(MIXED_TEXTS, batched, single):
+        batch_prediction, single_prediction = without_timestamp(batch_prediction), without_timestamp(single_prediction)
+        assert batch_prediction.keys() == single_prediction.keys(), text
+        for key in single_prediction:
+            assert batch_prediction[key] == single_prediction[key], (text, key)
+
+    crisis = batched[MIXED_TEXTS.index('I want to die, I can\'t go on like this')]
+    incident = batched[MIXED_TEXTS.index('My manager screamed at me and I was humiliated publicly last week!!')]
+    assert crisis['overall_risk_level'] == 'Critical'
+    assert incident['risk_indicators']['has_specific_incidents']
+    assert 'error' in batched[0] and 'error' in batched[2]
@@ -2,11 +2,69 @@
 """
 Script to merge JSON chunks back into the original file.
 Used during deployment to reconstruct the full dataset.
+
+Chunk contents are streamed block by block into the output (the brackets of
+each chunk are dropped and the members joined with commas), so memory stays
+bounded regardless of the dataset size. Each chunk is checked against the
+sha256 recorded in metadata.json; the merged file only replaces
+output_file when every chunk matches.
 """
 
+import hashlib
 import json
 import os
 
+READ_BLOCK_BYTES = 1024 * 1024
+
+
+def _content_bounds(f, size, opening, closing):
+    """Byte offsets just inside the chunk's outer brackets (None when the chunk has no members)"""
+    block = f.read(min(size, READ_BLOCK_BYTES))
+    start = len(block) - len(block.lstrip())
+    if block[start:start + 1] != opening:
+        raise ValueError(f"expected {opening.decode()} at the start of the chunk")
+
+    tail_size = min(size, READ_BLOCK_BYTES)
+    f.seek(size - tail_size)
+    tail = f.read(tail_size).rstrip()
+    end = size - tail_size + len(tail) - 1
+    if tail[-1:] != closing:
+        raise ValueError(f"expected {closing.decode()} at the end of the chunk")
+
+    # Skip whitespace between the brackets to tell empty chunks apart
+    f.seek(start + 1)
+    first = start + 1
+    while first < end:
+        byte = f.read(1)
+        if not byte.isspace():
+            break
+        first += 1
+    return (first, end) if first < end else None
+
+
+def _copy_chunk(chunk_path, out, opening, closing, write_separator):
+    """Stream one chunk's members into out; returns (sha256 of the whole chunk file, wrote anything)"""
+    size = os.path.getsize(chunk_path)
+    with open(chunk_path, 'rb') as f:
+        bounds = _content_bounds(f, size, opening, closing)
+        if bounds is not None:
+            if write_separator:
+                out.write(b',')
+            f.seek(bounds[0])
+            remaining = bounds[1] - bounds[0]
+            while remaining:
+                block = f.read(min(remaining, READ_BLOCK_BYTES))
+                out.write(block)
+                remaining -= len(block)
+
+        # Hash in a separate pass over the file so the checksum covers every byte
+        digest = hashlib.sha256()
+        f.seek(0)
+        for block in iter(lambda: f.read(READ_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest(), bounds is not None
+
+
 def merge_json_chunks(data_dir, output_file="hseg_final_dataset.json"):
     """
     Merge JSON chunks back into a single file.
@@ -32,40 +90,54 @@ def merge_json_chunks(data_dir, output_file="hseg_final_dataset.json"):
     print(f"Total chunks: {metadata['total_chunks']}")
     print(f"Data type: {metadata['data_type']}")
 
-    # Load and merge chunks
-    merged_data = [] if metadata['data_type'] == 'list' else {}
-
-    for chunk_file in metadata['chunk_files']:
-        chunk_path = os.path.join(data_dir, chunk_file)
-
-        if not os.path.exists(chunk_path):
-            print(f"Error: Chunk file {chunk_file} not found!")
-            return False
-
-        print(f"Loading {chunk_file}...")
-        with open(chunk_path, 'r', encoding='utf-8') as f:
-            chunk_data = json.load(f)
-
-        # Merge based on data type
-        if metadata['data_type'] == 'list':
-            merged_data.extend(chunk_data)
-        else:  # dict
-            merged_data.update(chunk_data)
+    checksums = metadata.get('chunk_checksums', {})
+    if not checksums:
+        print("Warning: metadata.json has no chunk checksums; chunks will not be verified")
+
+    opening, closing = (b'[', b']') if metadata['data_type'] == 'list' else (b'{', b'}')
+    tmp_file = output_file + '.tmp'
+    wrote_any, merged = False, False
+    verified = 0
+    try:
+        with open(tmp_file, 'wb') as out:
+            out.write(opening)
+            for chunk_file in metadata['chunk_files']:
+                chunk_path = os.path.join(data_dir, chunk_file)
+
+                if not os.path.exists(chunk_path):
+                    print(f"Error: Chunk file {chunk_file} not found!")
+                    return False
+
+                print(f"Merging {chunk_file}...")
+                digest, wrote = _copy_chunk(chunk_path, out, opening, closing, wrote_any)
+                wrote_any = wrote_any or wrote
+
+                expected = checksums.get(chunk_file)
+                if expected and digest != expected:
+                    print(f"Error: Checksum mismatch for {chunk_file} (expected {expected}, got {digest})")
+                    return False
+                verified += bool(expected)
+            out.write(closing)
+        merged = True
+    except ValueError as e:
+        print(f"Error: Malformed chunk: {e}")
+        return False
+    finally:
+        # Never leave a partial merge behind
+        if not merged and os.path.exists(tmp_file):
+            os.remove(tmp_file)
 
-    # Save merged file
-    print(f"Saving merged data to {output_file}...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(merged_data, f, separators=(',', ':'))
+    os.replace(tmp_file, output_file)
 
     # Verify file size
     merged_size_mb = os.path.getsize(output_file) / (1024 * 1024)
     print(f"Merge complete! Created {output_file} ({merged_size_mb:.1f} MB)")
 
-    # Verify data integrity
-    if metadata['data_type'] == 'list':
-        print(f"Verified: {len(merged_data)} total items")
-    else:
-        print(f"Verified: {len(merged_data)} total keys")
+    print(f"Checksums verified for {verified} of {len(metadata['chunk_files'])} chunks")
+    # Item counts are not recounted (that would mean parsing the output); report what the split recorded
+    if 'total_items' in metadata:
+        unit = 'items' if metadata['data_type'] == 'list' else 'keys'
+        print(f"Split metadata records {metadata['total_items']} total {unit}")
 
     return True
 
@@ -79,4 +151,4 @@ if __name__ == "__main__":
         else:
             print("❌ JSON merge failed!")
     else:
-        print(f"Error: Data directory '{data_dir}' not found!")
\ No newline at end of file
+        print(f"Error: Data directory '{data_dir}' not found!")
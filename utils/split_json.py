@@ -2,11 +2,126 @@
 """
 Script to split large JSON file into smaller chunks for GitHub compatibility.
 Splits the hseg_final_dataset.json file into 20MB chunks.
+
+The input is scanned one top-level element at a time, so memory stays bounded
+by the largest single element rather than the file size. A new chunk is started
+whenever the next element would push the current one past the byte budget.
+metadata.json records each chunk's sha256, size and item count.
 """
 
+import hashlib
 import json
 import os
-import math
+
+READ_BLOCK_BYTES = 1024 * 1024
+
+
+def iter_top_level(input_file):
+    """
+    Yield ('list', item) for each element of a top-level array,
+    or ('dict', (key, value)) for each member of a top-level object
+    """
+    decoder = json.JSONDecoder()
+    with open(input_file, 'r', encoding='utf-8') as f:
+        state = {'buffer': '', 'pos': 0, 'eof': False}
+
+        def fill():
+            block = f.read(READ_BLOCK_BYTES)
+            state['eof'] = not block
+            state['buffer'] = state['buffer'][state['pos']:] + block
+            state['pos'] = 0
+            return not state['eof']
+
+        def peek():
+            """Next non-whitespace character (None at end of file)"""
+            while True:
+                buffer, pos = state['buffer'], state['pos']
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                state['pos'] = pos
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not fill():
+                    return None
+
+        def decode_value():
+            while True:
+                try:
+                    value, end = decoder.raw_decode(state['buffer'], state['pos'])
+                except json.JSONDecodeError:
+                    # The value continues in the next block
+                    if not fill():
+                        raise
+                    continue
+                if end == len(state['buffer']) and not state['eof']:
+                    # A number at the buffer edge may have more digits in the next block
+                    fill()
+                    continue
+                state['pos'] = end
+                return value
+
+        opening = peek()
+        if opening not in ('[', '{'):
+            raise ValueError("JSON data must be either a list or dictionary to split")
+        closing, data_type = (']', 'list') if opening == '[' else ('}', 'dict')
+        state['pos'] += 1
+
+        while True:
+            token = peek()
+            if token is None:
+                raise ValueError(f"Unterminated JSON {data_type} in {input_file}")
+            if token == closing:
+                return
+            if token == ',':
+                state['pos'] += 1
+                continue
+            if data_type == 'list':
+                yield data_type, decode_value()
+            else:
+                key = decode_value()
+                if peek() != ':':
+                    raise ValueError(f"Expected ':' after key {key!r} in {input_file}")
+                state['pos'] += 1
+                peek()
+                yield data_type, (key, decode_value())
+
+
+class _ChunkWriter:
+    """Writes one chunk file, hashing the bytes as they are written"""
+
+    def __init__(self, path, data_type):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.items = 0
+        self.closing = b']' if data_type == 'list' else b'}'
+        self._write(b'[' if data_type == 'list' else b'{')
+
+    def _write(self, data):
+        self.file.write(data)
+        self.digest.update(data)
+        self.size += len(data)
+
+    def add(self, encoded):
+        if self.items:
+            self._write(b',')
+        self._write(encoded)
+        self.items += 1
+
+    def close(self):
+        self._write(self.closing)
+        self.file.close()
+        return {'file': os.path.basename(self.path), 'sha256': self.digest.hexdigest(),
+                'size_bytes': self.size, 'items': self.items}
+
+
+def _encode(data_type, item):
+    if data_type == 'list':
+        return json.dumps(item, separators=(',', ':')).encode('utf-8')
+    key, value = item
+    return (json.dumps(key) + ':' + json.dumps(value, separators=(',', ':'))).encode('utf-8')
+
 
 def split_json_file(input_file, output_dir, chunk_size_mb=20):
     """
@@ -20,79 +135,54 @@ def split_json_file(input_file, output_dir, chunk_size_mb=20):
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
 
-    # Load the JSON data
-    print(f"Loading {input_file}...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
     # Calculate chunk size in bytes
     chunk_size_bytes = chunk_size_mb * 1024 * 1024
 
-    # If data is a list, split by items
-    if isinstance(data, list):
-        total_items = len(data)
-        print(f"Total items: {total_items}")
-
-        # Estimate items per chunk
-        total_size = os.path.getsize(input_file)
-        items_per_chunk = max(1, int((chunk_size_bytes / total_size) * total_items))
-
-        # Split into chunks
-        chunks = []
-        for i in range(0, total_items, items_per_chunk):
-            chunk = data[i:i + items_per_chunk]
-            chunks.append(chunk)
-
-        print(f"Created {len(chunks)} chunks with approximately {items_per_chunk} items each")
-
-    # If data is a dict, split by keys
-    elif isinstance(data, dict):
-        keys = list(data.keys())
-        total_keys = len(keys)
-        print(f"Total keys: {total_keys}")
-
-        # Estimate keys per chunk
-        total_size = os.path.getsize(input_file)
-        keys_per_chunk = max(1, int((chunk_size_bytes / total_size) * total_keys))
-
-        # Split into chunks
-        chunks = []
-        for i in range(0, total_keys, keys_per_chunk):
-            chunk_keys = keys[i:i + keys_per_chunk]
-            chunk = {key: data[key] for key in chunk_keys}
-            chunks.append(chunk)
-
-        print(f"Created {len(chunks)} chunks with approximately {keys_per_chunk} keys each")
-
-    else:
-        print("Error: JSON data must be either a list or dictionary to split")
+    print(f"Scanning {input_file}...")
+    chunks, writer, data_type = [], None, None
+    try:
+        for data_type, item in iter_top_level(input_file):
+            encoded = _encode(data_type, item)
+            # Roll over before the budget is exceeded (a single oversized item gets its own chunk)
+            if writer is not None and writer.items and writer.size + len(encoded) + 2 > chunk_size_bytes:
+                chunks.append(writer.close())
+                print(f"Created {chunks[-1]['file']} ({chunks[-1]['size_bytes'] / (1024 * 1024):.1f} MB)")
+                writer = None
+            if writer is None:
+                writer = _ChunkWriter(os.path.join(output_dir, f"hseg_data_part_{len(chunks) + 1:02d}.json"),
+                                      data_type)
+            writer.add(encoded)
+    except ValueError as e:
+        if writer is not None:
+            writer.file.close()
+        print(f"Error: {e}")
         return
+    if writer is not None:
+        chunks.append(writer.close())
+        print(f"Created {chunks[-1]['file']} ({chunks[-1]['size_bytes'] / (1024 * 1024):.1f} MB)")
 
-    # Save chunks
-    for i, chunk in enumerate(chunks):
-        output_file = os.path.join(output_dir, f"hseg_data_part_{i+1:02d}.json")
-
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(chunk, f, separators=(',', ':'))  # Compact format
-
-        # Check file size
-        file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
-        print(f"Created {output_file} ({file_size_mb:.1f} MB)")
+    if data_type is None:
+        print("Error: JSON data is empty, nothing to split")
+        return
 
     # Create metadata file
     metadata = {
         "original_file": input_file,
         "original_size_mb": os.path.getsize(input_file) / (1024 * 1024),
         "total_chunks": len(chunks),
-        "data_type": "list" if isinstance(data, list) else "dict",
-        "chunk_files": [f"hseg_data_part_{i+1:02d}.json" for i in range(len(chunks))]
+        "total_items": sum(chunk['items'] for chunk in chunks),
+        "data_type": data_type,
+        "chunk_files": [chunk['file'] for chunk in chunks],
+        "chunk_checksums": {chunk['file']: chunk['sha256'] for chunk in chunks},
+        "chunk_sizes": {chunk['file']: chunk['size_bytes'] for chunk in chunks},
+        "chunk_items": {chunk['file']: chunk['items'] for chunk in chunks},
     }
 
     metadata_file = os.path.join(output_dir, "metadata.json")
     with open(metadata_file, 'w', encoding='utf-8') as f:
         json.dump(metadata, f, indent=2)
 
-    print(f"\nSplit complete! Created {len(chunks)} chunks in {output_dir}")
+    print(f"\nSplit complete! Created {len(chunks)} chunks ({metadata['total_items']} items) in {output_dir}")
     print(f"Metadata saved to {metadata_file}")
 
 if __name__ == "__main__":
@@ -102,4 +192,4 @@ if __name__ == "__main__":
     if os.path.exists(input_file):
         split_json_file(input_file, output_dir)
     else:
-        print(f"Error: {input_file} not found!")
\ No newline at end of file
+        print(f"Error: {input_file} not found!")